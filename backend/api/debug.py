@@ -16,6 +16,13 @@ from ..models.quality_models import (
 )
 from ..services.vector_service import get_vector_service
 from ..services.ollama_service import get_ollama_service
+from ..services.answer_cache import get_answer_cache
+from ..services.single_flight import get_single_flight
+from ..services.context_compressor import get_context_compressor
+from ..services.document_catalog import get_document_catalog
+from ..services.query_log_writer import get_query_log_writer
+from ..services.latency_tracker import get_latency_tracker
+from ..services.rag_service import get_rag_service
 from ..config.settings import settings
 
 router = APIRouter(prefix="/api/debug", tags=["디버그"])
@@ -114,6 +121,16 @@ async def get_performance_metrics(db: AsyncSession = Depends(get_db)):
         )
 
 
+@router.get("/latency", summary="질의 단계별 지연 시간")
+async def get_latency_summary(reset: bool = False):
+    """프로세스 시작(또는 마지막 초기화) 이후 질의 단계별 지연 시간 분포를 반환합니다."""
+    latency_tracker = get_latency_tracker()
+    summary = latency_tracker.summary()
+    if reset:
+        latency_tracker.reset()
+    return {"latency": summary, "reset": reset}
+
+
 @router.get("/health-detail", summary="상세 헬스체크")
 async def get_detailed_health_check(db: AsyncSession = Depends(get_db)):
     """각 컴포넌트별 상세한 헬스체크를 수행합니다."""
@@ -332,13 +349,21 @@ async def _get_system_status(db: AsyncSession) -> Dict[str, Any]:
 
 async def _get_performance_metrics(db: AsyncSession) -> Dict[str, Any]:
     """성능 지표 조회"""
+    latency_tracker = get_latency_tracker()
     metrics = {
         "queries_per_minute": 0.0,
         "average_query_time": 0.0,
-        "vector_search_time": 0.0,
-        "llm_response_time": 0.0,
+        "vector_search_time": latency_tracker.mean("search"),
+        "llm_response_time": latency_tracker.mean("generate"),
         "success_rate": 1.0,
-        "error_rate": 0.0
+        "error_rate": 0.0,
+        "answer_cache": get_answer_cache().stats(),
+        "single_flight": get_single_flight().stats(),
+        "context_compression": get_context_compressor().stats(),
+        "document_catalog": get_document_catalog().stats(),
+        "query_logging": get_query_log_writer().stats(),
+        "latency": latency_tracker.summary(),
+        "streaming": (await get_rag_service()).get_stream_metrics_summary()
     }
 
     try:
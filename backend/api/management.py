@@ -7,11 +7,13 @@ from ..config.database import get_db, Document
 from ..models.request_models import DocumentListRequest, ReindexRequest
 from ..models.response_models import (
     DocumentListResponse, DocumentDetail, DocumentInfo,
-    StatusResponse, StatisticsResponse, ReindexResponse, HealthResponse
+    StatusResponse, StatisticsResponse, ReindexResponse, HealthResponse, PageTextResponse
 )
 from ..services.ollama_service import get_ollama_service
 from ..services.vector_service import get_vector_service
 from ..services.rag_service import get_rag_service
+from ..services.page_store import get_page_store
+from ..services.job_queue import get_job_queue
 
 router = APIRouter(prefix="/api", tags=["시스템 관리"])
 
@@ -200,6 +202,58 @@ async def get_document_detail(
         )
 
 
+@router.get(
+    "/documents/{document_id}/pages/{page_number}",
+    response_model=PageTextResponse,
+    summary="문서 페이지 텍스트 조회"
+)
+async def get_page_text(
+    document_id: str,
+    page_number: int,
+    start: Optional[int] = Query(None, ge=0, description="페이지 텍스트 안의 시작 위치 (SourceInfo.start_offset)"),
+    end: Optional[int] = Query(None, ge=0, description="페이지 텍스트 안의 끝 위치 (SourceInfo.end_offset)")
+):
+    """페이지 저장소에서 PDF를 다시 읽지 않고 페이지 전체 또는 지정 구간의 텍스트를 반환합니다."""
+    import asyncio
+
+    try:
+        page_store = get_page_store()
+        text = await asyncio.get_event_loop().run_in_executor(
+            None, page_store.get_page_text, document_id, page_number
+        )
+        if text is None:
+            raise HTTPException(
+                status_code=404,
+                detail="저장된 페이지를 찾을 수 없습니다."
+            )
+
+        start_offset = min(start or 0, len(text))
+        end_offset = len(text) if end is None else min(end, len(text))
+        if start_offset > end_offset:
+            raise HTTPException(
+                status_code=400,
+                detail="start는 end보다 클 수 없습니다."
+            )
+
+        return PageTextResponse(
+            document_id=document_id,
+            page_number=page_number,
+            text=text[start_offset:end_offset],
+            start_offset=start_offset,
+            end_offset=end_offset,
+            page_length=len(text)
+        )
+
+    except HTTPException:
+        raise
+    except Exception as e:
+        logger.error(f"페이지 텍스트 조회 실패 ({document_id} p.{page_number}): {e}")
+        raise HTTPException(
+            status_code=500,
+            detail="페이지 텍스트를 조회하는 중 오류가 발생했습니다."
+        )
+
+
 @router.get("/status", response_model=StatusResponse, summary="시스템 상태 확인")
 async def get_system_status():
     """시스템의 전반적인 상태를 확인합니다."""
@@ -261,7 +315,7 @@ async def get_system_statistics(
     """시스템 사용 통계를 조회합니다."""
     try:
         # RAG 서비스에서 질의 통계 가져오기
-        rag_service = get_rag_service()
+        rag_service = await get_rag_service()
         query_stats = await rag_service.get_query_statistics()
 
         # 인기 질문 조회
@@ -310,11 +364,25 @@ async def reindex_documents(
         vector_service = await get_vector_service()
 
         if request.document_ids:
-            # 특정 문서들만 재인덱싱
-            # TODO: 특정 문서 재인덱싱 구현
+            # 특정 문서들만 재인덱싱: PDF 재파싱 없이 페이지 저장소에서 재청킹하는 작업 등록
+            from sqlalchemy import select
+
             logger.info(f"특정 문서 재인덱싱: {len(request.document_ids)}개")
-            processed_documents = len(request.document_ids)
-            failed_documents = 0
+            page_store = get_page_store()
+            job_queue = get_job_queue()
+            result = await db.execute(select(Document).where(Document.id.in_(request.document_ids)))
+            documents = {document.id: document for document in result.scalars()}
+
+            processed_documents = 0
+            for document_id in request.document_ids:
+                document = documents.get(document_id)
+                if not document or not page_store.exists(document_id):
+                    logger.warning(f"재청킹 불가 (문서 또는 저장된 페이지 없음): {document_id}")
+                    continue
+                # 재청킹 중에도 기존 벡터로 검색되므로 문서 상태는 그대로 두고 진행 상황은 작업에 기록
+                await job_queue.enqueue(document_id, document.file_path, document.file_size, mode="rechunk")
+                processed_documents += 1
+            failed_documents = len(request.document_ids) - processed_documents
         else:
             # 전체 재인덱싱
             success = await vector_service.reindex_all_documents()
@@ -330,8 +398,10 @@ async def reindex_documents(
 
         logger.info(f"벡터 인덱스 재구성 완료 - 처리 시간: {processing_time}ms")
 
+        # 특정 문서 재인덱싱은 작업 큐에 등록만 하므로 queued
+        done_status = "queued" if request.document_ids else "completed"
         return ReindexResponse(
-            status="completed" if failed_documents == 0 else "partial_failure",
+            status=done_status if failed_documents == 0 else "partial_failure",
             message=f"재인덱싱이 완료되었습니다. 처리: {processed_documents}, 실패: {failed_documents}",
             processed_documents=processed_documents,
             failed_documents=failed_documents,
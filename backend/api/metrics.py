@@ -0,0 +1,20 @@
+from fastapi import APIRouter, HTTPException
+from fastapi.responses import Response
+
+from ..services.metrics import METRICS_AVAILABLE, refresh_ingestion_jobs, render_metrics
+
+router = APIRouter(tags=["모니터링"])
+
+
+@router.get("/metrics", summary="Prometheus 지표", include_in_schema=False)
+async def get_metrics():
+    """Prometheus 텍스트 형식 지표를 반환합니다."""
+    if not METRICS_AVAILABLE:
+        raise HTTPException(
+            status_code=503,
+            detail="지표 수집이 비활성화되어 있습니다. (prometheus-client 설치 및 METRICS_ENABLED 확인)"
+        )
+
+    await refresh_ingestion_jobs()
+    body, content_type = render_metrics()
+    return Response(content=body, media_type=content_type)
@@ -1,5 +1,7 @@
-from typing import List
-from fastapi import APIRouter, HTTPException, Depends
+import json
+import time
+from typing import List, Optional
+from fastapi import APIRouter, HTTPException, Depends, Query
 from fastapi.responses import StreamingResponse
 from sqlalchemy.ext.asyncio import AsyncSession
 from loguru import logger
@@ -10,11 +12,14 @@ from ..models.request_models import (
     MultiSourceQueryRequest, AdvancedMultiSourceRequest
 )
 from ..models.response_models import (
-    QueryResponse, BatchQueryResponse,
+    QueryResponse, BatchQueryResponse, SpecSearchResponse,
     MultiSourceQueryResponse, MultiSourceSearchResponse
 )
 from ..services.rag_service import get_rag_service
+from ..services.spec_service import get_spec_service
 from ..services.multi_source_rag_service import get_multi_source_rag_service
+from ..services.single_flight import get_single_flight, query_key
+from ..config.settings import settings
 
 router = APIRouter(prefix="/api/query", tags=["질의응답"])
 
@@ -113,7 +118,16 @@ async def stream_query_documents(
     request: QueryRequest,
     db: AsyncSession = Depends(get_db)
 ):
-    """실시간 스트리밍 방식으로 질의응답을 수행합니다."""
+    """
+    질의응답 파이프라인을 Server-Sent Events로 스트리밍합니다.
+
+    일반 질의와 같은 역할별 처리(질의 확장, 문서 필터, 역할 프롬프트, 품질 검증)를 거치며
+    이벤트는 다음 순서로 전달됩니다:
+    - sources: 검색 출처 목록
+    - token: 생성된 텍스트 조각 (여러 번)
+    - done: 최종 답변, 신뢰도, 품질 검증 결과, 첫 토큰까지 시간(ttft_ms), 초당 토큰 수
+    - error: 처리 중 오류
+    """
     try:
         if not request.question.strip():
             raise HTTPException(
@@ -121,55 +135,24 @@ async def stream_query_documents(
                 detail="질문을 입력해주세요."
             )
 
-        logger.info(f"스트리밍 질의 요청: {request.question[:100]}...")
-
-        from ..services.ollama_service import get_ollama_service
-        from ..services.vector_service import get_vector_service
-
-        # 컨텍스트 검색
-        vector_service = await get_vector_service()
-        search_results = await vector_service.search(
-            query=request.question,
-            top_k=request.top_k
-        )
-
-        if not search_results:
-            async def no_results_generator():
-                yield "data: 죄송합니다. 관련 정보를 찾을 수 없습니다.\n\n"
-
-            return StreamingResponse(
-                no_results_generator(),
-                media_type="text/plain"
-            )
+        logger.info(f"스트리밍 질의 요청 - 역할: {request.user_role}, 질문: {request.question[:100]}...")
 
-        # 컨텍스트 구성
-        context_parts = []
-        for result in search_results:
-            context_parts.append(result["content"])
-        context = "\n".join(context_parts)
+        rag_service = await get_rag_service()
 
-        # 스트리밍 응답 생성
         async def generate_streaming_response():
-            try:
-                ollama_service = await get_ollama_service()
-
-                yield "data: [시작]\n\n"
-
-                async for chunk in ollama_service.generate_streaming_response(
-                    prompt=request.question,
-                    context=context,
-                    temperature=0.1
-                ):
-                    if chunk.strip():
-                        yield f"data: {chunk}\n\n"
+            async for event in rag_service.query_stream(request):
+                data = json.dumps(event["data"], ensure_ascii=False)
+                yield f"event: {event['event']}\ndata: {data}\n\n"
 
-                yield "data: [종료]\n\n"
-
-            except Exception as e:
-                yield f"data: [오류] {str(e)}\n\n"
+        # 동시에 들어온 같은 질문은 하나의 생성 스트림을 함께 구독
+        if settings.single_flight_enabled:
+            key = query_key(request.question, request.user_role.value, request.document_filter, request.top_k)
+            events = get_single_flight().stream(key, generate_streaming_response)
+        else:
+            events = generate_streaming_response()
 
         return StreamingResponse(
-            generate_streaming_response(),
+            events,
             media_type="text/event-stream",
             headers={
                 "Cache-Control": "no-cache",
@@ -187,6 +170,53 @@ async def stream_query_documents(
         )
 
 
+@router.get("/specs", response_model=SpecSearchResponse, summary="사양 수치 범위 검색")
+async def search_specifications(
+    parameter: str = Query(..., min_length=1, max_length=100, description="파라미터 (예: VDD, tCK, 동작 온도)"),
+    min_value: Optional[float] = Query(None, description="조건 하한"),
+    max_value: Optional[float] = Query(None, description="조건 상한"),
+    unit: Optional[str] = Query(None, description="조건 값의 단위 (예: mV, V, MT/s, ℃)"),
+    mode: str = Query("overlap", pattern="^(overlap|within|contains)$", description="범위 비교 방식"),
+    product_family: Optional[str] = Query(None, description="제품군 필터"),
+    product_model: Optional[str] = Query(None, description="제품 모델 필터"),
+    page: int = Query(1, ge=1, description="페이지 번호"),
+    limit: int = Query(50, ge=1, le=500, description="페이지 당 항목 수")
+):
+    """
+    추출된 사양 테이블에서 수치 조건에 맞는 모든 문서의 사양 행을 조회합니다.
+
+    - `VDD 1.05 ~ 1.15 V`: `parameter=VDD&min_value=1.05&max_value=1.15&unit=V`
+    - `동작 온도 ≥ 105℃`: `parameter=operating temperature&min_value=105&unit=℃`
+
+    조건 값은 단위가 정규화되어 비교됩니다 (mV→V, ps→ns, GT/s→MT/s, ℃→°C).
+    """
+    if min_value is not None and max_value is not None and min_value > max_value:
+        raise HTTPException(status_code=400, detail="min_value가 max_value보다 클 수 없습니다.")
+
+    start_time = time.time()
+    try:
+        spec_service = await get_spec_service()
+        result = await spec_service.search_specs(
+            parameter=parameter,
+            min_value=min_value,
+            max_value=max_value,
+            unit=unit,
+            mode=mode,
+            product_family=product_family,
+            product_model=product_model,
+            page=page,
+            limit=limit
+        )
+        return SpecSearchResponse(**result, query_time_ms=int((time.time() - start_time) * 1000))
+
+    except Exception as e:
+        logger.error(f"사양 범위 검색 실패: {e}")
+        raise HTTPException(
+            status_code=500,
+            detail=f"사양 검색 중 오류가 발생했습니다: {str(e)}"
+        )
+
+
 @router.get("/popular", summary="인기 질문 조회")
 async def get_popular_queries(
     limit: int = 10,
@@ -1,18 +1,23 @@
 import os
 import uuid
 from pathlib import Path
-from typing import Optional
+from typing import Dict, Optional
 from fastapi import APIRouter, UploadFile, File, Form, HTTPException, Depends
 from fastapi.responses import JSONResponse
+from sqlalchemy.exc import IntegrityError
 from sqlalchemy.ext.asyncio import AsyncSession
 from loguru import logger
 
-from ..config.database import get_db, Document
+from ..config.database import (
+    get_db, Document, Specification, DocumentSection, DocumentPage, IngestionJob
+)
 from ..config.settings import settings
 from ..models.request_models import DocumentType
 from ..models.response_models import UploadResponse
-from ..services.pdf_service import get_pdf_service
-from ..services.vector_service import get_vector_service
+from ..services.pdf_service import get_pdf_service, UploadTooLargeError
+from ..services.job_queue import get_job_queue
+from ..services.page_store import get_page_store
+from ..services.document_catalog import get_document_catalog
 
 router = APIRouter(prefix="/api/upload", tags=["파일 업로드"])
 
@@ -32,11 +37,14 @@ async def upload_document(
 
     처리 과정:
     1. 파일 검증 및 저장
-    2. PDF 텍스트 추출
-    3. 텍스트 청킹
-    4. 벡터 임베딩 생성
-    5. 데이터베이스 메타데이터 저장
+    2. 콘텐츠 해시 기반 중복 확인 (동일 파일이면 기존 문서 재사용)
+    3. PDF 텍스트 추출
+    4. 텍스트 청킹
+    5. 벡터 임베딩 생성
+    6. 데이터베이스 메타데이터 저장
     """
+    temp_path = None
+    pdf_service = get_pdf_service()
     try:
         # 1. 파일 검증
         if not file.filename.lower().endswith('.pdf'):
@@ -45,20 +53,13 @@ async def upload_document(
                 detail="PDF 파일만 업로드 가능합니다."
             )
 
-        # 파일 크기 검증
-        file_content = await file.read()
-        if len(file_content) > settings.max_file_size:
-            raise HTTPException(
-                status_code=400,
-                detail=f"파일 크기가 너무 큽니다. 최대 {settings.max_file_size // (1024*1024)}MB까지 허용됩니다."
+        # 블록 단위로 임시 파일에 기록하며 해시 계산 (크기 제한을 넘으면 즉시 중단)
+        try:
+            temp_path, content_hash, file_size = await pdf_service.receive_upload(
+                file, settings.max_file_size
             )
-
-        # 2. 문서 ID 생성 및 데이터베이스 저장
-        document_id = str(uuid.uuid4())
-
-        # PDF 서비스로 파일 저장
-        pdf_service = get_pdf_service()
-        file_path = await pdf_service.save_uploaded_file(file_content, file.filename)
+        except UploadTooLargeError as e:
+            raise HTTPException(status_code=400, detail=str(e))
 
         # 폼 데이터 검증 및 정제 (frontend에서 'string' 리터럴 값 보내는 경우 처리)
         def clean_form_value(value: Optional[str]) -> Optional[str]:
@@ -67,40 +68,66 @@ async def upload_document(
                 return None
             return value.strip() if value.strip() else None
 
+        metadata = {
+            "product_family": clean_form_value(product_family),
+            "product_model": clean_form_value(product_model),
+            "version": clean_form_value(version),
+        }
+
+        # 2. 콘텐츠 해시로 중복 업로드 확인
+        existing = await _find_document_by_hash(db, content_hash)
+        if existing:
+            pdf_service.discard_upload(temp_path)
+            temp_path = None
+            return await _reuse_document(db, existing, file.filename, file_size, metadata)
+
+        # 3. 문서 ID 생성 및 데이터베이스 저장
+        document_id = str(uuid.uuid4())
+
+        # 임시 파일을 최종 경로로 원자적 이름 변경
+        file_path = await pdf_service.commit_upload(temp_path, file.filename, content_hash)
+        temp_path = None
+
         # 데이터베이스에 문서 정보 저장
         document = Document(
             id=document_id,
             filename=Path(file_path).name,
             original_name=file.filename,
             file_path=file_path,
-            file_size=len(file_content),
+            file_size=file_size,
             document_type=document_type.value,
-            product_family=clean_form_value(product_family),
-            product_model=clean_form_value(product_model),
-            version=clean_form_value(version),
             language=language,
-            processing_status="processing"
+            processing_status="pending",
+            content_hash=content_hash,
+            **metadata
         )
 
         db.add(document)
-        await db.commit()
-
-        logger.info(f"문서 업로드 시작: {document_id}")
-
-        # 3. 개선된 비동기 처리 시작 (백그라운드에서 실행)
-        import asyncio
-        vector_service = await get_vector_service()
-        asyncio.create_task(
-            pdf_service.process_pdf_background(file_path, document_id, vector_service)
-        )
+        try:
+            await db.commit()
+        except IntegrityError:
+            # 동일 파일이 동시에 업로드되어 다른 요청이 먼저 문서를 등록함 (content_hash 고유 색인)
+            await db.rollback()
+            existing = await _find_document_by_hash(db, content_hash)
+            if existing is None:
+                raise
+            if existing.file_path != file_path:
+                pdf_service.discard_upload(Path(file_path))
+            return await _reuse_document(db, existing, file.filename, file_size, metadata)
+        await get_document_catalog().document_changed(document_id)
+
+        # 4. 영속 작업 큐에 처리 작업 등록 (워커 풀이 순서대로 처리)
+        await get_job_queue().enqueue(document_id, file_path, file_size)
+
+        logger.info(f"문서 업로드 완료, 처리 대기열 등록: {document_id}")
 
         return UploadResponse(
             document_id=document_id,
-            status="processing",
-            message="파일이 성공적으로 업로드되었습니다. 처리가 진행 중입니다.",
+            status="pending",
+            message="파일이 성공적으로 업로드되었습니다. 처리 대기열에 등록되었습니다.",
             file_info={
                 "filename": file.filename,
-                "size_mb": round(len(file_content) / (1024*1024), 2),
+                "size_mb": round(file_size / (1024*1024), 2),
                 "type": document_type.value
             }
         )
@@ -113,58 +140,71 @@ async def upload_document(
             status_code=500,
             detail=f"파일 업로드 중 오류가 발생했습니다: {str(e)}"
         )
+    finally:
+        if temp_path is not None:
+            pdf_service.discard_upload(temp_path)
 
 
-async def process_document_background(document_id: str, file_path: str):
-    """백그라운드에서 문서 처리"""
-    try:
-        logger.info(f"백그라운드 문서 처리 시작: {document_id}")
+async def _find_document_by_hash(db: AsyncSession, content_hash: str) -> Optional[Document]:
+    """같은 콘텐츠 해시를 가진 재사용 가능한 문서 조회 (실패한 문서는 제외)"""
+    from sqlalchemy import select
 
-        # PDF 서비스로 텍스트 추출 및 청킹
-        pdf_service = get_pdf_service()
-        chunks, metadata = await pdf_service.process_pdf_file(file_path, document_id)
+    result = await db.execute(
+        select(Document)
+        .where(
+            Document.content_hash == content_hash,
+            Document.processing_status != "failed"
+        )
+        .order_by(Document.created_at)
+        .limit(1)
+    )
+    return result.scalar_one_or_none()
 
-        logger.info(f"PDF 처리 완료: {len(chunks)}개 청크 생성")
 
-        # 벡터 서비스로 임베딩 생성 및 저장
-        vector_service = await get_vector_service()
-        success = await vector_service.add_documents(chunks, "default")
-
-        # 데이터베이스 상태 업데이트
-        async with get_db().__anext__() as db:
-            from sqlalchemy import select, update
-
-            # 문서 상태 업데이트
-            await db.execute(
-                update(Document)
-                .where(Document.id == document_id)
-                .values(
-                    processing_status="completed" if success else "failed",
-                    page_count=metadata.get("page_count", 0)
-                )
-            )
-            await db.commit()
-
-        if success:
-            logger.info(f"문서 처리 완료: {document_id}")
-        else:
-            logger.error(f"문서 처리 실패: {document_id}")
+async def _reuse_document(db: AsyncSession, existing: Document, filename: str, file_size: int,
+                          metadata: Dict[str, Optional[str]]) -> UploadResponse:
+    """이미 처리된(또는 처리 중인) 동일 파일: 새 메타데이터만 기존 문서에 연결하고 재사용 응답 반환"""
+    if _attach_metadata(existing, **metadata):
+        await db.commit()
+        await get_document_catalog().document_changed(existing.id)
+
+    logger.info(f"중복 업로드 감지 - 기존 문서 재사용: {existing.id}")
+
+    return UploadResponse(
+        document_id=existing.id,
+        status=existing.processing_status,
+        message="동일한 파일이 이미 업로드되어 있어 기존 처리 결과를 재사용합니다.",
+        file_info={
+            "filename": filename,
+            "size_mb": round(file_size / (1024*1024), 2),
+            "type": existing.document_type
+        },
+        deduplicated=True
+    )
+
+
+def _attach_metadata(document: Document, **values: Optional[str]) -> bool:
+    """기존 문서에 비어 있는 메타데이터 필드만 채움"""
+    changed = False
+    for field, value in values.items():
+        if value and not getattr(document, field):
+            setattr(document, field, value)
+            changed = True
+    return changed
+
+
+@router.get("/status", summary="처리 대기열 상태 확인")
+async def get_queue_status():
+    """문서 처리 대기열의 길이와 최근 처리량을 확인합니다."""
+    try:
+        return await get_job_queue().get_queue_stats()
 
     except Exception as e:
-        logger.error(f"백그라운드 문서 처리 실패 ({document_id}): {e}")
-
-        # 오류 상태로 업데이트
-        try:
-            async with get_db().__anext__() as db:
-                from sqlalchemy import update
-                await db.execute(
-                    update(Document)
-                    .where(Document.id == document_id)
-                    .values(processing_status="failed")
-                )
-                await db.commit()
-        except Exception as update_error:
-            logger.error(f"상태 업데이트 실패: {update_error}")
+        logger.error(f"대기열 상태 조회 실패: {e}")
+        raise HTTPException(
+            status_code=500,
+            detail="대기열 상태를 조회하는 중 오류가 발생했습니다."
+        )
 
 
 @router.get("/status/{document_id}", summary="문서 처리 상태 확인")
@@ -187,12 +227,17 @@ async def get_document_status(
                 detail="문서를 찾을 수 없습니다."
             )
 
+        job_queue = get_job_queue()
+        job_status = await job_queue.get_job_status(document_id)
+
         return {
             "document_id": document.id,
             "filename": document.original_name,
             "status": document.processing_status,
             "upload_date": document.upload_date,
-            "page_count": document.page_count
+            "page_count": document.page_count,
+            "job": job_status,
+            "queue": await job_queue.get_queue_stats()
         }
 
     except HTTPException:
@@ -234,11 +279,17 @@ async def delete_document(
         except Exception as e:
             logger.warning(f"파일 삭제 실패: {e}")
 
-        # 벡터 청크 삭제
-        from ..config.database import VectorChunk
-        await db.execute(
-            delete(VectorChunk).where(VectorChunk.document_id == document_id)
-        )
+        # 벡터 인덱스/청크 메타데이터와 페이지 저장소에서 삭제
+        from ..services.vector_service import get_vector_service
+        vector_service = await get_vector_service()
+        if await vector_service.delete_document_vectors(document_id):
+            await vector_service.save_index()
+        get_page_store().delete(document_id)
+
+        # 사양/섹션/페이지 행과 처리 작업을 문서와 같은 트랜잭션에서 삭제 (외래 키 cascade 없음)
+        # 실행 중인 작업은 다음 하트비트에서 리스 상실로 처리되어 중단됨
+        for model in (Specification, DocumentSection, DocumentPage, IngestionJob):
+            await db.execute(delete(model).where(model.document_id == document_id))
 
         # 문서 삭제
         await db.execute(
@@ -246,6 +297,7 @@ async def delete_document(
         )
 
         await db.commit()
+        await get_document_catalog().document_removed(document_id)
 
         logger.info(f"문서 삭제 완료: {document_id}")
 
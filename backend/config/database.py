@@ -1,6 +1,8 @@
 from sqlalchemy.ext.asyncio import create_async_engine, AsyncSession, async_sessionmaker
 from sqlalchemy.orm import DeclarativeBase
-from sqlalchemy import Column, Integer, String, Text, DateTime, Float, Boolean
+from sqlalchemy import Column, Integer, String, Text, DateTime, Float, Boolean, Index, event, inspect, text
+from sqlalchemy.exc import IntegrityError
+from loguru import logger
 from datetime import datetime
 from .settings import settings
 
@@ -11,6 +13,27 @@ engine = create_async_engine(
     future=True
 )
 
+
+@event.listens_for(engine.sync_engine, "connect")
+def _set_sqlite_pragmas(dbapi_connection, connection_record):
+    """SQLite 연결마다 운영 프로필 적용
+
+    WAL 저널과 synchronous=NORMAL로 쓰기 중에도 읽기가 가능하고 커밋당 fsync가 줄며,
+    busy_timeout으로 작업 큐 워커와 API가 동시에 쓸 때 즉시 "database is locked"가
+    나는 대신 잠시 기다립니다. mmap과 페이지 캐시는 목록/통계 조회의 읽기 비용을 줄입니다.
+    """
+    if not settings.database_url.startswith("sqlite"):
+        return
+    cursor = dbapi_connection.cursor()
+    cursor.execute("PRAGMA journal_mode=WAL")
+    cursor.execute("PRAGMA synchronous=NORMAL")
+    cursor.execute(f"PRAGMA busy_timeout={int(settings.sqlite_busy_timeout_ms)}")
+    cursor.execute(f"PRAGMA mmap_size={int(settings.sqlite_mmap_size)}")
+    # 음수는 KiB 단위 (양수는 페이지 수)
+    cursor.execute(f"PRAGMA cache_size={-int(settings.sqlite_cache_size_kb)}")
+    cursor.execute("PRAGMA temp_store=MEMORY")
+    cursor.close()
+
 # Create session factory
 AsyncSessionLocal = async_sessionmaker(
     engine, class_=AsyncSession, expire_on_commit=False
@@ -29,21 +52,22 @@ class Document(Base):
     file_path = Column(String(500), nullable=False)
     file_size = Column(Integer)
     upload_date = Column(DateTime, default=datetime.utcnow)
-    document_type = Column(String(100))  # datasheet, manual, specification
-    product_family = Column(String(100))
+    document_type = Column(String(100), index=True)  # datasheet, manual, specification
+    product_family = Column(String(100), index=True)
     product_model = Column(String(100))
     version = Column(String(50))
     language = Column(String(10), default='ko')
     page_count = Column(Integer)
-    processing_status = Column(String(50), default='pending')  # pending, processing, completed, failed
-    created_at = Column(DateTime, default=datetime.utcnow)
+    processing_status = Column(String(50), default='pending', index=True)  # pending, processing, completed, failed
+    content_hash = Column(String(64), index=True)  # SHA-256 of the uploaded file
+    created_at = Column(DateTime, default=datetime.utcnow, index=True)
     updated_at = Column(DateTime, default=datetime.utcnow, onupdate=datetime.utcnow)
 
 class DocumentSection(Base):
     __tablename__ = "document_sections"
 
     id = Column(Integer, primary_key=True, autoincrement=True)
-    document_id = Column(String(255), nullable=False)
+    document_id = Column(String(255), nullable=False, index=True)
     section_title = Column(String(255))
     section_type = Column(String(100))  # overview, specifications, electrical, mechanical, environmental
     page_number = Column(Integer)
@@ -52,13 +76,25 @@ class DocumentSection(Base):
     content_preview = Column(Text)
     created_at = Column(DateTime, default=datetime.utcnow)
 
+class DocumentPage(Base):
+    __tablename__ = "document_pages"
+
+    id = Column(Integer, primary_key=True, autoincrement=True)
+    document_id = Column(String(255), nullable=False, index=True)
+    page_number = Column(Integer)
+    text_hash = Column(String(64))  # SHA-256 of the normalized page text
+    chunk_count = Column(Integer)
+    reused = Column(Boolean, default=False)  # vectors carried over from the previous revision
+    created_at = Column(DateTime, default=datetime.utcnow)
+
 class Specification(Base):
     __tablename__ = "specifications"
 
     id = Column(Integer, primary_key=True, autoincrement=True)
-    document_id = Column(String(255), nullable=False)
+    document_id = Column(String(255), nullable=False, index=True)
     section_id = Column(Integer)
     parameter_name = Column(String(255))
+    parameter_key = Column(String(100), index=True)  # 표준 파라미터 키 (vdd, tck 등)
     parameter_value = Column(String(255))
     unit = Column(String(50))
     condition_text = Column(Text)
@@ -70,6 +106,7 @@ class Specification(Base):
 
 class VectorChunk(Base):
     __tablename__ = "vector_chunks"
+    __table_args__ = (Index("ix_vector_chunks_document_chunk", "document_id", "chunk_index"),)
 
     id = Column(Integer, primary_key=True, autoincrement=True)
     document_id = Column(String(255), nullable=False)
@@ -85,13 +122,49 @@ class QueryLog(Base):
     __tablename__ = "query_logs"
 
     id = Column(Integer, primary_key=True, autoincrement=True)
-    user_role = Column(String(50))
+    user_role = Column(String(50), index=True)
     query_text = Column(Text)
     response_text = Column(Text)
     retrieved_documents = Column(Text)  # JSON array of document IDs
     response_time_ms = Column(Integer)
+    confidence = Column(Float)
+    model_used = Column(String(100))  # spec-table, N/A (no results), error for non-LLM answers
+    source_count = Column(Integer)
+    cached = Column(Boolean, default=False)  # served from the answer cache
+    prompt_tokens = Column(Integer)
+    stage_timings = Column(Text)  # JSON object: stage name -> milliseconds
     rating = Column(Integer)  # 1-5 user feedback
+    created_at = Column(DateTime, default=datetime.utcnow, index=True)
+
+class IngestionJob(Base):
+    __tablename__ = "ingestion_jobs"
+    __table_args__ = (Index("ix_ingestion_jobs_claim", "status", "priority"),)
+
+    id = Column(Integer, primary_key=True, autoincrement=True)
+    document_id = Column(String(255), nullable=False, index=True)
+    file_path = Column(String(500), nullable=False)
+    file_size = Column(Integer)
+    priority = Column(Integer, default=1)  # lower runs first (0 = small file)
+    mode = Column(String(20), default='full')  # full: extract from PDF, rechunk: reuse stored pages
+    status = Column(String(50), default='queued', index=True)  # queued, running, completed, failed
+    attempts = Column(Integer, default=0)
+    max_attempts = Column(Integer, default=3)
+    lease_owner = Column(String(100))
+    lease_expires_at = Column(DateTime)
+    heartbeat_at = Column(DateTime)
+    available_at = Column(DateTime, default=datetime.utcnow)  # not claimable before (retry backoff)
+    last_error = Column(Text)
+    page_count = Column(Integer)
+    chunk_count = Column(Integer)
     created_at = Column(DateTime, default=datetime.utcnow)
+    started_at = Column(DateTime)
+    finished_at = Column(DateTime)
+
+class CacheVersion(Base):
+    __tablename__ = "cache_versions"
+
+    name = Column(String(100), primary_key=True)  # e.g. documents
+    version = Column(Integer, default=0, nullable=False)  # bumped on every change, polled by other processes
 
 # Dependency to get DB session
 async def get_db():
@@ -101,7 +174,79 @@ async def get_db():
         finally:
             await session.close()
 
+# Lightweight migrations for databases created before a column/index existed
+# (create_all only creates missing tables, it never alters existing ones)
+COLUMN_MIGRATIONS = [
+    # (table, column, DDL type)
+    ("documents", "content_hash", "VARCHAR(64)"),
+    ("specifications", "parameter_key", "VARCHAR(100)"),
+    ("ingestion_jobs", "mode", "VARCHAR(20) DEFAULT 'full'"),
+    ("query_logs", "confidence", "FLOAT"),
+    ("query_logs", "model_used", "VARCHAR(100)"),
+    ("query_logs", "source_count", "INTEGER"),
+    ("query_logs", "cached", "BOOLEAN DEFAULT 0"),
+    ("query_logs", "prompt_tokens", "INTEGER"),
+    ("query_logs", "stage_timings", "TEXT"),
+]
+
+INDEX_MIGRATIONS = [
+    # (index name, table, columns)
+    ("ix_documents_content_hash", "documents", "content_hash"),
+    ("ix_specifications_parameter_key", "specifications", "parameter_key"),
+    ("ix_specifications_document_id", "specifications", "document_id"),
+    ("ix_specifications_param_range", "specifications", "parameter_key, min_value, max_value"),
+    # 목록(필터 + created_at 정렬), 통계(타입별 집계), 상태 조회
+    ("ix_documents_created_at", "documents", "created_at"),
+    ("ix_documents_document_type", "documents", "document_type"),
+    ("ix_documents_product_family", "documents", "product_family"),
+    ("ix_documents_processing_status", "documents", "processing_status"),
+    ("ix_document_sections_document_id", "document_sections", "document_id"),
+    ("ix_vector_chunks_document_chunk", "vector_chunks", "document_id, chunk_index"),
+    # /api/debug/performance 와 질의 통계의 기간/역할별 집계
+    ("ix_query_logs_created_at", "query_logs", "created_at"),
+    ("ix_query_logs_user_role", "query_logs", "user_role"),
+    ("ix_ingestion_jobs_claim", "ingestion_jobs", "status, priority"),
+]
+
+UNIQUE_INDEX_MIGRATIONS = [
+    # (index name, table, columns, partial index condition)
+    # 동일 파일이 동시에 업로드되어도 문서는 하나만 생성 (실패한 문서는 재업로드 허용)
+    ("uq_documents_content_hash_active", "documents", "content_hash", "processing_status != 'failed'"),
+]
+
+def _run_migrations(sync_conn):
+    inspector = inspect(sync_conn)
+    tables = set(inspector.get_table_names())
+
+    for table, column, ddl_type in COLUMN_MIGRATIONS:
+        if table not in tables:
+            continue
+        existing = {col["name"] for col in inspector.get_columns(table)}
+        if column not in existing:
+            sync_conn.execute(text(f"ALTER TABLE {table} ADD COLUMN {column} {ddl_type}"))
+
+    for index_name, table, columns in INDEX_MIGRATIONS:
+        if table in tables:
+            sync_conn.execute(text(f"CREATE INDEX IF NOT EXISTS {index_name} ON {table} ({columns})"))
+
+    for index_name, table, columns, condition in UNIQUE_INDEX_MIGRATIONS:
+        if table not in tables:
+            continue
+        try:
+            with sync_conn.begin_nested():
+                sync_conn.execute(text(
+                    f"CREATE UNIQUE INDEX IF NOT EXISTS {index_name} ON {table} ({columns}) WHERE {condition}"
+                ))
+        except IntegrityError:
+            # 색인 도입 전에 생긴 중복 행이 있으면 정리될 때까지 고유 색인 없이 동작
+            logger.warning(f"중복 행이 있어 고유 색인을 만들지 못했습니다: {index_name} ({table}.{columns})")
+
+    if sync_conn.dialect.name == "sqlite":
+        # 새로 만든 색인의 통계를 갱신해 플래너가 색인을 선택하도록 함 (변경이 없으면 거의 즉시 끝남)
+        sync_conn.execute(text("PRAGMA optimize"))
+
 # Initialize database
 async def init_database():
     async with engine.begin() as conn:
-        await conn.run_sync(Base.metadata.create_all)
\ No newline at end of file
+        await conn.run_sync(Base.metadata.create_all)
+        await conn.run_sync(_run_migrations)
\ No newline at end of file
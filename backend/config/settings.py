@@ -14,28 +14,90 @@ class Settings(BaseSettings):
 
     # Database
     database_url: str = "sqlite+aiosqlite:///./data/metadata.db"
+    sqlite_busy_timeout_ms: int = 5000  # 다른 연결이 쓰는 중일 때 잠금 대기 시간
+    sqlite_mmap_size: int = 256 * 1024 * 1024  # 메모리 맵 읽기 크기 (0이면 사용 안 함)
+    sqlite_cache_size_kb: int = 64 * 1024  # 연결당 페이지 캐시 크기
 
     # Ollama
     ollama_host: str = "http://localhost:11434"
     ollama_model: str = "qwen2:0.5b"
     ollama_timeout: int = 120
+    ollama_keep_alive: str = "30m"  # 모델을 메모리에 유지할 시간 (프롬프트 앞부분 KV 캐시 재사용)
 
     # Vector Database
     vector_db_path: str = "./data/vectordb"
     embedding_model: str = "BAAI/bge-m3"
-    chunk_size: int = 1000
+    chunk_size: int = 1000  # 문자 기준 (기존 분할기, 벤치마크 비교용)
     chunk_overlap: int = 200
+    chunk_tokens: int = 256  # 청크당 최대 토큰 수
+    chunk_overlap_tokens: int = 48
+    chunk_tokenizer: str = ""  # 비어 있으면 embedding_model의 토크나이저 사용
 
     # File Storage
     upload_path: str = "./data/uploads"
     processed_path: str = "./data/processed"
     max_file_size: int = 100 * 1024 * 1024  # 100MB
     allowed_extensions: list = [".pdf"]
+    page_store_compression_level: int = 3  # 처리 텍스트 페이지 저장소 압축 수준 (zstd, 없으면 zlib)
+
+    # PDF Extraction
+    pdf_extract_workers: int = 0  # 0이면 CPU 코어 수만큼 프로세스 사용
+    pdf_pages_per_shard: int = 16
+    table_extractor: str = "pypdf"  # pypdf: 텍스트 좌표 기반, pdfplumber: 설치된 경우 사용
+
+    # Spec Fast Path
+    spec_fast_path_enabled: bool = True  # 사양 테이블로 답할 수 있는 질문은 LLM 생략
+    spec_fast_path_confidence: float = 0.95
+
+    # Ingestion Pipeline
+    ingestion_queue_size: int = 8  # 단계 사이 큐 크기 (백프레셔)
+    embedding_batch_size: int = 32
+
+    # Ingestion Job Queue
+    ingestion_worker_mode: str = "inprocess"  # inprocess: API 프로세스에서 실행, external: python -m backend.worker
+    ingestion_workers: int = 2  # 동시에 처리할 문서 수
+    ingestion_lease_seconds: int = 120
+    ingestion_max_attempts: int = 3
+    ingestion_retry_backoff_seconds: int = 30  # 재시도마다 2배씩 증가
+    ingestion_small_file_bytes: int = 5 * 1024 * 1024  # 이보다 작은 파일 우선 처리
+    ingestion_poll_interval: float = 2.0
 
     # RAG Settings
     max_context_length: int = 4000
     top_k_retrieval: int = 5
     temperature: float = 0.1
+    context_token_budget: int = 1200  # LLM 컨텍스트(검색 구절 + 제목 줄) 최대 토큰 수
+    context_tokenizer: str = "Qwen/Qwen2-0.5B-Instruct"  # OLLAMA_MODEL과 같은 계열의 HF 토크나이저 (없으면 근사치)
+    context_compression_enabled: bool = True  # 질의와 관련 높은 문장만 남겨 프롬프트 축소
+    context_compression_ratio: float = 0.5  # 남길 토큰 비율
+    context_compression_min_tokens: int = 400  # 이 토큰 수 이하의 컨텍스트는 압축하지 않음
+    context_compression_cache_size: int = 20000  # 문장 단위 임베딩 캐시 항목 수
+    context_compression_timeout: float = 5.0  # 문장 임베딩 대기 시간 (초과하면 압축 없이 진행)
+
+    # Document Catalog
+    document_catalog_sync_interval: float = 2.0  # 다른 프로세스(워커)의 문서 변경 확인 주기 (초)
+
+    # Query Logging
+    query_log_batch_size: int = 100  # 이 건수가 모이면 바로 기록
+    query_log_flush_interval_ms: int = 500  # 최대 기록 지연
+    query_log_max_pending: int = 10000  # 기록 대기 한도 (넘으면 오래된 로그부터 버림)
+
+    # Latency Tracing
+    server_timing_enabled: bool = True  # 질의 단계별 소요 시간을 Server-Timing 응답 헤더로 전달
+
+    # Prometheus Metrics (prometheus_client 설치 시)
+    metrics_enabled: bool = True  # /metrics 엔드포인트와 지표 기록
+    metrics_refresh_interval: float = 15.0  # 문서 처리 작업 수(DB 조회) 갱신 최소 간격 (초)
+    prometheus_multiproc_dir: str = ""  # 다중 워커 실행 시 프로세스 간 지표 공유 디렉토리 (시작 전 비워야 함)
+
+    # Query Coalescing
+    single_flight_enabled: bool = True  # 동시에 들어온 같은 질의는 한 번만 실행하고 결과 공유
+
+    # Answer Cache
+    answer_cache_enabled: bool = True  # 같은/비슷한 질문은 검색과 LLM 생성 없이 저장된 응답 반환
+    answer_cache_size: int = 512
+    answer_cache_ttl_seconds: int = 3600
+    answer_cache_similarity: float = 0.95  # 질의 임베딩 코사인 유사도 기준
 
     # Logging
     log_level: str = "INFO"
@@ -0,0 +1,206 @@
+"""디렉터리 일괄 수집 CLI
+
+디렉터리 아래의 PDF를 모두 문서 처리 작업 큐에 등록하고 끝까지 처리합니다.
+이미 수집된 파일(콘텐츠 해시 기준)은 건너뛰며, 진행 상황은 작업 큐 테이블에
+기록되므로 중간에 중단되어도 다시 실행하면 남은 파일부터 이어서 처리합니다.
+
+    python -m backend.ingest data/ --workers 4
+"""
+import argparse
+import asyncio
+import hashlib
+import shutil
+import sys
+import time
+import uuid
+from pathlib import Path
+from typing import Dict, Any, List, Tuple
+
+from loguru import logger
+
+# 프로젝트 루트를 Python path에 추가
+project_root = Path(__file__).parent.parent
+sys.path.insert(0, str(project_root))
+
+from backend.config.settings import settings
+from backend.config.database import init_database, AsyncSessionLocal, Document, IngestionJob
+from backend.services.job_queue import get_job_queue, IngestionWorkerPool
+from backend.services.pdf_service import get_pdf_service, shutdown_extraction_pool
+from backend.services.document_catalog import get_document_catalog
+
+
+def hash_file(file_path: Path, block_size: int = 1024 * 1024) -> str:
+    """파일을 블록 단위로 읽어 SHA-256 계산"""
+    digest = hashlib.sha256()
+    with open(file_path, "rb") as f:
+        for block in iter(lambda: f.read(block_size), b""):
+            digest.update(block)
+    return digest.hexdigest()
+
+
+async def register_file(file_path: Path, options: argparse.Namespace) -> Tuple[str, str]:
+    """파일 하나를 작업 큐에 등록하고 (결과, 문서 ID) 반환 (결과: queued, resumed, skipped)"""
+    from sqlalchemy import select
+
+    content_hash = hash_file(file_path)
+    queue = get_job_queue()
+
+    async with AsyncSessionLocal() as session:
+        document = (await session.execute(
+            select(Document)
+            .where(Document.content_hash == content_hash)
+            # 실패하지 않은 문서가 있으면 우선 (실패 문서를 되살리면 content_hash 고유 색인과 충돌)
+            .order_by(Document.processing_status == "failed", Document.created_at)
+            .limit(1)
+        )).scalar_one_or_none()
+
+        if document and document.processing_status == "completed":
+            return "skipped", document.id
+
+        if document:
+            # 이전 실행에서 등록된 문서: 진행 중인 작업이 없을 때만 다시 등록
+            active_job = (await session.execute(
+                select(IngestionJob.id).where(
+                    IngestionJob.document_id == document.id,
+                    IngestionJob.status.in_(["queued", "running"])
+                ).limit(1)
+            )).scalar_one_or_none()
+            if active_job:
+                return "resumed", document.id
+
+            document.processing_status = "pending"
+            await session.commit()
+            await get_document_catalog().document_changed(document.id)
+            await queue.enqueue(document.id, document.file_path, document.file_size)
+            return "resumed", document.id
+
+        pdf_service = get_pdf_service()
+        stored_path = pdf_service.upload_path / f"{content_hash}_{file_path.name}"
+        if not stored_path.exists():
+            shutil.copyfile(file_path, stored_path)
+
+        document = Document(
+            id=str(uuid.uuid4()),
+            filename=stored_path.name,
+            original_name=file_path.name,
+            file_path=str(stored_path),
+            file_size=stored_path.stat().st_size,
+            document_type=options.document_type,
+            product_family=options.product_family,
+            product_model=options.product_model,
+            language=options.language,
+            processing_status="pending",
+            content_hash=content_hash
+        )
+        session.add(document)
+        await session.commit()
+
+    await get_document_catalog().document_changed(document.id)
+    await queue.enqueue(document.id, document.file_path, document.file_size)
+    return "queued", document.id
+
+
+def print_report(stats: List[Dict[str, Any]], counts: Dict[str, int], elapsed: float):
+    """처리량과 단계별 소요 시간 출력"""
+    pages = sum(s.get("pages", 0) for s in stats)
+    chunks = sum(s.get("chunks", 0) for s in stats)
+    reused = sum(s.get("reused_chunks", 0) for s in stats)
+    stage_times = {
+        stage: sum(s.get(f"{stage}_time", 0.0) for s in stats)
+        for stage in ("extract", "chunk", "embed", "index")
+    }
+
+    print()
+    print("=" * 60)
+    print("📊 일괄 수집 결과")
+    print("=" * 60)
+    print(f"  신규 등록: {counts['queued']}개, 이어서 처리: {counts['resumed']}개, "
+          f"건너뜀(수집 완료): {counts['skipped']}개, 중복 파일: {counts['duplicate']}개")
+    print(f"  처리 완료 문서: {len(stats)}개, 페이지: {pages}, 청크: {chunks} (재사용 {reused})")
+    print(f"  전체 소요 시간: {elapsed:.2f}s")
+    if elapsed > 0:
+        print(f"  처리량: {pages / elapsed:.2f} pages/s, {chunks / elapsed:.2f} chunks/s")
+    print("  단계별 누적 시간 (문서 병렬 처리로 전체 시간보다 클 수 있음):")
+    for stage, seconds in stage_times.items():
+        print(f"    - {stage:<8} {seconds:8.2f}s")
+    embedded = chunks - reused
+    if embedded and stage_times["embed"] > 0:
+        print(f"  임베딩: {embedded / stage_times['embed']:.2f} chunks/s "
+              f"(배치 크기 {settings.embedding_batch_size})")
+    print("=" * 60)
+
+
+async def run_ingest(options: argparse.Namespace) -> int:
+    await init_database()
+
+    Path(settings.upload_path).mkdir(parents=True, exist_ok=True)
+    Path(settings.processed_path).mkdir(parents=True, exist_ok=True)
+    Path(settings.vector_db_path).mkdir(parents=True, exist_ok=True)
+
+    root = Path(options.directory)
+    pattern = "**/*.pdf" if options.recursive else "*.pdf"
+    files = sorted(p for p in root.glob(pattern) if p.is_file())
+    if not files:
+        logger.warning(f"PDF 파일이 없습니다: {root}")
+        return 0
+
+    counts = {"queued": 0, "resumed": 0, "skipped": 0, "duplicate": 0}
+    pending_ids = set()
+    for file_path in files:
+        result, document_id = await register_file(file_path, options)
+        if result != "skipped" and document_id in pending_ids:
+            result = "duplicate"  # 같은 실행 안에서 내용이 같은 파일
+        elif result != "skipped":
+            pending_ids.add(document_id)
+        counts[result] += 1
+        logger.info(f"{result:>9}: {file_path}")
+
+    start_time = time.time()
+    pool = IngestionWorkerPool(get_job_queue(), concurrency=options.workers)
+    try:
+        await pool.run_until_empty()
+    finally:
+        shutdown_extraction_pool()
+
+    print_report(pool.completed_stats, counts, time.time() - start_time)
+
+    # 등록한 문서 중 완료되지 못한 것이 있으면 실패 종료 코드
+    completed_ids = {stats["document_id"] for stats in pool.completed_stats}
+    return 0 if pending_ids <= completed_ids else 1
+
+
+def main():
+    parser = argparse.ArgumentParser(description="디렉터리의 PDF 일괄 수집")
+    parser.add_argument("directory", help="PDF가 들어 있는 디렉터리")
+    parser.add_argument(
+        "--workers", type=int, default=settings.ingestion_workers,
+        help="동시에 처리할 문서 수"
+    )
+    parser.add_argument(
+        "--extract-workers", type=int, default=settings.pdf_extract_workers,
+        help="PDF 추출 프로세스 수 (0이면 CPU 코어 수)"
+    )
+    parser.add_argument(
+        "--batch-size", type=int, default=settings.embedding_batch_size,
+        help="임베딩 배치 크기"
+    )
+    parser.add_argument("--recursive", action="store_true", help="하위 디렉터리까지 포함")
+    parser.add_argument("--document-type", default="datasheet", help="문서 타입")
+    parser.add_argument("--product-family", default=None, help="제품군")
+    parser.add_argument("--product-model", default=None, help="제품 모델")
+    parser.add_argument("--language", default="ko", help="언어")
+    options = parser.parse_args()
+
+    settings.pdf_extract_workers = options.extract_workers
+    settings.embedding_batch_size = options.batch_size
+
+    logger.info(f"🚀 일괄 수집 시작: {options.directory} (문서 동시 처리 {options.workers}개)")
+    try:
+        sys.exit(asyncio.run(run_ingest(options)))
+    except KeyboardInterrupt:
+        logger.info("⏸️ 중단됨 - 다시 실행하면 남은 작업부터 이어서 처리합니다.")
+        sys.exit(130)
+
+
+if __name__ == "__main__":
+    main()
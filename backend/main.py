@@ -15,7 +15,9 @@ sys.path.insert(0, str(project_root))
 
 from backend.config.settings import settings
 from backend.config.database import init_database
-from backend.api import upload, query, management, selftest, debug
+from backend.api import upload, query, management, selftest, debug, metrics
+from backend.services.latency_tracker import ServerTimingMiddleware
+from backend.services.metrics import MetricsMiddleware, mark_process_dead
 
 
 # 로깅 설정
@@ -57,6 +59,15 @@ async def lifespan(app: FastAPI):
         await init_database()
         logger.info("✅ 데이터베이스 초기화 완료")
 
+        # 문서 카탈로그 로드 (질의 경로의 문서 메타데이터 조회를 메모리에서 처리)
+        from backend.services.document_catalog import get_document_catalog
+        await get_document_catalog().start()
+        logger.info("✅ 문서 카탈로그 로드 완료")
+
+        # 질의 로그 일괄 기록 시작 (요청 처리 중에는 버퍼에만 추가)
+        from backend.services.query_log_writer import get_query_log_writer
+        get_query_log_writer().start()
+
         # 필요한 디렉토리 생성
         Path(settings.upload_path).mkdir(parents=True, exist_ok=True)
         Path(settings.processed_path).mkdir(parents=True, exist_ok=True)
@@ -96,6 +107,16 @@ async def lifespan(app: FastAPI):
         except Exception as e:
             logger.error(f"❌ 벡터 서비스 초기화 실패: {e}")
 
+        # 문서 처리 워커 풀 시작 (external 모드에서는 python -m backend.worker 가 처리)
+        worker_pool = None
+        if settings.ingestion_worker_mode == "inprocess":
+            from backend.services.job_queue import get_job_queue, IngestionWorkerPool
+            worker_pool = IngestionWorkerPool(get_job_queue())
+            await worker_pool.start()
+            logger.info(f"✅ 문서 처리 워커 풀 시작 ({worker_pool.concurrency}개)")
+        else:
+            logger.info("ℹ️ 문서 처리는 외부 워커(python -m backend.worker)에서 수행됩니다")
+
         logger.info("🎉 모든 서비스 초기화 완료")
 
         # 시작 메시지
@@ -113,15 +134,35 @@ async def lifespan(app: FastAPI):
     # 종료 시 정리
     logger.info("🛑 시스템 종료 중...")
 
+    if worker_pool is not None:
+        # 처리 중이던 작업은 리스 만료 후 다음 실행 시 재개됨
+        await worker_pool.stop()
+
+    await get_document_catalog().stop()
+
+    # 버퍼에 남은 질의 로그를 모두 기록한 뒤 종료
+    await get_query_log_writer().stop()
+
     try:
         # 임시 파일 정리
         from backend.services.pdf_service import get_pdf_service
         pdf_service = get_pdf_service()
-        pdf_service.cleanup_temp_files(older_than_hours=0)  # 모든 임시 파일 정리
+        pdf_service.cleanup_temp_files()  # 오래된 임시 파일만 정리 (페이지 저장소는 유지)
         logger.info("✅ 임시 파일 정리 완료")
     except Exception as e:
         logger.error(f"❌ 정리 작업 실패: {e}")
 
+    try:
+        # PDF 추출 프로세스 풀 종료
+        from backend.services.pdf_service import shutdown_extraction_pool
+        shutdown_extraction_pool()
+        logger.info("✅ PDF 추출 프로세스 풀 종료")
+    except Exception as e:
+        logger.error(f"❌ 프로세스 풀 종료 실패: {e}")
+
+    # 다중 워커 모드에서 이 프로세스의 live 게이지 정리
+    mark_process_dead()
+
     logger.info("👋 시스템 종료 완료")
 
 
@@ -157,14 +198,22 @@ app.add_middleware(
     allow_credentials=True,
     allow_methods=["*"],
     allow_headers=["*"],
+    expose_headers=["Server-Timing"],
 )
 
+# 질의 단계별 소요 시간 응답 헤더 (Server-Timing)
+app.add_middleware(ServerTimingMiddleware)
+
+# 라우트별 요청 처리 시간 지표 (Prometheus)
+app.add_middleware(MetricsMiddleware)
+
 # API 라우터 등록
 app.include_router(upload.router)
 app.include_router(query.router)
 app.include_router(management.router)
 app.include_router(selftest.router)
 app.include_router(debug.router)
+app.include_router(metrics.router)
 
 # 정적 파일 서빙 (프론트엔드)
 frontend_path = project_root / "frontend"
@@ -93,6 +93,13 @@ class PerformanceMetrics(BaseModel):
     llm_response_time: float = Field(..., description="LLM 응답 시간")
     success_rate: float = Field(..., ge=0.0, le=1.0, description="성공률")
     error_rate: float = Field(..., ge=0.0, le=1.0, description="에러율")
+    answer_cache: Dict[str, Any] = Field(default={}, description="응답 캐시 적중률/크기")
+    single_flight: Dict[str, Any] = Field(default={}, description="동시 동일 질의 합치기 통계")
+    context_compression: Dict[str, Any] = Field(default={}, description="컨텍스트 압축 비율/문장 임베딩 캐시")
+    document_catalog: Dict[str, Any] = Field(default={}, description="문서 카탈로그 크기/버전")
+    query_logging: Dict[str, Any] = Field(default={}, description="질의 로그 버퍼/일괄 기록 통계")
+    latency: Dict[str, Any] = Field(default={}, description="질의 단계별 지연 시간 분포 (p50/p95/p99, ms)")
+    streaming: Dict[str, Any] = Field(default={}, description="스트리밍 첫 토큰까지 시간/초당 토큰 수")
 
 
 class ErrorLog(BaseModel):
@@ -10,6 +10,8 @@ class SourceInfo(BaseModel):
     section: Optional[str]
     relevance_score: float = Field(..., ge=0.0, le=1.0)
     content_preview: Optional[str] = Field(None, max_length=250)
+    start_offset: Optional[int] = None  # 페이지 텍스트 안에서의 청크 위치
+    end_offset: Optional[int] = None
 
 class QueryResponse(BaseModel):
     answer: str
@@ -17,6 +19,8 @@ class QueryResponse(BaseModel):
     sources: List[SourceInfo]
     query_time_ms: int
     model_used: str
+    cached: bool = False  # 응답 캐시에서 반환된 경우
+    prompt_tokens: Optional[int] = None  # LLM에 보낸 프롬프트 토큰 수 (생성하지 않은 응답은 None)
 
 class BatchQueryResponse(BaseModel):
     results: List[QueryResponse]
@@ -50,11 +54,46 @@ class DocumentListResponse(BaseModel):
     limit: int
     total_pages: int
 
+class SpecResult(BaseModel):
+    document_id: str
+    document_name: str
+    product_model: Optional[str] = None
+    product_family: Optional[str] = None
+    parameter_name: Optional[str] = None
+    parameter_key: Optional[str] = None
+    parameter_value: Optional[str] = None
+    unit: Optional[str] = None
+    min_value: Optional[float] = None
+    typical_value: Optional[float] = None
+    max_value: Optional[float] = None
+    condition_text: Optional[str] = None
+    page_number: Optional[int] = None
+
+class SpecSearchResponse(BaseModel):
+    parameter_key: str
+    unit: Optional[str]
+    mode: str
+    results: List[SpecResult]
+    total: int
+    page: int
+    limit: int
+    total_pages: int
+    query_time_ms: int
+
+class PageTextResponse(BaseModel):
+    document_id: str
+    page_number: int
+    text: str
+    start_offset: int
+    end_offset: int
+    page_length: int
+
 class UploadResponse(BaseModel):
     document_id: str
     status: ProcessingStatus
     message: str
     file_info: Optional[Dict[str, Any]] = None
+    deduplicated: bool = False
 
 class StatusResponse(BaseModel):
     ollama_status: str
@@ -0,0 +1,177 @@
+"""의미 기반 응답 캐시
+
+답변한 질문의 임베딩과 QueryResponse를 함께 보관하고, 새 질문의 임베딩이 같은 범위
+(사용자 역할, 문서 필터, 질문 속 모델명/수치)에서 기준 유사도 이상이면 저장된 응답을
+그대로 반환합니다. "DDR5 전압?" / "DDR5 동작 전압은?" 같은 바꿔 말한 질문이 검색과
+LLM 생성을 다시 거치지 않도록 하기 위한 것입니다.
+
+항목은 LRU와 TTL로 정리하고, 벡터 인덱스 버전이 바뀌면(문서 추가/삭제) 전부 비웁니다.
+"""
+import json
+import re
+import threading
+import time
+from collections import OrderedDict
+from typing import Any, Dict, List, NamedTuple, Optional, Tuple
+
+import numpy as np
+
+from .metrics import record_cache_lookups
+from ..config.settings import settings
+from ..models.response_models import QueryResponse
+
+
+# 숫자가 들어간 영문 토큰 (DDR5, 1.1V, K4A8G165WC 등): 임베딩으로는 거의 같아 보이는
+# "DDR4 전압" / "DDR5 전압"이 서로의 답을 받지 않도록 캐시 범위에 포함
+_IDENTIFIER_RE = re.compile(r"[A-Za-z]*\d[A-Za-z\d.\-]*")
+
+ScopeKey = Tuple[str, str, Tuple[str, ...]]
+
+
+def identifier_signature(text: str) -> Tuple[str, ...]:
+    """질문 속 모델명/수치 토큰의 정렬된 집합"""
+    return tuple(sorted({token.lower().rstrip(".-") for token in _IDENTIFIER_RE.findall(text)}))
+
+
+class _Entry(NamedTuple):
+    scope: ScopeKey
+    vector: np.ndarray
+    response: QueryResponse
+    created_at: float
+
+
+class SemanticAnswerCache:
+    """범위별 질의 임베딩 색인과 LRU/TTL 정리를 갖춘 응답 캐시"""
+
+    def __init__(self, max_entries: int, ttl_seconds: float, similarity: float):
+        self.max_entries = max(1, max_entries)
+        self.ttl_seconds = ttl_seconds
+        self.similarity = similarity
+        self._entries: "OrderedDict[int, _Entry]" = OrderedDict()
+        # 범위 → 항목 ID (삽입 순서 유지용 dict)
+        self._scopes: Dict[ScopeKey, Dict[int, None]] = {}
+        self._next_id = 0
+        self._index_version: Optional[int] = None
+        self._lock = threading.Lock()
+
+        self.hits = 0
+        self.misses = 0
+        self.stores = 0
+        self.evictions = 0
+        self.expirations = 0
+        self.invalidations = 0
+
+    @staticmethod
+    def scope_key(user_role: str, document_filter: Any, question: str) -> ScopeKey:
+        filter_key = json.dumps(document_filter, sort_keys=True, ensure_ascii=False, default=str) \
+            if document_filter else ""
+        return user_role, filter_key, identifier_signature(question)
+
+    @staticmethod
+    def _normalize(embedding: List[float]) -> np.ndarray:
+        vector = np.asarray(embedding, dtype="float32")
+        norm = np.linalg.norm(vector)
+        return vector / norm if norm else vector
+
+    def _sync_version(self, index_version: int):
+        """인덱스가 바뀌었으면 전부 비움 (호출 측에서 _lock 보유)"""
+        if self._index_version != index_version:
+            if self._entries:
+                self._clear()
+                self.invalidations += 1
+            self._index_version = index_version
+
+    def _clear(self):
+        self._entries.clear()
+        self._scopes.clear()
+
+    def _remove(self, entry_id: int):
+        entry = self._entries.pop(entry_id)
+        scope_ids = self._scopes.get(entry.scope)
+        if scope_ids is not None:
+            scope_ids.pop(entry_id, None)
+            if not scope_ids:
+                del self._scopes[entry.scope]
+
+    def lookup(self, scope: ScopeKey, embedding: List[float], index_version: int) -> Optional[QueryResponse]:
+        """같은 범위에서 가장 비슷한 질문의 응답 반환 (기준 미만이면 None)"""
+        query_vector = self._normalize(embedding)
+        with self._lock:
+            self._sync_version(index_version)
+
+            now = time.time()
+            entry_ids = list(self._scopes.get(scope, ()))
+            for entry_id in entry_ids:
+                if now - self._entries[entry_id].created_at > self.ttl_seconds:
+                    self._remove(entry_id)
+                    self.expirations += 1
+            entry_ids = list(self._scopes.get(scope, ()))
+            if not entry_ids:
+                self.misses += 1
+                record_cache_lookups("answer", 0, 1)
+                return None
+
+            matrix = np.stack([self._entries[entry_id].vector for entry_id in entry_ids])
+            scores = matrix @ query_vector
+            best = int(np.argmax(scores))
+            if scores[best] < self.similarity:
+                self.misses += 1
+                record_cache_lookups("answer", 0, 1)
+                return None
+
+            entry_id = entry_ids[best]
+            self._entries.move_to_end(entry_id)
+            self.hits += 1
+            record_cache_lookups("answer", 1, 0)
+            return self._entries[entry_id].response.model_copy(deep=True)
+
+    def store(self, scope: ScopeKey, embedding: List[float], response: QueryResponse, index_version: int):
+        """응답 저장 (가득 차면 가장 오래 쓰이지 않은 항목부터 제거)"""
+        entry = _Entry(scope, self._normalize(embedding), response.model_copy(deep=True), time.time())
+        with self._lock:
+            if self._index_version is None:
+                self._index_version = index_version
+            elif index_version != self._index_version:
+                return  # 생성하는 동안 인덱스가 바뀐 응답은 저장하지 않음
+
+            entry_id = self._next_id
+            self._next_id += 1
+            self._entries[entry_id] = entry
+            self._scopes.setdefault(scope, {})[entry_id] = None
+            self.stores += 1
+
+            while len(self._entries) > self.max_entries:
+                self._remove(next(iter(self._entries)))
+                self.evictions += 1
+
+    def stats(self) -> Dict[str, Any]:
+        with self._lock:
+            lookups = self.hits + self.misses
+            return {
+                "enabled": settings.answer_cache_enabled,
+                "entries": len(self._entries),
+                "max_entries": self.max_entries,
+                "hits": self.hits,
+                "misses": self.misses,
+                "hit_rate": round(self.hits / lookups, 4) if lookups else 0.0,
+                "stores": self.stores,
+                "evictions": self.evictions,
+                "expirations": self.expirations,
+                "invalidations": self.invalidations,
+                "index_version": self._index_version,
+            }
+
+
+_answer_cache: Optional[SemanticAnswerCache] = None
+
+
+def get_answer_cache() -> SemanticAnswerCache:
+    """응답 캐시 싱글톤 인스턴스 반환"""
+    global _answer_cache
+    if _answer_cache is None:
+        _answer_cache = SemanticAnswerCache(
+            settings.answer_cache_size,
+            settings.answer_cache_ttl_seconds,
+            settings.answer_cache_similarity
+        )
+    return _answer_cache
@@ -0,0 +1,219 @@
+"""토큰 기준 텍스트 청커
+
+문장/줄 경계 오프셋을 한 번의 정규식 순회로 미리 계산하고, 경계 단위의 토큰 수를
+캐시된 토크나이저로 한 번에 센 다음 토큰 예산에 맞게 묶습니다.
+결과는 원문 오프셋 레코드(ChunkSpan)이며, 인덱스에 넘길 때만 텍스트를 잘라냅니다.
+"""
+import re
+from functools import lru_cache
+from typing import List, Dict, Any, Callable, NamedTuple, Optional, Tuple
+
+from loguru import logger
+
+
+# 문장 끝(. ! ? 。) 뒤의 공백 또는 줄바꿈을 경계로 사용 (전후방 탐색 없이 한 번에 순회)
+_BOUNDARY_RE = re.compile(r"[.!?。]\s+|\n\s*")
+_WORD_RE = re.compile(r"\S+")
+# 토크나이저가 없을 때의 근사: 영문/숫자 5자, 한글 2음절, 기호 1자를 한 토큰으로 계산
+_ESTIMATE_RE = re.compile(r"[A-Za-z]{1,5}|\d{1,5}|[가-힣]{1,2}|[^\sA-Za-z\d가-힣]")
+
+# 긴 단위를 미리 조각낼 때 가정하는 토큰당 글자 수 (영문 기준)
+_CHARS_PER_TOKEN = 4
+
+TokenCounter = Callable[[List[str]], List[int]]
+
+
+class ChunkSpan(NamedTuple):
+    """원문 안에서의 청크 위치 [start, end)와 토큰 수"""
+    start: int
+    end: int
+    token_count: int
+
+
+class TextChunk(NamedTuple):
+    """인덱스에 넘길 청크 (LangChain Document와 같은 page_content/metadata 속성)"""
+    page_content: str
+    metadata: Dict[str, Any]
+
+
+def estimate_tokens(texts: List[str]) -> List[int]:
+    """토크나이저 없이 서브워드 토큰 수 근사"""
+    return [len(_ESTIMATE_RE.findall(text)) for text in texts]
+
+
+def _word_windows(text: str, start: int, end: int, window: int) -> List[Tuple[int, int]]:
+    """[start, end)를 최대 window 글자의 구간으로 단어 경계에서 분할"""
+    windows = []
+    while start < end:
+        cut = min(end, start + window)
+        if cut < end:
+            space = text.rfind(" ", start + 1, cut + 1)
+            if space > start:
+                cut = space
+        windows.append((start, cut))
+        start = cut
+        while start < end and text[start].isspace():
+            start += 1
+    return windows
+
+
+@lru_cache(maxsize=None)
+def get_token_counter(model_name: str) -> TokenCounter:
+    """모델 토크나이저 기반 배치 토큰 카운터 (프로세스당 한 번만 로드)"""
+    if model_name:
+        try:
+            from tokenizers import Tokenizer
+
+            tokenizer = Tokenizer.from_pretrained(model_name)
+
+            def count_with_tokenizers(texts: List[str]) -> List[int]:
+                encodings = tokenizer.encode_batch(list(texts), add_special_tokens=False)
+                return [len(encoding.ids) for encoding in encodings]
+
+            logger.info(f"청킹 토크나이저 로드: {model_name} (tokenizers)")
+            return count_with_tokenizers
+        except Exception as e:
+            logger.debug(f"tokenizers 로드 실패 ({model_name}): {e}")
+
+        try:
+            from transformers import AutoTokenizer
+
+            auto_tokenizer = AutoTokenizer.from_pretrained(model_name)
+
+            def count_with_transformers(texts: List[str]) -> List[int]:
+                if not texts:
+                    return []
+                input_ids = auto_tokenizer(list(texts), add_special_tokens=False)["input_ids"]
+                return [len(ids) for ids in input_ids]
+
+            logger.info(f"청킹 토크나이저 로드: {model_name} (transformers)")
+            return count_with_transformers
+        except Exception as e:
+            logger.debug(f"transformers 토크나이저 로드 실패 ({model_name}): {e}")
+
+    logger.warning(f"토크나이저를 사용할 수 없어 근사 토큰 수로 청킹합니다: {model_name or '(미지정)'}")
+    return estimate_tokens
+
+
+class TokenChunker:
+    """문장 경계를 지키며 토큰 예산에 맞춰 청크를 만드는 분할기
+
+    경계 단위(문장/줄)를 예산이 찰 때까지 이어 붙이고, 다음 청크는 직전 청크 끝의
+    단위들을 overlap_tokens 이내로 다시 포함해서 시작합니다.
+    예산보다 긴 단위(표 행이 이어진 페이지 등)는 단어 경계에서 나눕니다.
+    """
+
+    def __init__(self, chunk_tokens: int, overlap_tokens: int,
+                 tokenizer_name: str = "", token_counter: Optional[TokenCounter] = None):
+        self.chunk_tokens = max(1, chunk_tokens)
+        self.overlap_tokens = max(0, min(overlap_tokens, self.chunk_tokens // 2))
+        self.tokenizer_name = tokenizer_name
+        self._token_counter = token_counter
+
+    @property
+    def count_tokens(self) -> TokenCounter:
+        # 토크나이저 로드는 첫 청킹 시점까지 미룸
+        if self._token_counter is None:
+            self._token_counter = get_token_counter(self.tokenizer_name)
+        return self._token_counter
+
+    def _boundary_units(self, text: str, start: int, end: int) -> List[Tuple[int, int]]:
+        """[start, end) 구간을 앞뒤 공백을 제외한 문장/줄 단위 오프셋으로 분할"""
+        while start < end and text[start].isspace():
+            start += 1
+        while end > start and text[end - 1].isspace():
+            end -= 1
+
+        units = []
+        unit_start = start
+        for match in _BOUNDARY_RE.finditer(text, start, end):
+            boundary = match.start()
+            if text[boundary] != "\n":
+                boundary += 1  # 문장 부호는 앞 단위에 포함
+            while boundary > unit_start and text[boundary - 1].isspace():
+                boundary -= 1
+            if boundary > unit_start:
+                units.append((unit_start, boundary))
+            unit_start = match.end()
+        if unit_start < end:
+            units.append((unit_start, end))
+        return units
+
+    def _measure(self, text: str, units: List[Tuple[int, int]]) -> List[ChunkSpan]:
+        """단위별 토큰 수를 한 번에 세고, 예산을 넘는 단위는 작은 조각으로 분할
+
+        글자 수만으로도 예산을 넘을 것이 분명한 단위(문장 부호 없는 표 페이지 등)는
+        미리 조각낸 뒤 세어서 같은 텍스트를 두 번 세지 않도록 합니다.
+        """
+        target = self._piece_tokens()
+        spans: List[Tuple[int, int]] = []
+        for unit_start, unit_end in units:
+            if unit_end - unit_start > self.chunk_tokens * _CHARS_PER_TOKEN:
+                spans.extend(_word_windows(text, unit_start, unit_end, target * _CHARS_PER_TOKEN))
+            else:
+                spans.append((unit_start, unit_end))
+        counts = self.count_tokens([text[s:e] for s, e in spans])
+
+        measured: List[ChunkSpan] = []
+        for (span_start, span_end), count in zip(spans, counts):
+            if count <= self.chunk_tokens:
+                measured.append(ChunkSpan(span_start, span_end, count))
+                continue
+            # 글자당 토큰이 많은 단위: 밀도로 조각 길이와 토큰 수를 추정
+            tokens_per_char = count / (span_end - span_start)
+            window = max(1, int(target / tokens_per_char))
+            measured.extend(
+                ChunkSpan(s, e, max(1, round((e - s) * tokens_per_char)))
+                for s, e in _word_windows(text, span_start, span_end, window)
+            )
+        return measured
+
+    def _piece_tokens(self) -> int:
+        """긴 단위를 나눌 조각 크기 (겹침 크기 이하여야 청크 사이 겹침이 유지됨)"""
+        return self.overlap_tokens or max(1, self.chunk_tokens // 4)
+
+    def split_spans(self, text: str, start: int = 0, end: Optional[int] = None) -> List[ChunkSpan]:
+        """text[start:end]를 청크 오프셋 레코드 목록으로 분할 (오프셋은 text 기준)"""
+        end = len(text) if end is None else end
+        units = self._boundary_units(text, start, end)
+        if not units:
+            return []
+        units = self._measure(text, units)
+
+        spans: List[ChunkSpan] = []
+        first = 0
+        while first < len(units):
+            last = first
+            tokens = 0
+            while last < len(units) and (last == first or tokens + units[last].token_count <= self.chunk_tokens):
+                tokens += units[last].token_count
+                last += 1
+            spans.append(ChunkSpan(units[first].start, units[last - 1].end, tokens))
+            if last >= len(units):
+                break
+
+            # 겹침: 직전 청크 끝의 단위들을 overlap_tokens 이내로 다음 청크에 포함
+            next_first = last
+            overlap = 0
+            while next_first - 1 > first and overlap + units[next_first - 1].token_count <= self.overlap_tokens:
+                next_first -= 1
+                overlap += units[next_first].token_count
+            first = next_first
+
+        return spans
+
+    def split_segments(self, text: str,
+                       segments: List[Tuple[int, int, Dict[str, Any]]]) -> List[TextChunk]:
+        """(시작, 끝, 메타데이터) 구간별로 분할하여 인덱스용 청크 생성"""
+        chunks: List[TextChunk] = []
+        for start, end, metadata in segments:
+            for span in self.split_spans(text, start, end):
+                chunk_text = text[span.start:span.end]
+                chunks.append(TextChunk(chunk_text, dict(
+                    metadata,
+                    start_offset=span.start,
+                    end_offset=span.end,
+                    token_count=span.token_count,
+                    chunk_size=len(chunk_text)
+                )))
+        return chunks
@@ -0,0 +1,199 @@
+"""토큰 예산 기반 LLM 컨텍스트 구성
+
+검색 결과를 그대로 이어 붙여 글자 수로 자르는 대신,
+1. 같은 문서/페이지에서 겹치거나 붙어 있는 청크를 원문 오프셋으로 이어 붙여 겹침 중복을 없애고
+2. 거의 같은 내용의 구절(개정판 중복 업로드 등)은 관련도가 높은 쪽만 남긴 다음
+3. 관련도 순으로 토큰 예산(제목 줄 포함)에 채우고, 남은 예산에 다 들어가지 않는 구절은
+   문장 경계에서 잘라 넣습니다.
+
+토큰 수는 응답을 생성하는 모델의 토크나이저로 셉니다 (없으면 청커와 같은 근사치).
+"""
+import re
+from typing import Any, Callable, Dict, List, NamedTuple, Optional
+
+from .chunker import TokenChunker, TokenCounter, get_token_counter
+
+
+_WORD_RE = re.compile(r"\w+")
+# 이 글자 수 이하로 떨어진 같은 페이지의 청크는 하나로 이어 붙임 (청크 사이 공백)
+_MERGE_GAP = 2
+_SHINGLE_SIZE = 3
+
+
+class ContextPassage(NamedTuple):
+    """컨텍스트에 넣을 구절 (병합/잘림이 반영된 원문 오프셋 포함)"""
+    text: str
+    header: str
+    metadata: Dict[str, Any]
+    relevance: float
+    token_count: int
+    chunk_count: int
+
+
+def relevance_from_distance(distance: float) -> float:
+    """FAISS L2 거리를 0-1 관련도로 변환 (거리 0 → 1.0)"""
+    return 1.0 / (1.0 + max(float(distance), 0.0))
+
+
+def _shingles(text: str) -> set:
+    words = _WORD_RE.findall(text.lower())
+    if len(words) < _SHINGLE_SIZE:
+        return set(words)
+    return {tuple(words[i:i + _SHINGLE_SIZE]) for i in range(len(words) - _SHINGLE_SIZE + 1)}
+
+
+class ContextBuilder:
+    """검색 결과를 병합/중복 제거하여 토큰 예산에 맞게 채우는 컨텍스트 구성기"""
+
+    def __init__(self, token_budget: int, tokenizer_name: str = "",
+                 token_counter: Optional[TokenCounter] = None,
+                 duplicate_threshold: float = 0.9, min_fragment_tokens: int = 48):
+        self.token_budget = max(1, token_budget)
+        self.tokenizer_name = tokenizer_name
+        self.duplicate_threshold = duplicate_threshold
+        self.min_fragment_tokens = min_fragment_tokens
+        self._token_counter = token_counter
+
+    @property
+    def count_tokens(self) -> TokenCounter:
+        # 토크나이저 로드는 첫 질의 시점까지 미룸
+        if self._token_counter is None:
+            self._token_counter = get_token_counter(self.tokenizer_name)
+        return self._token_counter
+
+    def merge(self, search_results: List[Dict[str, Any]]) -> List[Dict[str, Any]]:
+        """같은 문서/페이지에서 겹치거나 붙어 있는 청크를 하나의 구절로 병합"""
+        groups: Dict[Any, List[Dict[str, Any]]] = {}
+        passages: List[Dict[str, Any]] = []
+
+        for result in search_results:
+            content = result.get("content") or ""
+            if not content.strip():
+                continue
+            metadata = result.get("metadata") or {}
+            passage = {
+                "text": content,
+                "metadata": dict(metadata),
+                "relevance": relevance_from_distance(result.get("score", 0.0)),
+                "chunk_count": 1,
+            }
+            start, end = metadata.get("start_offset"), metadata.get("end_offset")
+            key = (metadata.get("document_id"), metadata.get("page_number"))
+            if start is None or end is None or None in key:
+                passages.append(passage)
+            else:
+                groups.setdefault(key, []).append(passage)
+
+        for group in groups.values():
+            group.sort(key=lambda p: p["metadata"]["start_offset"])
+            current = group[0]
+            for passage in group[1:]:
+                if not self._absorb(current, passage):
+                    passages.append(current)
+                    current = passage
+            passages.append(current)
+
+        return passages
+
+    @staticmethod
+    def _absorb(current: Dict[str, Any], passage: Dict[str, Any]) -> bool:
+        """passage가 current와 겹치거나 붙어 있으면 current에 이어 붙이고 True"""
+        current_end = current["metadata"]["end_offset"]
+        start = passage["metadata"]["start_offset"]
+        end = passage["metadata"]["end_offset"]
+        if start > current_end + _MERGE_GAP:
+            return False
+
+        if end > current_end:
+            if start >= current_end:
+                # 청크 사이 공백 길이만큼 띄워서 오프셋과 글자 수를 맞춤
+                current["text"] += " " * (start - current_end) + passage["text"]
+            else:
+                overlap = current_end - start
+                if not current["text"].endswith(passage["text"][:overlap]):
+                    return False  # 오프셋이 다른 개정판 텍스트 기준인 경우
+                current["text"] += passage["text"][overlap:]
+            current["metadata"]["end_offset"] = end
+        current["relevance"] = max(current["relevance"], passage["relevance"])
+        current["chunk_count"] += passage["chunk_count"]
+        return True
+
+    def drop_near_duplicates(self, passages: List[Dict[str, Any]]) -> List[Dict[str, Any]]:
+        """관련도 순으로 보면서 이미 고른 구절과 거의 같은 구절 제거 (3-단어 shingle 포함도)"""
+        kept: List[Dict[str, Any]] = []
+        kept_shingles: List[set] = []
+        for passage in sorted(passages, key=lambda p: p["relevance"], reverse=True):
+            shingles = _shingles(passage["text"])
+            duplicate = any(
+                shingles and other
+                and len(shingles & other) / min(len(shingles), len(other)) >= self.duplicate_threshold
+                for other in kept_shingles
+            )
+            if not duplicate:
+                kept.append(passage)
+                kept_shingles.append(shingles)
+        return kept
+
+    def pack(self, passages: List[Dict[str, Any]],
+             render_header: Callable[[Dict[str, Any]], str]) -> List[ContextPassage]:
+        """관련도 순으로 토큰 예산에 채움 (남은 예산보다 긴 구절은 문장 경계에서 자름)"""
+        ordered = sorted(passages, key=lambda p: p["relevance"], reverse=True)
+        headers = [render_header(p["metadata"]) for p in ordered]
+        # 제목 줄 토큰은 render()가 붙이는 번호 줄까지 포함해서 계산
+        counts = self.count_tokens(
+            [p["text"] for p in ordered]
+            + [self._numbered(i + 1, header) + "\n내용:" for i, header in enumerate(headers)]
+        )
+        text_tokens, header_tokens = counts[:len(ordered)], counts[len(ordered):]
+
+        packed: List[ContextPassage] = []
+        remaining = self.token_budget
+        for passage, text_count, header, header_count in zip(ordered, text_tokens, headers, header_tokens):
+            text = passage["text"]
+            metadata = passage["metadata"]
+            if text_count + header_count > remaining:
+                room = remaining - header_count
+                if room < self.min_fragment_tokens:
+                    continue  # 더 짧은 다음 구절은 들어갈 수 있음
+                spans = TokenChunker(room, 0, token_counter=self.count_tokens).split_spans(text)
+                if not spans:
+                    continue
+                text = text[spans[0].start:spans[0].end]
+                text_count = spans[0].token_count
+                if metadata.get("start_offset") is not None \
+                        and metadata["end_offset"] - metadata["start_offset"] == len(passage["text"]):
+                    # 압축으로 생략 구간이 들어간 구절은 오프셋이 글자 위치와 맞지 않으므로 그대로 둠
+                    metadata = dict(
+                        metadata,
+                        start_offset=metadata["start_offset"] + spans[0].start,
+                        end_offset=metadata["start_offset"] + spans[0].end
+                    )
+
+            packed.append(ContextPassage(
+                text, header, metadata, passage["relevance"],
+                text_count + header_count, passage["chunk_count"]
+            ))
+            remaining -= text_count + header_count
+            if remaining < self.min_fragment_tokens:
+                break
+
+        return packed
+
+    def prepare(self, search_results: List[Dict[str, Any]]) -> List[Dict[str, Any]]:
+        """병합과 중복 제거 (압축 단계 전까지)"""
+        return self.drop_near_duplicates(self.merge(search_results))
+
+    def build(self, search_results: List[Dict[str, Any]],
+              render_header: Callable[[Dict[str, Any]], str]) -> List[ContextPassage]:
+        return self.pack(self.prepare(search_results), render_header)
+
+    @staticmethod
+    def _numbered(number: int, header: str) -> str:
+        return f"--- 문서 {number} ---" + (f"\n{header}" if header else "")
+
+    @classmethod
+    def render(cls, passages: List[ContextPassage]) -> str:
+        """구절을 번호 붙은 제목과 함께 컨텍스트 문자열로 결합"""
+        return "\n".join(
+            f"{cls._numbered(i + 1, p.header)}\n내용:\n{p.text}\n" for i, p in enumerate(passages)
+        )
@@ -0,0 +1,236 @@
+"""추출식 컨텍스트 압축
+
+검색된 구절을 문장/줄 단위(짧은 문장은 묶고, 문장 부호 없이 이어진 표 텍스트는 단어
+경계에서 나눔)로 쪼갠 뒤 질의 임베딩과의 유사도로 점수를 매기고, 점수가 높은 단위와
+그 앞뒤 단위만 남깁니다. 남는 양은 전체 토큰의 일정 비율(최소 토큰 수 이상)입니다.
+
+- 질의 임베딩은 검색에 쓴 벡터를 그대로 사용
+- 단위 임베딩은 텍스트 기준 LRU 캐시 (같은 청크가 다시 검색되면 임베딩하지 않음)
+- 이어지지 않는 단위 사이에는 생략 표시를 넣어 원문 순서를 유지
+"""
+import hashlib
+import threading
+from collections import OrderedDict
+from typing import Any, Awaitable, Callable, Dict, List, NamedTuple, Optional
+
+import numpy as np
+from loguru import logger
+
+from .chunker import TokenChunker, TokenCounter, get_token_counter
+from .metrics import record_cache_lookups
+from ..config.settings import settings
+
+
+# 남긴 단위 사이가 끊긴 곳에 넣는 표시
+GAP_MARKER = "\n…\n"
+
+Embedder = Callable[[List[str]], Awaitable[List[List[float]]]]
+
+
+class _Unit(NamedTuple):
+    passage: int
+    start: int
+    end: int
+    token_count: int
+
+
+class UnitEmbeddingCache:
+    """단위 텍스트 해시 → 정규화 임베딩 LRU 캐시"""
+
+    def __init__(self, max_entries: int):
+        self.max_entries = max(1, max_entries)
+        self._vectors: "OrderedDict[str, np.ndarray]" = OrderedDict()
+        self._lock = threading.Lock()
+        self.hits = 0
+        self.misses = 0
+
+    @staticmethod
+    def key(text: str) -> str:
+        return hashlib.sha1(text.encode("utf-8")).hexdigest()
+
+    def get_many(self, keys: List[str]) -> List[Optional[np.ndarray]]:
+        with self._lock:
+            vectors = []
+            for key in keys:
+                vector = self._vectors.get(key)
+                if vector is None:
+                    self.misses += 1
+                else:
+                    self._vectors.move_to_end(key)
+                    self.hits += 1
+                vectors.append(vector)
+        misses = sum(vector is None for vector in vectors)
+        record_cache_lookups("unit_embedding", len(vectors) - misses, misses)
+        return vectors
+
+    def put_many(self, keys: List[str], vectors: List[np.ndarray]):
+        with self._lock:
+            for key, vector in zip(keys, vectors):
+                self._vectors[key] = vector
+                self._vectors.move_to_end(key)
+            while len(self._vectors) > self.max_entries:
+                self._vectors.popitem(last=False)
+
+    def stats(self) -> Dict[str, Any]:
+        with self._lock:
+            lookups = self.hits + self.misses
+            return {
+                "entries": len(self._vectors),
+                "hits": self.hits,
+                "misses": self.misses,
+                "hit_rate": round(self.hits / lookups, 4) if lookups else 0.0,
+            }
+
+
+def _normalize(vectors: Any) -> np.ndarray:
+    matrix = np.asarray(vectors, dtype="float32")
+    norms = np.linalg.norm(matrix, axis=-1, keepdims=True)
+    return matrix / np.where(norms == 0, 1, norms)
+
+
+class ContextCompressor:
+    """질의 유사도 기반 문장 선택으로 구절을 줄이는 압축기"""
+
+    def __init__(self, ratio: float, min_tokens: int, tokenizer_name: str = "",
+                 unit_tokens: int = 48, neighbors: int = 1, cache_size: int = 20000):
+        self.ratio = min(max(ratio, 0.05), 1.0)
+        self.min_tokens = min_tokens
+        self.tokenizer_name = tokenizer_name
+        self.unit_tokens = unit_tokens
+        self.neighbors = neighbors
+        self.cache = UnitEmbeddingCache(cache_size)
+        self._token_counter: Optional[TokenCounter] = None
+
+        self.runs = 0
+        self.tokens_before = 0
+        self.tokens_after = 0
+
+    @property
+    def count_tokens(self) -> TokenCounter:
+        if self._token_counter is None:
+            self._token_counter = get_token_counter(self.tokenizer_name)
+        return self._token_counter
+
+    def split_units(self, passages: List[Dict[str, Any]]) -> List[_Unit]:
+        """구절을 최대 unit_tokens 토큰의 문장/줄 단위로 분할"""
+        chunker = TokenChunker(self.unit_tokens, 0, token_counter=self.count_tokens)
+        return [
+            _Unit(index, span.start, span.end, span.token_count)
+            for index, passage in enumerate(passages)
+            for span in chunker.split_spans(passage["text"])
+        ]
+
+    async def _embed_units(self, texts: List[str], embed: Embedder) -> np.ndarray:
+        """캐시에 없는 단위만 임베딩"""
+        keys = [UnitEmbeddingCache.key(text) for text in texts]
+        vectors = self.cache.get_many(keys)
+        # 같은 요청 안에서 반복되는 단위(머리글/바닥글 등)는 한 번만 임베딩
+        missing = {keys[i]: texts[i] for i, vector in enumerate(vectors) if vector is None}
+        if missing:
+            embedded = dict(zip(missing, _normalize(await embed(list(missing.values())))))
+            self.cache.put_many(list(embedded), list(embedded.values()))
+            vectors = [embedded[key] if vector is None else vector for key, vector in zip(keys, vectors)]
+        return np.stack(vectors)
+
+    def select(self, units: List[_Unit], scores: np.ndarray, target_tokens: int) -> set:
+        """점수 순으로 단위를 고르고, 목표 토큰 수가 남아 있으면 가까운 이웃부터 함께 선택"""
+        selected: set = set()
+        kept_tokens = 0
+        for index in np.argsort(-scores):
+            if kept_tokens >= target_tokens:
+                break
+            index = int(index)
+            passage = units[index].passage
+            candidates = [index] + [
+                neighbor
+                for distance in range(1, self.neighbors + 1)
+                for neighbor in (index - distance, index + distance)
+            ]
+            for neighbor in candidates:
+                if neighbor != index and kept_tokens >= target_tokens:
+                    break
+                # 이웃은 같은 구절 안에서만
+                if 0 <= neighbor < len(units) and neighbor not in selected \
+                        and units[neighbor].passage == passage:
+                    selected.add(neighbor)
+                    kept_tokens += units[neighbor].token_count
+        return selected
+
+    @staticmethod
+    def _rebuild(passage: Dict[str, Any], units: List[_Unit]) -> Dict[str, Any]:
+        """남긴 단위를 원문 순서로 이어 붙인 구절 (연속 구간은 원문 그대로)"""
+        text = passage["text"]
+        runs: List[List[int]] = []
+        for unit in units:
+            if runs and not text[runs[-1][1]:unit.start].strip():
+                runs[-1][1] = unit.end
+            else:
+                runs.append([unit.start, unit.end])
+
+        metadata = passage["metadata"]
+        base = metadata.get("start_offset")
+        if base is not None:
+            # 오프셋은 남긴 부분 전체를 덮는 구간 (생략 구간 포함)
+            metadata = dict(metadata, start_offset=base + runs[0][0], end_offset=base + runs[-1][1])
+        return dict(
+            passage,
+            text=GAP_MARKER.join(text[start:end] for start, end in runs),
+            metadata=metadata
+        )
+
+    async def compress(self, passages: List[Dict[str, Any]], query_embedding: List[float],
+                       embed: Embedder) -> List[Dict[str, Any]]:
+        """질의와 관련 높은 단위만 남긴 구절 목록 (단위가 하나도 안 남은 구절은 제외)"""
+        units = self.split_units(passages)
+        total_tokens = sum(unit.token_count for unit in units)
+        if total_tokens <= self.min_tokens:
+            return passages
+        target_tokens = max(self.min_tokens, int(total_tokens * self.ratio))
+
+        unit_vectors = await self._embed_units(
+            [passages[unit.passage]["text"][unit.start:unit.end] for unit in units], embed
+        )
+        scores = unit_vectors @ _normalize(query_embedding)
+        selected = self.select(units, scores, target_tokens)
+
+        compressed = []
+        kept_tokens = 0
+        for index, passage in enumerate(passages):
+            kept = [unit for i, unit in enumerate(units) if i in selected and unit.passage == index]
+            if kept:
+                compressed.append(self._rebuild(passage, kept))
+                kept_tokens += sum(unit.token_count for unit in kept)
+
+        self.runs += 1
+        self.tokens_before += total_tokens
+        self.tokens_after += kept_tokens
+        logger.info(f"컨텍스트 압축: {total_tokens} → {kept_tokens} 토큰 "
+                    f"(구절 {len(passages)} → {len(compressed)}개)")
+        return compressed
+
+    def stats(self) -> Dict[str, Any]:
+        return {
+            "enabled": settings.context_compression_enabled,
+            "ratio": self.ratio,
+            "runs": self.runs,
+            "tokens_before": self.tokens_before,
+            "tokens_after": self.tokens_after,
+            "kept_ratio": round(self.tokens_after / self.tokens_before, 4) if self.tokens_before else 0.0,
+            "unit_embeddings": self.cache.stats(),
+        }
+
+
+_context_compressor: Optional[ContextCompressor] = None
+
+
+def get_context_compressor() -> ContextCompressor:
+    """컨텍스트 압축기 싱글톤 인스턴스 반환"""
+    global _context_compressor
+    if _context_compressor is None:
+        _context_compressor = ContextCompressor(
+            settings.context_compression_ratio,
+            settings.context_compression_min_tokens,
+            settings.context_tokenizer,
+            cache_size=settings.context_compression_cache_size
+        )
+    return _context_compressor
@@ -94,8 +94,8 @@ class DBVectorService:
             result = await db.execute(text("""
                 SELECT
                     id,
-                    question,
-                    answer,
+                    query_text AS question,
+                    response_text AS answer,
                     confidence,
                     user_role,
                     response_time_ms,
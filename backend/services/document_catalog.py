@@ -0,0 +1,202 @@
+"""프로세스 내 문서 카탈로그 캐시
+
+질의 경로에서 파일명/제품 모델을 얻으려고 매번 documents 테이블을 조회하지 않도록
+문서 메타데이터를 메모리에 들고 있습니다.
+
+- 시작 시 한 번 전체 로드 (start)
+- 업로드/상태 변경/삭제 시 변경한 쪽이 document_changed / document_removed 를 호출하면
+  해당 문서만 갱신하고 cache_versions 테이블의 공유 버전을 올림
+- 다른 프로세스(외부 워커, 다중 API 워커)의 변경은 공유 버전을 주기적으로 확인해
+  바뀌었으면 전체를 다시 로드
+- version은 이 프로세스의 카탈로그가 바뀔 때마다 증가하므로, 카탈로그에서 파생한
+  색인(사양 조회의 제품 색인 등)은 버전이 바뀔 때만 재구성하면 됨
+"""
+import asyncio
+from typing import Any, Dict, Iterable, List, NamedTuple, Optional
+
+from loguru import logger
+from sqlalchemy import insert, select, update
+
+from ..config.database import AsyncSessionLocal, CacheVersion, Document
+from ..config.settings import settings
+
+
+CATALOG_VERSION_KEY = "documents"
+
+
+class DocumentEntry(NamedTuple):
+    """카탈로그에 보관하는 문서 메타데이터 (질의 경로에서 쓰는 컬럼만)"""
+    id: str
+    original_name: str
+    document_type: Optional[str]
+    product_family: Optional[str]
+    product_model: Optional[str]
+    processing_status: Optional[str]
+    page_count: Optional[int]
+
+
+_COLUMNS = (
+    Document.id, Document.original_name, Document.document_type, Document.product_family,
+    Document.product_model, Document.processing_status, Document.page_count
+)
+
+
+class DocumentCatalog:
+    """문서 ID → DocumentEntry 메모리 캐시와 프로세스 간 버전 동기화"""
+
+    def __init__(self, sync_interval: float):
+        self.sync_interval = sync_interval
+        self._entries: Dict[str, DocumentEntry] = {}
+        self.loaded = False
+        self.version = 0
+        # 마지막으로 반영한 공유(DB) 버전
+        self._shared_version: Optional[int] = None
+        self._load_lock = asyncio.Lock()
+        self._sync_task: Optional[asyncio.Task] = None
+
+        self.reloads = 0
+        self.events = 0
+
+    @staticmethod
+    async def _read_shared_version(session) -> int:
+        version = (await session.execute(
+            select(CacheVersion.version).where(CacheVersion.name == CATALOG_VERSION_KEY)
+        )).scalar_one_or_none()
+        return version or 0
+
+    @staticmethod
+    async def _bump_shared_version(session) -> int:
+        """공유 버전 증가 후 새 버전 반환 (호출 측에서 commit)"""
+        result = await session.execute(
+            update(CacheVersion)
+            .where(CacheVersion.name == CATALOG_VERSION_KEY)
+            .values(version=CacheVersion.version + 1)
+        )
+        if result.rowcount == 0:
+            await session.execute(insert(CacheVersion).values(name=CATALOG_VERSION_KEY, version=1))
+        return await DocumentCatalog._read_shared_version(session)
+
+    async def reload(self):
+        """documents 테이블 전체를 다시 읽어 카탈로그 교체"""
+        async with self._load_lock:
+            async with AsyncSessionLocal() as session:
+                shared_version = await self._read_shared_version(session)
+                rows = (await session.execute(select(*_COLUMNS))).all()
+
+            self._entries = {row.id: DocumentEntry(*row) for row in rows}
+            self._shared_version = shared_version
+            self.loaded = True
+            self.version += 1
+            self.reloads += 1
+            logger.info(f"문서 카탈로그 로드: {len(self._entries)}개 문서 (공유 버전 {shared_version})")
+
+    async def ensure_loaded(self):
+        if not self.loaded:
+            await self.reload()
+
+    def get(self, document_id: str) -> Optional[DocumentEntry]:
+        return self._entries.get(document_id)
+
+    def get_many(self, document_ids: Iterable[str]) -> Dict[str, DocumentEntry]:
+        return {
+            document_id: self._entries[document_id]
+            for document_id in document_ids if document_id in self._entries
+        }
+
+    def documents(self, status: Optional[str] = None) -> List[DocumentEntry]:
+        return [
+            entry for entry in self._entries.values()
+            if status is None or entry.processing_status == status
+        ]
+
+    async def document_changed(self, document_id: str):
+        """문서 추가/수정 이벤트 (변경을 commit한 뒤 호출)"""
+        await self._apply_event(document_id, removed=False)
+
+    async def document_removed(self, document_id: str):
+        """문서 삭제 이벤트 (삭제를 commit한 뒤 호출)"""
+        await self._apply_event(document_id, removed=True)
+
+    async def _apply_event(self, document_id: str, removed: bool):
+        # 카탈로그 갱신 실패가 업로드/처리/삭제를 실패시키지 않도록 경고만 남김
+        try:
+            async with AsyncSessionLocal() as session:
+                row = None
+                if not removed and self.loaded:
+                    row = (await session.execute(
+                        select(*_COLUMNS).where(Document.id == document_id)
+                    )).first()
+                shared_version = await self._bump_shared_version(session)
+                await session.commit()
+        except Exception as e:
+            logger.warning(f"문서 카탈로그 갱신 실패 ({document_id}): {e}")
+            return
+
+        self.events += 1
+        if not self.loaded:
+            return  # 카탈로그를 쓰지 않는 프로세스(CLI, 외부 워커)는 공유 버전만 올림
+
+        # 동시에 진행 중인 전체 로드가 이전 스냅샷으로 이 변경을 덮어쓰지 않도록 같은 잠금 사용
+        async with self._load_lock:
+            if row is None:
+                self._entries.pop(document_id, None)
+            else:
+                self._entries[document_id] = DocumentEntry(*row)
+            self.version += 1
+
+            if self._shared_version is not None and shared_version == self._shared_version + 1:
+                # 그 사이 다른 프로세스의 변경이 없었음: 다시 로드할 필요 없음
+                self._shared_version = shared_version
+
+    async def sync(self):
+        """공유 버전이 바뀌었으면(다른 프로세스의 변경) 전체 재로드"""
+        async with AsyncSessionLocal() as session:
+            shared_version = await self._read_shared_version(session)
+        if shared_version != self._shared_version:
+            await self.reload()
+
+    async def _sync_loop(self):
+        while True:
+            await asyncio.sleep(self.sync_interval)
+            try:
+                await self.sync()
+            except asyncio.CancelledError:
+                raise
+            except Exception as e:
+                logger.warning(f"문서 카탈로그 동기화 실패: {e}")
+
+    async def start(self):
+        """전체 로드 후 공유 버전 확인 태스크 시작"""
+        await self.reload()
+        if self._sync_task is None and self.sync_interval > 0:
+            self._sync_task = asyncio.create_task(self._sync_loop())
+
+    async def stop(self):
+        if self._sync_task is not None:
+            self._sync_task.cancel()
+            try:
+                await self._sync_task
+            except asyncio.CancelledError:
+                pass
+            self._sync_task = None
+
+    def stats(self) -> Dict[str, Any]:
+        return {
+            "documents": len(self._entries),
+            "loaded": self.loaded,
+            "version": self.version,
+            "shared_version": self._shared_version,
+            "reloads": self.reloads,
+            "events": self.events,
+        }
+
+
+_document_catalog: Optional[DocumentCatalog] = None
+
+
+def get_document_catalog() -> DocumentCatalog:
+    """문서 카탈로그 싱글톤 인스턴스 반환"""
+    global _document_catalog
+    if _document_catalog is None:
+        _document_catalog = DocumentCatalog(settings.document_catalog_sync_interval)
+    return _document_catalog
@@ -0,0 +1,519 @@
+import asyncio
+import time
+from typing import List, Dict, Any, Optional
+from loguru import logger
+
+from sqlalchemy import delete, func, insert, update, select
+
+from ..config.settings import settings
+from ..config.database import (
+    AsyncSessionLocal, Specification, DocumentSection, DocumentPage, Document as DocumentModel
+)
+from .chunker import TextChunk
+from .page_store import get_page_store
+from .metrics import QUEUE_DEPTH
+
+
+# 단계 종료를 알리는 표식
+_END = object()
+
+# 사양 행을 모아서 한 번에 기록할 개수
+_SPEC_FLUSH_SIZE = 500
+
+# 파이프라인이 문서마다 다시 기록하는 행
+_DOCUMENT_ROW_MODELS = (Specification, DocumentSection, DocumentPage)
+
+
+class IngestionPipeline:
+    """추출 → 청킹 → 임베딩 → 인덱싱 스트리밍 수집 파이프라인
+
+    각 단계는 독립된 태스크로 동시에 실행되며 크기가 제한된 큐로 연결됩니다.
+    뒤 단계(임베딩)가 느리면 큐가 가득 차서 앞 단계가 자연스럽게 대기하므로
+    문서 크기와 관계없이 메모리에 머무는 페이지/청크 수가 일정하게 유지되고,
+    앞쪽 페이지는 문서 전체 처리가 끝나기 전에 검색 가능해집니다.
+    """
+
+    def __init__(self, pdf_service, vector_service, index_name: str = "default"):
+        self.pdf_service = pdf_service
+        self.vector_service = vector_service
+        self.index_name = index_name
+        self.queue_size = settings.ingestion_queue_size
+        self.embed_batch_size = settings.embedding_batch_size
+
+    async def run(self, file_path: str, document_id: str, from_store: bool = False) -> Dict[str, Any]:
+        """문서 하나를 파이프라인으로 처리하고 단계별 통계 반환
+
+        from_store=True면 PDF 대신 페이지 저장소의 추출 결과로 다시 청킹/임베딩합니다.
+        재청킹은 새 청크와 임베딩을 모두 만든 뒤 기존 벡터/행과 교체하므로, 실패해도
+        문서는 기존 결과로 계속 검색됩니다.
+        """
+        start_time = time.time()
+        stats: Dict[str, Any] = {
+            "document_id": document_id,
+            "page_count": 0,
+            "pages": 0,
+            "chunks": 0,
+            "spec_rows": 0,
+            "sections": 0,
+            "revision_of": None,
+            "reused_pages": 0,
+            "reused_chunks": 0,
+            "extract_time": 0.0,
+            "chunk_time": 0.0,
+            "embed_time": 0.0,
+            "index_time": 0.0,
+            "time_to_first_index": None,
+        }
+
+        revision = None
+        if from_store:
+            reader = get_page_store().reader(document_id)
+            if reader is None:
+                raise ValueError(f"저장된 페이지가 없어 재청킹할 수 없습니다: {document_id}")
+            page_count = len(reader.page_numbers)
+            # 텍스트가 그대로인 청크는 문서 자신의 기존 벡터를 재사용
+            revision = await self._load_own_vectors(document_id)
+        else:
+            page_count = (await self.pdf_service.read_pdf_metadata(file_path))["page_count"]
+        stats["page_count"] = page_count
+
+        # 재청킹: 기존 행은 교체 시점까지 남겨 두고, 이후 기록되는 행과 id로 구분
+        watermarks = await self._row_watermarks(document_id) if from_store else None
+        # 재청킹할 새 청크 배치 (성공 후 한 번에 기존 벡터와 교체)
+        pending: Optional[List[Any]] = [] if from_store else None
+
+        if not from_store:
+            # 실패 후 재시도에서 이전 시도의 벡터/청크 행과 사양/섹션 행이 남지 않도록 먼저 제거
+            await self.vector_service.delete_document_vectors(document_id, self.index_name)
+            await self._delete_document_rows(document_id)
+        common_metadata = await self.pdf_service.get_document_metadata(document_id)
+
+        if not from_store:
+            revision = await self._load_previous_revision(document_id, common_metadata)
+            if revision:
+                stats["revision_of"] = revision["document_id"]
+
+        page_queue: asyncio.Queue = asyncio.Queue(maxsize=self.queue_size)
+        chunk_queue: asyncio.Queue = asyncio.Queue(maxsize=self.queue_size)
+        embedded_queue: asyncio.Queue = asyncio.Queue(maxsize=self.queue_size)
+        chunk_rows: List[Dict[str, Any]] = []
+
+        tasks = [
+            asyncio.create_task(
+                self._stored_pages_stage(document_id, page_queue, stats) if from_store
+                else self._extract_stage(file_path, page_count, page_queue, stats)
+            ),
+            asyncio.create_task(self._chunk_stage(
+                document_id, common_metadata, page_queue, chunk_queue, stats, revision,
+                write_store=not from_store
+            )),
+            asyncio.create_task(self._embed_stage(chunk_queue, embedded_queue, stats)),
+            asyncio.create_task(self._index_stage(
+                document_id, embedded_queue, chunk_rows, stats, start_time, pending
+            )),
+        ]
+
+        try:
+            try:
+                await asyncio.gather(*tasks)
+            except BaseException:
+                for task in tasks:
+                    task.cancel()
+                await asyncio.gather(*tasks, return_exceptions=True)
+                raise
+
+            if stats["pages"] == 0:
+                raise ValueError("PDF에서 텍스트를 추출할 수 없습니다. 스캔된 문서일 가능성이 있습니다.")
+        except BaseException:
+            if watermarks is not None:
+                # 재청킹 실패: 이번에 기록한 행만 지우고 기존 벡터/행은 그대로 유지
+                await self._delete_document_rows(document_id, newer_than=watermarks)
+            raise
+
+        started = time.time()
+        if pending is not None:
+            # 기존 벡터 삭제와 새 벡터 추가를 한 번에 수행한 뒤 기존 행 정리
+            await self.vector_service.replace_document_vectors(
+                document_id,
+                [chunk for batch, _, _ in pending for chunk in batch],
+                [embedding for _, embeddings, _ in pending for embedding in embeddings],
+                [docstore_id for _, _, ids in pending for docstore_id in ids],
+                self.index_name
+            )
+            await self._delete_document_rows(document_id, up_to=watermarks)
+            stats["index_time"] += time.time() - started
+            stats["time_to_first_index"] = time.time() - start_time
+        else:
+            # 청크 메타데이터는 문서당 한 트랜잭션의 bulk insert로 기록
+            await self.vector_service.save_chunk_rows(chunk_rows)
+            stats["index_time"] += time.time() - started
+
+            # 모든 배치를 메모리 인덱스에 반영한 뒤 한 번만 디스크에 저장
+            await self.vector_service.save_index(self.index_name)
+
+        stats["total_time"] = time.time() - start_time
+        logger.info(
+            f"📊 파이프라인 완료 ({document_id}): {stats['pages']}페이지, {stats['chunks']}청크, "
+            f"섹션 {stats['sections']}개, 사양 {stats['spec_rows']}행, 재사용 {stats['reused_chunks']}청크, "
+            f"추출 {stats['extract_time']:.2f}s / 청킹 {stats['chunk_time']:.2f}s / "
+            f"임베딩 {stats['embed_time']:.2f}s / 인덱싱 {stats['index_time']:.2f}s"
+        )
+        return stats
+
+    async def _row_watermarks(self, document_id: str) -> Dict[Any, int]:
+        """문서의 기존 사양/섹션/페이지 행 id 상한 (이후 기록되는 행과 구분)"""
+        async with AsyncSessionLocal() as session:
+            return {
+                model: (await session.execute(
+                    select(func.max(model.id)).where(model.document_id == document_id)
+                )).scalar() or 0
+                for model in _DOCUMENT_ROW_MODELS
+            }
+
+    async def _delete_document_rows(self, document_id: str,
+                                    newer_than: Optional[Dict[Any, int]] = None,
+                                    up_to: Optional[Dict[Any, int]] = None):
+        """문서의 사양/섹션/페이지 행 삭제 (newer_than/up_to로 id 범위 제한)"""
+        async with AsyncSessionLocal() as session:
+            for model in _DOCUMENT_ROW_MODELS:
+                statement = delete(model).where(model.document_id == document_id)
+                if newer_than is not None:
+                    statement = statement.where(model.id > newer_than[model])
+                if up_to is not None:
+                    statement = statement.where(model.id <= up_to[model])
+                await session.execute(statement)
+            await session.commit()
+
+    async def _load_previous_revision(self, document_id: str,
+                                      common_metadata: Dict[str, Any]) -> Optional[Dict[str, Any]]:
+        """같은 product_model의 직전 처리 완료 문서에서 페이지 해시와 청크 벡터 로드"""
+        product_model = common_metadata.get("product_model")
+        if not product_model:
+            return None
+
+        async with AsyncSessionLocal() as session:
+            previous = (await session.execute(
+                select(DocumentModel.id, DocumentModel.version)
+                .where(
+                    DocumentModel.product_model == product_model,
+                    DocumentModel.processing_status == "completed",
+                    DocumentModel.id != document_id
+                )
+                .order_by(DocumentModel.upload_date.desc())
+                .limit(1)
+            )).first()
+            if not previous:
+                return None
+
+            page_rows = (await session.execute(
+                select(DocumentPage.page_number, DocumentPage.text_hash)
+                .where(DocumentPage.document_id == previous.id)
+            )).all()
+
+        if not page_rows:
+            return None
+
+        vectors = await self.vector_service.get_document_vectors(previous.id)
+        if not vectors:
+            return None
+
+        logger.info(
+            f"🔁 이전 개정판 발견 ({product_model} {previous.version or ''}): "
+            f"{previous.id} - 변경되지 않은 페이지의 벡터를 재사용합니다."
+        )
+        return {
+            "document_id": previous.id,
+            # 페이지가 삽입/삭제되어 번호가 밀려도 찾을 수 있도록 텍스트 해시로 매칭
+            "pages_by_hash": {row.text_hash: row.page_number for row in page_rows},
+            "vectors": vectors,
+        }
+
+    async def _load_own_vectors(self, document_id: str) -> Optional[Dict[str, Any]]:
+        """재청킹 전 문서 자신의 청크 벡터 로드 (텍스트가 같은 청크는 임베딩 생략)"""
+        vectors = await self.vector_service.get_document_vectors(document_id)
+        if not vectors:
+            return None
+
+        async with AsyncSessionLocal() as session:
+            page_rows = (await session.execute(
+                select(DocumentPage.page_number, DocumentPage.text_hash)
+                .where(DocumentPage.document_id == document_id)
+            )).all()
+
+        return {
+            "document_id": document_id,
+            "pages_by_hash": {row.text_hash: row.page_number for row in page_rows},
+            "vectors": vectors,
+        }
+
+    async def _stored_pages_stage(self, document_id: str, page_queue: asyncio.Queue,
+                                  stats: Dict[str, Any]):
+        """1단계(재청킹): 페이지 저장소에서 추출 결과를 읽어 전달"""
+        loop = asyncio.get_event_loop()
+        reader = get_page_store().reader(document_id)
+        for page_number in reader.page_numbers:
+            started = time.time()
+            page = await loop.run_in_executor(self.pdf_service.executor, reader.read_page, page_number)
+            stats["extract_time"] += time.time() - started
+            await page_queue.put(page)
+        await page_queue.put(_END)
+
+    async def _extract_stage(self, file_path: str, page_count: int,
+                             page_queue: asyncio.Queue, stats: Dict[str, Any]):
+        """1단계: 워커 프로세스에서 추출된 페이지를 순서대로 전달"""
+        started = time.time()
+        async for page in self.pdf_service.iter_pages(file_path, page_count):
+            stats["extract_time"] += time.time() - started
+            await page_queue.put(page)
+            started = time.time()
+        await page_queue.put(_END)
+
+    async def _chunk_stage(self, document_id: str, common_metadata: Dict[str, Any],
+                           page_queue: asyncio.Queue, chunk_queue: asyncio.Queue,
+                           stats: Dict[str, Any], revision: Optional[Dict[str, Any]] = None,
+                           write_store: bool = True):
+        """2단계: 섹션 경계를 넘지 않는 페이지 단위 청킹 및 페이지 저장소 기록
+
+        워커가 감지한 제목 위치로 페이지를 구간으로 나누고, 각 구간을 그 구간이 속한
+        섹션(document_sections 행) 정보와 함께 청킹합니다. 섹션은 페이지를 넘어 이어집니다.
+        이전 개정판과 텍스트가 같은 페이지는 청크 벡터를 함께 넘겨 임베딩을 생략합니다.
+        추출 결과는 페이지 저장소에 기록되어 미리보기와 재청킹에 쓰입니다.
+        """
+        chunker = self.pdf_service.chunker
+        loop = asyncio.get_event_loop()
+        store_writer = get_page_store().writer(document_id) if write_store else None
+        chunk_index = 0
+        spec_rows: List[Dict[str, Any]] = []
+        current_section: Optional[Dict[str, Any]] = None
+        sections: List[Dict[str, Any]] = []
+        page_rows: List[Dict[str, Any]] = []
+        position = 0
+
+        try:
+            while True:
+                page = await page_queue.get()
+                if page is _END:
+                    break
+
+                started = time.time()
+                page_text = page["text"]
+                page_number = int(page["page"])
+                header = f"\n\n--- Page {page_number} ---\n"
+                if store_writer:
+                    # 페이지 압축과 블록 쓰기는 이벤트 루프를 막지 않도록 실행기에서 (close와 동일)
+                    await loop.run_in_executor(
+                        self.pdf_service.executor,
+                        store_writer.add_page,
+                        page_number,
+                        page_text,
+                        {
+                            "text_hash": page.get("text_hash"),
+                            "headings": page.get("headings", []),
+                            "spec_rows": page.get("spec_rows", []),
+                        }
+                    )
+                page_start = position + len(header)
+                position = page_start + len(page_text)
+
+                # 페이지를 제목 위치에서 구간으로 분할: (시작, 끝, 해당 섹션)
+                segments = []
+                segment_start = 0
+                new_sections = []
+                for heading in page.get("headings", []):
+                    if current_section and heading["title"] == current_section["title"]:
+                        continue  # 페이지마다 반복되는 머리말
+                    segments.append((segment_start, heading["offset"], current_section))
+                    current_section = {
+                        "title": heading["title"],
+                        "section_type": heading["section_type"],
+                        "page_number": page_number,
+                        "start_position": page_start + heading["offset"],
+                        "content_preview": page_text[heading["offset"]:heading["offset"] + 200],
+                    }
+                    new_sections.append(current_section)
+                    segment_start = heading["offset"]
+                segments.append((segment_start, len(page_text), current_section))
+
+                if new_sections:
+                    await self._write_sections(document_id, new_sections)
+                    sections.extend(new_sections)
+
+                # 구간 오프셋을 그대로 넘겨 페이지 텍스트 기준 오프셋으로 청킹
+                chunk_segments = []
+                for start, end, section in segments:
+                    segment_metadata = dict(common_metadata, page_number=page_number)
+                    if section:
+                        segment_metadata["section"] = section["title"]
+                        segment_metadata["section_id"] = section["id"]
+                        segment_metadata["section_type"] = section["section_type"]
+                    chunk_segments.append((start, end, segment_metadata))
+
+                chunks: List[TextChunk] = await loop.run_in_executor(
+                    self.pdf_service.executor,
+                    chunker.split_segments,
+                    page_text,
+                    chunk_segments
+                )
+
+                for chunk in chunks:
+                    chunk.metadata["chunk_index"] = chunk_index
+                    chunk_index += 1
+
+                # 이전 개정판의 동일 페이지에서 같은 텍스트의 청크 벡터 찾기
+                reusable: Dict[str, List[float]] = {}
+                if revision and page.get("text_hash") in revision["pages_by_hash"]:
+                    previous_page = revision["pages_by_hash"][page["text_hash"]]
+                    reusable = revision["vectors"].get(previous_page, {})
+                vectors = [reusable.get(chunk.page_content) for chunk in chunks]
+
+                reused = sum(1 for vector in vectors if vector is not None)
+                if chunks and reused == len(chunks):
+                    stats["reused_pages"] += 1
+                stats["reused_chunks"] += reused
+                page_rows.append({
+                    "document_id": document_id,
+                    "page_number": page_number,
+                    "text_hash": page.get("text_hash"),
+                    "chunk_count": len(chunks),
+                    "reused": bool(chunks) and reused == len(chunks),
+                })
+
+                for row in page.get("spec_rows", []):
+                    spec_rows.append(dict(
+                        row,
+                        document_id=document_id,
+                        section_id=current_section["id"] if current_section else None
+                    ))
+                if len(spec_rows) >= _SPEC_FLUSH_SIZE:
+                    await self._write_spec_rows(spec_rows, stats)
+                    spec_rows = []
+
+                stats["pages"] += 1
+                stats["chunk_time"] += time.time() - started
+
+                for chunk, vector in zip(chunks, vectors):
+                    await chunk_queue.put((chunk, vector))
+
+        except BaseException:
+            if store_writer:
+                store_writer.abort()
+            raise
+
+        if store_writer:
+            await loop.run_in_executor(self.pdf_service.executor, store_writer.close)
+        if page_rows:
+            async with AsyncSessionLocal() as session:
+                await session.execute(insert(DocumentPage), page_rows)
+                await session.commit()
+        if spec_rows:
+            await self._write_spec_rows(spec_rows, stats)
+        if sections:
+            await self._close_sections(sections, position)
+            stats["sections"] = len(sections)
+        await chunk_queue.put(_END)
+
+    async def _write_sections(self, document_id: str, sections: List[Dict[str, Any]]):
+        """새로 시작된 섹션 행을 기록하고 청크 메타데이터용 id를 채움"""
+        async with AsyncSessionLocal() as session:
+            rows = [
+                DocumentSection(
+                    document_id=document_id,
+                    section_title=section["title"][:255],
+                    section_type=section["section_type"],
+                    page_number=section["page_number"],
+                    start_position=section["start_position"],
+                    content_preview=section["content_preview"]
+                )
+                for section in sections
+            ]
+            session.add_all(rows)
+            await session.flush()
+            for section, row in zip(sections, rows):
+                section["id"] = row.id
+            await session.commit()
+
+    async def _close_sections(self, sections: List[Dict[str, Any]], text_length: int):
+        """각 섹션의 끝 위치(다음 섹션 시작 또는 문서 끝)를 한 번에 기록"""
+        ends = [section["start_position"] for section in sections[1:]] + [text_length]
+        async with AsyncSessionLocal() as session:
+            await session.execute(
+                update(DocumentSection),
+                [{"id": section["id"], "end_position": end} for section, end in zip(sections, ends)]
+            )
+            await session.commit()
+
+    async def _write_spec_rows(self, rows: List[Dict[str, Any]], stats: Dict[str, Any]):
+        """사양 행을 단일 트랜잭션의 bulk insert로 기록"""
+        async with AsyncSessionLocal() as session:
+            await session.execute(insert(Specification), rows)
+            await session.commit()
+        stats["spec_rows"] += len(rows)
+
+    async def _embed_stage(self, chunk_queue: asyncio.Queue, embedded_queue: asyncio.Queue,
+                           stats: Dict[str, Any]):
+        """3단계: 청크를 배치로 모아 임베딩 (이전 개정판에서 넘어온 벡터는 그대로 사용)"""
+        batch: List[TextChunk] = []
+        vectors: List[Optional[List[float]]] = []
+        finished = False
+
+        while not finished:
+            item = await chunk_queue.get()
+            if item is _END:
+                finished = True
+            else:
+                chunk, vector = item
+                batch.append(chunk)
+                vectors.append(vector)
+
+            # 배치가 찼거나, 큐가 비어 기다려야 하는 상황이면 지금까지 모인 청크를 임베딩
+            if batch and (finished or len(batch) >= self.embed_batch_size or chunk_queue.empty()):
+                # 임베딩이 청킹을 따라가지 못하면 이 대기열이 queue_size까지 참
+                QUEUE_DEPTH.labels("ingestion_chunks").set(chunk_queue.qsize())
+                missing = [i for i, vector in enumerate(vectors) if vector is None]
+                if missing:
+                    started = time.time()
+                    embeddings = await self.vector_service.embed_documents(
+                        [batch[i].page_content for i in missing]
+                    )
+                    stats["embed_time"] += time.time() - started
+                    for i, embedding in zip(missing, embeddings):
+                        vectors[i] = embedding
+
+                await embedded_queue.put((batch, vectors))
+                batch = []
+                vectors = []
+
+        await embedded_queue.put(_END)
+
+    async def _index_stage(self, document_id: str, embedded_queue: asyncio.Queue,
+                           chunk_rows: List[Dict[str, Any]], stats: Dict[str, Any], start_time: float,
+                           pending: Optional[List[Any]] = None):
+        """4단계: 임베딩된 배치를 인덱스에 추가 (즉시 검색 가능), 청크 행은 모아 두었다가 한 번에 기록
+
+        pending이 주어지면(재청킹) 인덱스에 추가하지 않고 교체 시점까지 배치를 모아 둡니다.
+        """
+        while True:
+            item = await embedded_queue.get()
+            if item is _END:
+                break
+
+            batch, embeddings = item
+            started = time.time()
+            # 문서 전체에서 고유한 청크 번호로 docstore id를 만들어 청크 행과 연결
+            ids = [f"{document_id}:{chunk.metadata['chunk_index']}" for chunk in batch]
+            stats["chunks"] += len(batch)
+            if pending is not None:
+                pending.append((batch, embeddings, ids))
+                continue
+
+            success = await self.vector_service.add_embedded_documents(
+                batch, embeddings, self.index_name, persist=False, ids=ids, save_metadata=False
+            )
+            if not success:
+                raise RuntimeError("벡터 인덱스 추가 실패")
+            chunk_rows.extend(self.vector_service.chunk_metadata_rows(batch, ids))
+
+            stats["index_time"] += time.time() - started
+            if stats["time_to_first_index"] is None:
+                stats["time_to_first_index"] = time.time() - start_time
+                logger.info(f"⚡ 첫 청크 검색 가능: {stats['time_to_first_index']:.2f}s")
@@ -0,0 +1,411 @@
+import asyncio
+import os
+import socket
+import time
+from datetime import datetime, timedelta
+from typing import Dict, Any, Optional, List
+from loguru import logger
+
+from sqlalchemy import select, update, func, or_, and_
+
+from ..config.settings import settings
+from ..config.database import AsyncSessionLocal, IngestionJob
+
+
+class IngestionJobQueue:
+    """SQLite 기반 영속 문서 처리 작업 큐
+
+    작업은 ingestion_jobs 테이블에 저장되므로 프로세스가 재시작되어도 사라지지 않습니다.
+    워커는 리스(lease)를 잡고 작업을 처리하며 주기적으로 하트비트로 리스를 연장합니다.
+    리스가 만료된 running 작업은 워커가 죽은 것으로 보고 다른 워커가 다시 가져갑니다.
+    """
+
+    def __init__(self):
+        self.lease_seconds = settings.ingestion_lease_seconds
+        self.max_attempts = settings.ingestion_max_attempts
+        self.backoff_seconds = settings.ingestion_retry_backoff_seconds
+        self.small_file_bytes = settings.ingestion_small_file_bytes
+        # 같은 프로세스의 워커를 즉시 깨우기 위한 이벤트
+        self._wakeup = asyncio.Event()
+
+    async def enqueue(self, document_id: str, file_path: str, file_size: Optional[int] = None,
+                      mode: str = "full") -> int:
+        """문서 처리 작업 등록 (작은 파일일수록 우선순위 높음, mode=rechunk면 저장된 페이지로 재청킹)"""
+        priority = 0 if file_size is not None and file_size < self.small_file_bytes else 1
+
+        async with AsyncSessionLocal() as session:
+            job = IngestionJob(
+                document_id=document_id,
+                file_path=file_path,
+                file_size=file_size,
+                priority=priority,
+                mode=mode,
+                status="queued",
+                max_attempts=self.max_attempts,
+                available_at=datetime.utcnow()
+            )
+            session.add(job)
+            await session.commit()
+            job_id = job.id
+
+        self._wakeup.set()
+        logger.info(f"📥 작업 등록: job={job_id}, document={document_id}, priority={priority}, mode={mode}")
+        return job_id
+
+    async def wait_for_work(self, timeout: float):
+        """새 작업 등록 알림 또는 타임아웃까지 대기"""
+        try:
+            await asyncio.wait_for(self._wakeup.wait(), timeout=timeout)
+        except asyncio.TimeoutError:
+            pass
+        self._wakeup.clear()
+
+    async def claim(self, worker_id: str) -> Optional[Dict[str, Any]]:
+        """처리 가능한 작업 하나를 원자적으로 가져옴 (만료된 리스 포함)"""
+        now = datetime.utcnow()
+
+        candidate = (
+            select(IngestionJob.id)
+            .where(or_(
+                and_(IngestionJob.status == "queued", IngestionJob.available_at <= now),
+                and_(IngestionJob.status == "running", IngestionJob.lease_expires_at < now)
+            ))
+            .order_by(IngestionJob.priority, IngestionJob.id)
+            .limit(1)
+            .scalar_subquery()
+        )
+
+        # 단일 UPDATE 문으로 선택과 리스 획득을 함께 수행하여 워커 간 경합 방지
+        stmt = (
+            update(IngestionJob)
+            .where(IngestionJob.id == candidate)
+            .values(
+                status="running",
+                lease_owner=worker_id,
+                lease_expires_at=now + timedelta(seconds=self.lease_seconds),
+                heartbeat_at=now,
+                started_at=now,
+                attempts=IngestionJob.attempts + 1
+            )
+            .returning(
+                IngestionJob.id, IngestionJob.document_id, IngestionJob.file_path,
+                IngestionJob.file_size, IngestionJob.attempts, IngestionJob.max_attempts,
+                IngestionJob.mode
+            )
+        )
+
+        async with AsyncSessionLocal() as session:
+            row = (await session.execute(stmt)).first()
+            await session.commit()
+
+        if row is None:
+            return None
+
+        return dict(row._mapping)
+
+    async def heartbeat(self, job_id: int, worker_id: str) -> bool:
+        """리스 연장 (False면 다른 워커에게 리스를 빼앗김)"""
+        now = datetime.utcnow()
+        async with AsyncSessionLocal() as session:
+            result = await session.execute(
+                update(IngestionJob)
+                .where(IngestionJob.id == job_id, IngestionJob.lease_owner == worker_id,
+                       IngestionJob.status == "running")
+                .values(heartbeat_at=now, lease_expires_at=now + timedelta(seconds=self.lease_seconds))
+            )
+            await session.commit()
+            return result.rowcount == 1
+
+    async def complete(self, job_id: int, worker_id: str, stats: Optional[Dict[str, Any]] = None) -> bool:
+        """작업 완료 처리 (False면 리스를 이미 잃어 다른 워커가 처리 중)"""
+        stats = stats or {}
+        async with AsyncSessionLocal() as session:
+            result = await session.execute(
+                update(IngestionJob)
+                .where(IngestionJob.id == job_id, IngestionJob.lease_owner == worker_id)
+                .values(
+                    status="completed",
+                    finished_at=datetime.utcnow(),
+                    lease_owner=None,
+                    lease_expires_at=None,
+                    page_count=stats.get("page_count"),
+                    chunk_count=stats.get("chunks"),
+                    last_error=None
+                )
+            )
+            await session.commit()
+            return result.rowcount == 1
+
+    async def fail(self, job_id: int, worker_id: str, attempts: int, max_attempts: int,
+                   error: str) -> Optional[bool]:
+        """작업 실패 처리 - 재시도 가능하면 백오프 후 재등록하고 True 반환
+
+        리스를 이미 잃었으면 작업을 건드리지 않고 None 반환 (다른 워커가 처리 중)
+        """
+        retry = attempts < max_attempts
+        now = datetime.utcnow()
+
+        values: Dict[str, Any] = {
+            "last_error": error[:2000],
+            "lease_owner": None,
+            "lease_expires_at": None,
+        }
+        if retry:
+            delay = self.backoff_seconds * (2 ** (attempts - 1))
+            values.update(status="queued", available_at=now + timedelta(seconds=delay))
+        else:
+            values.update(status="failed", finished_at=now)
+
+        async with AsyncSessionLocal() as session:
+            result = await session.execute(
+                update(IngestionJob)
+                .where(IngestionJob.id == job_id, IngestionJob.lease_owner == worker_id)
+                .values(**values)
+            )
+            await session.commit()
+
+        if result.rowcount != 1:
+            return None
+        return retry
+
+    async def get_job_status(self, document_id: str) -> Optional[Dict[str, Any]]:
+        """문서의 최신 작업 상태와 대기열 위치 조회"""
+        async with AsyncSessionLocal() as session:
+            result = await session.execute(
+                select(IngestionJob)
+                .where(IngestionJob.document_id == document_id)
+                .order_by(IngestionJob.id.desc())
+                .limit(1)
+            )
+            job = result.scalar_one_or_none()
+            if job is None:
+                return None
+
+            position = None
+            if job.status == "queued":
+                # 같은 우선순위에서는 먼저 등록된 작업이 앞선다
+                ahead = await session.execute(
+                    select(func.count(IngestionJob.id)).where(
+                        IngestionJob.status == "queued",
+                        or_(
+                            IngestionJob.priority < job.priority,
+                            and_(IngestionJob.priority == job.priority, IngestionJob.id < job.id)
+                        )
+                    )
+                )
+                position = (ahead.scalar() or 0) + 1
+
+        return {
+            "job_id": job.id,
+            "job_status": job.status,
+            "queue_position": position,
+            "attempts": job.attempts,
+            "max_attempts": job.max_attempts,
+            "next_attempt_at": job.available_at if job.status == "queued" else None,
+            "last_error": job.last_error,
+        }
+
+    async def next_claimable_at(self) -> Optional[datetime]:
+        """아직 끝나지 않은 작업 중 가장 먼저 가져갈 수 있게 되는 시각 (없으면 None)"""
+        async with AsyncSessionLocal() as session:
+            queued_at = (await session.execute(
+                select(func.min(IngestionJob.available_at)).where(IngestionJob.status == "queued")
+            )).scalar()
+            lease_at = (await session.execute(
+                select(func.min(IngestionJob.lease_expires_at)).where(IngestionJob.status == "running")
+            )).scalar()
+
+        candidates = [at for at in (queued_at, lease_at) if at is not None]
+        return min(candidates) if candidates else None
+
+    async def get_queue_stats(self, window_minutes: int = 60) -> Dict[str, Any]:
+        """대기열 길이와 최근 처리량 통계"""
+        since = datetime.utcnow() - timedelta(minutes=window_minutes)
+
+        async with AsyncSessionLocal() as session:
+            status_rows = await session.execute(
+                select(IngestionJob.status, func.count(IngestionJob.id)).group_by(IngestionJob.status)
+            )
+            counts = {status: count for status, count in status_rows}
+
+            recent = await session.execute(
+                select(IngestionJob.started_at, IngestionJob.finished_at, IngestionJob.page_count)
+                .where(IngestionJob.status == "completed", IngestionJob.finished_at >= since)
+            )
+            recent_jobs = recent.all()
+
+        durations = [
+            (finished - started).total_seconds()
+            for started, finished, _ in recent_jobs
+            if started and finished
+        ]
+        pages = sum(page_count or 0 for _, _, page_count in recent_jobs)
+
+        return {
+            "queued": counts.get("queued", 0),
+            "running": counts.get("running", 0),
+            "completed": counts.get("completed", 0),
+            "failed": counts.get("failed", 0),
+            "window_minutes": window_minutes,
+            "documents_per_minute": round(len(recent_jobs) / window_minutes, 3),
+            "pages_per_minute": round(pages / window_minutes, 3),
+            "avg_job_seconds": round(sum(durations) / len(durations), 2) if durations else None,
+        }
+
+
+class IngestionWorkerPool:
+    """작업 큐를 소비하는 비동기 워커 풀 (동시 처리 문서 수 제한)"""
+
+    def __init__(self, queue: IngestionJobQueue, concurrency: int = None):
+        self.queue = queue
+        self.concurrency = concurrency or settings.ingestion_workers
+        self.poll_interval = settings.ingestion_poll_interval
+        self.worker_prefix = f"{socket.gethostname()}:{os.getpid()}"
+        self._tasks: List[asyncio.Task] = []
+        self._running = False
+        # 현재 프로세스에서 처리 완료한 작업 통계 (CLI 리포트용)
+        self.completed_stats: List[Dict[str, Any]] = []
+
+    async def start(self):
+        """워커 태스크 시작"""
+        if self._running:
+            return
+        self._running = True
+        self._tasks = [
+            asyncio.create_task(self._worker_loop(f"{self.worker_prefix}:{n}"))
+            for n in range(self.concurrency)
+        ]
+        logger.info(f"🧵 문서 처리 워커 {self.concurrency}개 시작")
+
+    async def stop(self):
+        """워커 태스크 종료 (처리 중인 작업은 리스 만료 후 다른 워커가 재개)"""
+        self._running = False
+        for task in self._tasks:
+            task.cancel()
+        await asyncio.gather(*self._tasks, return_exceptions=True)
+        self._tasks = []
+        logger.info("🧵 문서 처리 워커 종료")
+
+    async def run_until_empty(self):
+        """대기 중인 작업이 모두 끝날 때까지 처리 (CLI 배치 처리용)
+
+        재시도 대기(backoff) 중이거나 리스가 남아 있는 작업이 있으면
+        가져갈 수 있는 시각까지 기다렸다가 다시 처리합니다.
+        """
+        while True:
+            await asyncio.gather(*[
+                self._worker_loop(f"{self.worker_prefix}:{n}", stop_when_idle=True)
+                for n in range(self.concurrency)
+            ])
+
+            next_at = await self.queue.next_claimable_at()
+            if next_at is None:
+                return
+
+            delay = (next_at - datetime.utcnow()).total_seconds()
+            if delay > 0:
+                logger.info(f"⏳ 재시도 대기 중인 작업: {delay:.0f}초 후 재개")
+                await asyncio.sleep(delay + 0.1)
+
+    async def _worker_loop(self, worker_id: str, stop_when_idle: bool = False):
+        """작업을 하나씩 가져와 처리하는 워커 루프"""
+        while self._running or stop_when_idle:
+            try:
+                job = await self.queue.claim(worker_id)
+            except asyncio.CancelledError:
+                raise
+            except Exception as e:
+                logger.error(f"작업 가져오기 실패 ({worker_id}): {e}")
+                job = None
+
+            if job is None:
+                if stop_when_idle:
+                    return
+                await self.queue.wait_for_work(self.poll_interval)
+                continue
+
+            await self._run_job(job, worker_id)
+
+    async def _run_job(self, job: Dict[str, Any], worker_id: str):
+        """작업 하나 처리 (처리 중 하트비트 유지)"""
+        from .pdf_service import get_pdf_service
+        from .vector_service import get_vector_service
+
+        pdf_service = get_pdf_service()
+        document_id = job["document_id"]
+        # 재청킹이 실패해도 기존 인덱스는 그대로이므로 문서 상태는 바꾸지 않음 (결과는 작업에 기록)
+        rechunk = job["mode"] == "rechunk"
+
+        if job["attempts"] > job["max_attempts"]:
+            # 리스 만료로 회수된 작업이 이미 재시도 한도를 넘은 경우
+            await self.queue.fail(job["id"], worker_id, job["attempts"], job["max_attempts"], "재시도 한도 초과")
+            if not rechunk:
+                await pdf_service._update_document_status(document_id, "failed")
+            return
+
+        logger.info(f"🔧 작업 시작: job={job['id']}, document={document_id}, 시도 {job['attempts']}/{job['max_attempts']}")
+        started = time.time()
+        vector_service = await get_vector_service()
+        # 리스를 잃으면 하트비트 루프가 처리 태스크를 취소 (같은 문서를 두 워커가 동시에 처리하지 않도록)
+        ingest_task = asyncio.create_task(pdf_service.ingest_document(
+            job["file_path"], document_id, vector_service,
+            from_store=rechunk
+        ))
+        heartbeat_task = asyncio.create_task(self._heartbeat_loop(job["id"], worker_id, ingest_task))
+
+        try:
+            stats = await ingest_task
+            stats["job_seconds"] = time.time() - started
+            if await self.queue.complete(job["id"], worker_id, stats):
+                self.completed_stats.append(stats)
+            else:
+                logger.warning(f"리스를 잃은 작업의 완료 기록 생략 (job={job['id']})")
+
+        except asyncio.CancelledError:
+            if heartbeat_task.done() and not heartbeat_task.cancelled() and heartbeat_task.result():
+                # 리스 상실로 중단: 작업과 문서 상태는 새 리스 보유 워커가 관리
+                logger.warning(f"리스 상실로 작업 중단 (job={job['id']}, document={document_id})")
+                return
+            # 종료 시에는 상태를 바꾸지 않고 리스 만료에 맡김 (재시작 후 재개)
+            raise
+
+        except Exception as e:
+            retry = await self.queue.fail(job["id"], worker_id, job["attempts"], job["max_attempts"], str(e))
+            if retry is None:
+                logger.warning(f"리스를 잃은 작업의 실패 기록 생략 (job={job['id']}): {e}")
+            elif retry:
+                logger.warning(f"⚠️ 작업 실패, 재시도 예정 (job={job['id']}): {e}")
+                if not rechunk:
+                    await pdf_service._update_document_status(document_id, "pending")
+            else:
+                logger.error(f"❌ 작업 최종 실패 (job={job['id']}): {e}")
+                if not rechunk:
+                    await pdf_service._update_document_status(document_id, "failed")
+
+        finally:
+            heartbeat_task.cancel()
+            ingest_task.cancel()
+
+    async def _heartbeat_loop(self, job_id: int, worker_id: str, job_task: asyncio.Task) -> bool:
+        """리스 만료 전에 주기적으로 연장 (리스를 잃으면 처리 태스크를 취소하고 True 반환)"""
+        interval = max(1.0, self.queue.lease_seconds / 3)
+        while True:
+            await asyncio.sleep(interval)
+            try:
+                if not await self.queue.heartbeat(job_id, worker_id):
+                    logger.warning(f"작업 리스 상실 (job={job_id}, worker={worker_id})")
+                    job_task.cancel()
+                    return True
+            except Exception as e:
+                logger.warning(f"하트비트 실패 (job={job_id}): {e}")
+
+
+# 전역 작업 큐 인스턴스
+_job_queue: Optional[IngestionJobQueue] = None
+
+def get_job_queue() -> IngestionJobQueue:
+    """작업 큐 싱글톤 인스턴스 반환"""
+    global _job_queue
+    if _job_queue is None:
+        _job_queue = IngestionJobQueue()
+    return _job_queue
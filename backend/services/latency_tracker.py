@@ -0,0 +1,184 @@
+"""질의 파이프라인 단계별 지연 시간 추적
+
+각 질의는 단계 이름 → 소요 시간(ms) dict에 단계 시간을 기록하고(stage),
+응답이 끝나면 record_timings()로
+1. 단계별 히스토그램(HDR 방식 로그 간격 버킷)에 누적하고
+2. 현재 HTTP 요청의 Server-Timing 헤더에 실을 단계 시간에 더합니다.
+
+히스토그램은 값 범위와 관계없이 상대 오차가 일정하고 메모리가 고정이라
+요청 수가 늘어도 p50/p95/p99를 싸게 구할 수 있습니다.
+"""
+import math
+import threading
+import time
+from contextlib import contextmanager
+from contextvars import ContextVar
+from typing import Any, Dict, List, Optional
+
+from ..config.settings import settings
+from .metrics import QUERY_STAGE_SECONDS
+
+
+# 현재 HTTP 요청에서 기록된 단계 시간 (ServerTimingMiddleware가 요청마다 설정)
+_request_timings: ContextVar[Optional[Dict[str, float]]] = ContextVar("request_timings", default=None)
+
+
+@contextmanager
+def stage(timings: Dict[str, float], name: str):
+    """블록 소요 시간(ms)을 timings[name]에 누적"""
+    started = time.perf_counter()
+    try:
+        yield
+    finally:
+        elapsed = (time.perf_counter() - started) * 1000
+        timings[name] = round(timings.get(name, 0.0) + elapsed, 1)
+
+
+class LatencyHistogram:
+    """로그 간격 버킷 지연 시간 히스토그램 (상대 오차 precision 이내)"""
+
+    def __init__(self, lowest_ms: float = 0.01, highest_ms: float = 600000.0, precision: float = 0.01):
+        self.lowest = lowest_ms
+        # 버킷 경계 비율: 버킷의 기하 중앙값과 실제 값의 차이가 precision 이내
+        self._log_growth = math.log((1 + precision) / (1 - precision))
+        self._counts: List[int] = [0] * (int(math.log(highest_ms / lowest_ms) / self._log_growth) + 2)
+        self._lock = threading.Lock()
+        self.count = 0
+        self.total = 0.0
+        self.max = 0.0
+
+    def _index(self, value: float) -> int:
+        if value <= self.lowest:
+            return 0
+        index = int(math.log(value / self.lowest) / self._log_growth) + 1
+        return min(index, len(self._counts) - 1)
+
+    def _value_at(self, index: int) -> float:
+        if index == 0:
+            return self.lowest
+        return self.lowest * math.exp((index - 0.5) * self._log_growth)
+
+    def record(self, value_ms: float):
+        with self._lock:
+            self._counts[self._index(value_ms)] += 1
+            self.count += 1
+            self.total += value_ms
+            self.max = max(self.max, value_ms)
+
+    def percentiles(self, quantiles: List[float]) -> List[float]:
+        """분위수(0-100) 목록에 해당하는 값 (버킷 대표값, 최댓값을 넘지 않음)"""
+        with self._lock:
+            if not self.count:
+                return [0.0 for _ in quantiles]
+            targets = [max(1, math.ceil(q / 100 * self.count)) for q in quantiles]
+            values: List[float] = [self.max] * len(quantiles)
+            cumulative = 0
+            pending = sorted(range(len(targets)), key=lambda i: targets[i])
+            for index, bucket_count in enumerate(self._counts):
+                if not bucket_count:
+                    continue
+                cumulative += bucket_count
+                while pending and cumulative >= targets[pending[0]]:
+                    values[pending.pop(0)] = min(self._value_at(index), self.max)
+                if not pending:
+                    break
+            return [round(value, 1) for value in values]
+
+    def snapshot(self) -> Dict[str, Any]:
+        p50, p95, p99 = self.percentiles([50, 95, 99])
+        return {
+            "count": self.count,
+            "mean_ms": round(self.total / self.count, 1) if self.count else 0.0,
+            "p50_ms": p50,
+            "p95_ms": p95,
+            "p99_ms": p99,
+            "max_ms": round(self.max, 1),
+        }
+
+
+class LatencyTracker:
+    """단계 이름별 지연 시간 히스토그램"""
+
+    def __init__(self):
+        self._histograms: Dict[str, LatencyHistogram] = {}
+        self._lock = threading.Lock()
+
+    def histogram(self, name: str) -> LatencyHistogram:
+        histogram = self._histograms.get(name)
+        if histogram is None:
+            with self._lock:
+                histogram = self._histograms.setdefault(name, LatencyHistogram())
+        return histogram
+
+    def observe(self, timings: Dict[str, float]):
+        for name, value in timings.items():
+            self.histogram(name).record(value)
+
+    def mean(self, name: str) -> float:
+        histogram = self._histograms.get(name)
+        return round(histogram.total / histogram.count, 1) if histogram and histogram.count else 0.0
+
+    def summary(self) -> Dict[str, Dict[str, Any]]:
+        return {name: histogram.snapshot() for name, histogram in sorted(self._histograms.items())}
+
+    def reset(self):
+        with self._lock:
+            self._histograms = {}
+
+
+_latency_tracker: Optional[LatencyTracker] = None
+
+
+def get_latency_tracker() -> LatencyTracker:
+    """단계별 지연 시간 추적기 싱글톤 인스턴스 반환"""
+    global _latency_tracker
+    if _latency_tracker is None:
+        _latency_tracker = LatencyTracker()
+    return _latency_tracker
+
+
+def record_timings(timings: Dict[str, float]):
+    """질의 하나의 단계 시간을 히스토그램과 현재 요청의 Server-Timing에 반영"""
+    get_latency_tracker().observe(timings)
+    for name, value in timings.items():
+        QUERY_STAGE_SECONDS.labels(name).observe(value / 1000)
+    request_timings = _request_timings.get()
+    if request_timings is not None:
+        # 한 요청에서 여러 질의를 처리하면 단계별로 합산
+        for name, value in timings.items():
+            request_timings[name] = round(request_timings.get(name, 0.0) + value, 1)
+
+
+def server_timing_header(timings: Dict[str, float]) -> str:
+    """Server-Timing 헤더 값 (예: "embed;dur=12.3, search;dur=4.1")"""
+    return ", ".join(f"{name};dur={value}" for name, value in timings.items())
+
+
+class ServerTimingMiddleware:
+    """질의 단계 시간을 Server-Timing 응답 헤더로 전달하는 ASGI 미들웨어
+
+    헤더는 응답 시작 시점에 보내므로, 스트리밍 응답은 헤더 대신 done 이벤트에 단계 시간을 싣습니다.
+    """
+
+    def __init__(self, app):
+        self.app = app
+
+    async def __call__(self, scope, receive, send):
+        if scope["type"] != "http" or not settings.server_timing_enabled:
+            await self.app(scope, receive, send)
+            return
+
+        timings: Dict[str, float] = {}
+        token = _request_timings.set(timings)
+
+        async def send_with_timing(message):
+            if message["type"] == "http.response.start" and timings:
+                headers = list(message.get("headers", []))
+                headers.append((b"server-timing", server_timing_header(timings).encode("latin-1")))
+                message = dict(message, headers=headers)
+            await send(message)
+
+        try:
+            await self.app(scope, receive, send_with_timing)
+        finally:
+            _request_timings.reset(token)
@@ -0,0 +1,186 @@
+"""Prometheus 지표
+
+prometheus_client가 설치되어 있으면 프로세스 안의 레지스트리에 지표를 기록하고, /metrics가
+Prometheus 텍스트 형식으로 내보냅니다. 기록은 메모리 값 갱신뿐이라 요청 경로에 부담이 없고,
+조회할 때 SQL을 실행하지 않습니다 (문서 처리 작업 수만 METRICS_REFRESH_INTERVAL마다 한 번 조회).
+prometheus_client가 없거나 METRICS_ENABLED=false면 모든 지표가 아무 것도 하지 않는
+객체로 대체되므로 호출 측 코드는 그대로 동작합니다.
+
+다중 워커(uvicorn --workers N)로 실행할 때는 PROMETHEUS_MULTIPROC_DIR에 공유 디렉토리를
+지정합니다. 각 프로세스가 지표 값을 이 디렉토리의 파일에 기록하고, /metrics 요청을 받은
+워커가 모든 프로세스의 값을 합쳐 응답합니다. 디렉토리는 서버 시작 전에 비워야 합니다.
+"""
+import os
+import time
+from pathlib import Path
+from typing import Optional, Sequence, Tuple
+
+from loguru import logger
+
+from ..config.settings import settings
+
+
+if settings.metrics_enabled and settings.prometheus_multiproc_dir:
+    # prometheus_client는 import 시점의 환경 변수로 다중 프로세스 모드를 결정
+    os.environ.setdefault("PROMETHEUS_MULTIPROC_DIR", settings.prometheus_multiproc_dir)
+    Path(os.environ["PROMETHEUS_MULTIPROC_DIR"]).mkdir(parents=True, exist_ok=True)
+
+try:
+    from prometheus_client import (
+        CONTENT_TYPE_LATEST, REGISTRY, CollectorRegistry, Counter, Gauge, Histogram,
+        generate_latest, multiprocess
+    )
+except ImportError:
+    Counter = Gauge = Histogram = None
+
+
+METRICS_AVAILABLE = settings.metrics_enabled and Histogram is not None
+MULTIPROCESS = METRICS_AVAILABLE and bool(os.environ.get("PROMETHEUS_MULTIPROC_DIR"))
+
+
+class _NoopMetric:
+    """prometheus_client가 없을 때 쓰는 지표 (모든 기록 무시)"""
+
+    def labels(self, *args, **kwargs) -> "_NoopMetric":
+        return self
+
+    def inc(self, amount: float = 1):
+        pass
+
+    def set(self, value: float):
+        pass
+
+    def observe(self, value: float):
+        pass
+
+
+_NOOP = _NoopMetric()
+
+
+def _counter(name: str, documentation: str, labelnames: Sequence[str] = ()):
+    return Counter(name, documentation, labelnames) if METRICS_AVAILABLE else _NOOP
+
+
+def _gauge(name: str, documentation: str, labelnames: Sequence[str] = (), multiprocess_mode: str = "livesum"):
+    if not METRICS_AVAILABLE:
+        return _NOOP
+    return Gauge(name, documentation, labelnames, multiprocess_mode=multiprocess_mode)
+
+
+def _histogram(name: str, documentation: str, labelnames: Sequence[str] = (),
+               buckets: Sequence[float] = ()):
+    return Histogram(name, documentation, labelnames, buckets=buckets) if METRICS_AVAILABLE else _NOOP
+
+
+_LATENCY_BUCKETS = (0.005, 0.01, 0.025, 0.05, 0.1, 0.25, 0.5, 1.0, 2.5, 5.0, 10.0, 30.0, 60.0, 120.0)
+
+HTTP_REQUEST_SECONDS = _histogram(
+    "rag_http_request_duration_seconds", "HTTP 요청 처리 시간 (스트리밍은 응답이 끝날 때까지)",
+    ("method", "route", "status"), _LATENCY_BUCKETS
+)
+QUERY_STAGE_SECONDS = _histogram(
+    "rag_query_stage_duration_seconds", "질의 파이프라인 단계별 소요 시간",
+    ("stage",), _LATENCY_BUCKETS
+)
+EMBEDDING_BATCH_SIZE = _histogram(
+    "rag_embedding_batch_size", "문서 임베딩 호출당 텍스트 수",
+    buckets=(1, 2, 4, 8, 16, 32, 64, 128, 256, 512)
+)
+FAISS_SEARCH_SECONDS = _histogram(
+    "rag_faiss_search_duration_seconds", "FAISS 유사도 검색 시간 (scope: 섹션/문서 범위 또는 전체)",
+    ("scope",), (0.0005, 0.001, 0.0025, 0.005, 0.01, 0.025, 0.05, 0.1, 0.25, 0.5, 1.0)
+)
+OLLAMA_TOKENS_PER_SECOND = _histogram(
+    "rag_ollama_tokens_per_second", "Ollama 응답 생성 속도 (eval_count / eval_duration)",
+    buckets=(1, 2, 5, 10, 20, 30, 50, 75, 100, 150, 200, 400)
+)
+INGESTION_PAGES_PER_SECOND = _histogram(
+    "rag_ingestion_pages_per_second", "문서 하나의 처리 속도 (페이지 / 파이프라인 전체 시간)",
+    buckets=(0.1, 0.25, 0.5, 1, 2, 5, 10, 20, 50, 100)
+)
+INGESTION_PAGES = _counter("rag_ingestion_pages", "처리한 페이지 수")
+INGESTION_DOCUMENTS = _counter("rag_ingestion_documents", "결과별 문서 처리 파이프라인 실행 수", ("status",))
+CACHE_REQUESTS = _counter(
+    "rag_cache_requests", "캐시 조회 수 (적중률 = hit / (hit + miss))", ("cache", "result")
+)
+QUEUE_DEPTH = _gauge("rag_queue_depth", "프로세스 내 대기열 길이", ("queue",))
+INGESTION_JOBS = _gauge(
+    "rag_ingestion_jobs", "상태별 문서 처리 작업 수", ("status",), multiprocess_mode="livemostrecent"
+)
+INDEX_VECTORS = _gauge("rag_index_vectors", "벡터 인덱스의 벡터 수", multiprocess_mode="livemax")
+
+
+def record_cache_lookups(cache: str, hits: int, misses: int):
+    if hits:
+        CACHE_REQUESTS.labels(cache, "hit").inc(hits)
+    if misses:
+        CACHE_REQUESTS.labels(cache, "miss").inc(misses)
+
+
+_jobs_refreshed_at: Optional[float] = None
+
+
+async def refresh_ingestion_jobs():
+    """문서 처리 작업 수 갱신 (DB 조회, settings.metrics_refresh_interval마다 한 번)"""
+    global _jobs_refreshed_at
+    if not METRICS_AVAILABLE:
+        return
+    now = time.monotonic()
+    if _jobs_refreshed_at is not None and now - _jobs_refreshed_at < settings.metrics_refresh_interval:
+        return
+    _jobs_refreshed_at = now
+
+    from .job_queue import get_job_queue
+    try:
+        stats = await get_job_queue().get_queue_stats()
+    except Exception as e:
+        logger.warning(f"문서 처리 작업 수 조회 실패: {e}")
+        return
+    for status in ("queued", "running", "completed", "failed"):
+        INGESTION_JOBS.labels(status).set(stats.get(status, 0))
+
+
+def render_metrics() -> Tuple[bytes, str]:
+    """Prometheus 텍스트 형식 지표와 Content-Type (다중 프로세스 모드면 모든 워커의 값을 합산)"""
+    if MULTIPROCESS:
+        registry = CollectorRegistry()
+        multiprocess.MultiProcessCollector(registry)
+    else:
+        registry = REGISTRY
+    return generate_latest(registry), CONTENT_TYPE_LATEST
+
+
+def mark_process_dead():
+    """종료하는 워커의 live* 게이지 파일 정리 (다중 프로세스 모드)"""
+    if MULTIPROCESS:
+        multiprocess.mark_process_dead(os.getpid())
+
+
+class MetricsMiddleware:
+    """HTTP 요청 처리 시간을 라우트 경로 템플릿별로 기록하는 ASGI 미들웨어"""
+
+    def __init__(self, app):
+        self.app = app
+
+    async def __call__(self, scope, receive, send):
+        if scope["type"] != "http" or not METRICS_AVAILABLE:
+            await self.app(scope, receive, send)
+            return
+
+        started = time.perf_counter()
+        status = 500
+
+        async def send_with_status(message):
+            nonlocal status
+            if message["type"] == "http.response.start":
+                status = message["status"]
+            await send(message)
+
+        try:
+            await self.app(scope, receive, send_with_status)
+        finally:
+            # 실제 경로 대신 라우트 템플릿(/api/documents/{document_id})을 써서 레이블 수를 제한
+            route = getattr(scope.get("route"), "path", None) or "unmatched"
+            HTTP_REQUEST_SECONDS.labels(scope["method"], route, str(status)).observe(
+                time.perf_counter() - started
+            )
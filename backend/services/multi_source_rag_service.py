@@ -20,6 +20,7 @@ from ..services.rag_service import get_rag_service
 from ..services.db_vector_service import get_db_vector_service
 from ..services.web_search_service import get_web_search_service
 from ..services.ollama_service import get_ollama_service
+from ..services.prompt_builder import get_prompt_builder
 from ..services.quality_service import get_quality_service
 from ..config.database import get_db
 
@@ -352,36 +353,11 @@ class MultiSourceRAGService:
 
         context = "\n\n".join(context_parts)
 
-        # 역할별 프롬프트 생성
-        role_prompts = {
-            UserRole.ENGINEER: "기술적 세부사항과 사양에 중점을 두어 답변하세요.",
-            UserRole.QUALITY: "품질 기준과 테스트 조건에 중점을 두어 답변하세요.",
-            UserRole.SALES: "제품 특징과 장점에 중점을 두어 답변하세요.",
-            UserRole.SUPPORT: "실용적인 해결책과 호환성에 중점을 두어 답변하세요."
-        }
-
-        role_instruction = role_prompts.get(request.user_role, role_prompts[UserRole.ENGINEER])
-
-        prompt = f"""다음 질문에 대해 제공된 정보를 바탕으로 정확하고 유용한 답변을 제공하세요.
-
-질문: {request.question}
-
-역할 지침: {role_instruction}
-
-참고 정보:
-{context}
-
-답변 지침:
-1. 제공된 정보만을 바탕으로 답변하세요
-2. 추측이나 불확실한 정보는 언급하지 마세요
-3. 관련 소스를 적절히 인용하세요
-4. 간결하고 명확하게 답변하세요
-
-답변:"""
-
-        # LLM으로 답변 생성
+        # LLM으로 답변 생성 (문서 RAG와 같은 프롬프트 구성)
         ollama_service = await get_ollama_service()
-        answer = await ollama_service.generate_response(prompt)
+        chat_prompt = get_prompt_builder().build(request.question, context, request.user_role)
+        answer = await ollama_service.chat(chat_prompt.messages)
+        logger.info(f"다중 소스 답변 생성 완료 - 프롬프트 {chat_prompt.prompt_tokens}토큰")
 
         # 품질 검증
         quality_service = await get_quality_service()
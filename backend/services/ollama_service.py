@@ -4,6 +4,7 @@ import json
 from typing import Optional, Dict, Any, List
 from loguru import logger
 from ..config.settings import settings
+from .metrics import OLLAMA_TOKENS_PER_SECOND
 
 class OllamaService:
     """Ollama 로컬 LLM 서비스"""
@@ -60,27 +61,44 @@ class OllamaService:
             logger.error(f"모델 다운로드 실패: {e}")
             return False
 
-    async def generate_response(self, prompt: str, context: str = "", **kwargs) -> str:
-        """컨텍스트 기반 응답 생성"""
-        try:
-            formatted_prompt = self._format_manufacturing_prompt(prompt, context)
+    @staticmethod
+    def _options(kwargs: Dict[str, Any]) -> Dict[str, Any]:
+        return {
+            "temperature": kwargs.get("temperature", settings.temperature),
+            "top_k": kwargs.get("top_k", 40),
+            "top_p": kwargs.get("top_p", 0.9),
+            "num_predict": kwargs.get("max_tokens", 512),
+        }
 
+    @staticmethod
+    def _fill_stats(stats: Optional[Dict[str, Any]], chunk: Dict[str, Any]):
+        """마지막 응답의 토큰 수/소요 시간(ns)을 stats에 기록"""
+        if chunk.get("eval_count") and chunk.get("eval_duration"):
+            OLLAMA_TOKENS_PER_SECOND.observe(chunk["eval_count"] / (chunk["eval_duration"] / 1e9))
+        if stats is not None:
+            stats.update({
+                key: chunk[key] for key in (
+                    "eval_count", "eval_duration",
+                    "prompt_eval_count", "prompt_eval_duration", "total_duration"
+                ) if key in chunk
+            })
+
+    async def generate_response(self, prompt: str, **kwargs) -> str:
+        """완성된 프롬프트로 응답 생성 (/api/generate, 프롬프트를 그대로 전달)"""
+        try:
             payload = {
                 "model": self.model,
-                "prompt": formatted_prompt,
+                "prompt": prompt,
                 "stream": False,
-                "options": {
-                    "temperature": kwargs.get("temperature", settings.temperature),
-                    "top_k": kwargs.get("top_k", 40),
-                    "top_p": kwargs.get("top_p", 0.9),
-                    "num_predict": kwargs.get("max_tokens", 512),
-                }
+                "keep_alive": settings.ollama_keep_alive,
+                "options": self._options(kwargs)
             }
 
             response = await self.client.post(f"{self.host}/api/generate", json=payload)
 
             if response.status_code == 200:
                 result = response.json()
+                self._fill_stats(kwargs.get("stats"), result)
                 return result.get("response", "").strip()
             else:
                 logger.error(f"Ollama API 오류: {response.status_code} - {response.text}")
@@ -90,31 +108,52 @@ class OllamaService:
             logger.error(f"응답 생성 실패: {e}")
             return "죄송합니다. 시스템 오류가 발생했습니다."
 
-    async def generate_streaming_response(self, prompt: str, context: str = "", **kwargs):
-        """스트리밍 응답 생성"""
+    async def chat(self, messages: List[Dict[str, str]], **kwargs) -> str:
+        """채팅 메시지로 응답 생성 (/api/chat, stats에 dict를 넘기면 토큰 수/소요 시간을 채움)"""
         try:
-            formatted_prompt = self._format_manufacturing_prompt(prompt, context)
+            payload = {
+                "model": self.model,
+                "messages": messages,
+                "stream": False,
+                "keep_alive": settings.ollama_keep_alive,
+                "options": self._options(kwargs)
+            }
+
+            response = await self.client.post(f"{self.host}/api/chat", json=payload)
+
+            if response.status_code == 200:
+                result = response.json()
+                self._fill_stats(kwargs.get("stats"), result)
+                return result.get("message", {}).get("content", "").strip()
+            else:
+                logger.error(f"Ollama API 오류: {response.status_code} - {response.text}")
+                return "죄송합니다. 현재 응답을 생성할 수 없습니다."
+
+        except Exception as e:
+            logger.error(f"응답 생성 실패: {e}")
+            return "죄송합니다. 시스템 오류가 발생했습니다."
 
+    async def chat_stream(self, messages: List[Dict[str, str]], **kwargs):
+        """채팅 메시지로 스트리밍 응답 생성 (stats에 dict를 넘기면 마지막 청크의 토큰 수/소요 시간을 채움)"""
+        try:
             payload = {
                 "model": self.model,
-                "prompt": formatted_prompt,
+                "messages": messages,
                 "stream": True,
-                "options": {
-                    "temperature": kwargs.get("temperature", settings.temperature),
-                    "top_k": kwargs.get("top_k", 40),
-                    "top_p": kwargs.get("top_p", 0.9),
-                    "num_predict": kwargs.get("max_tokens", 512),
-                }
+                "keep_alive": settings.ollama_keep_alive,
+                "options": self._options(kwargs)
             }
 
-            async with self.client.stream("POST", f"{self.host}/api/generate", json=payload) as response:
+            async with self.client.stream("POST", f"{self.host}/api/chat", json=payload) as response:
                 if response.status_code == 200:
                     async for line in response.aiter_lines():
                         if line:
                             chunk = json.loads(line)
-                            if chunk.get("response"):
-                                yield chunk["response"]
+                            content = chunk.get("message", {}).get("content")
+                            if content:
+                                yield content
                             if chunk.get("done"):
+                                self._fill_stats(kwargs.get("stats"), chunk)
                                 break
                 else:
                     logger.error(f"스트리밍 API 오류: {response.status_code}")
@@ -124,48 +163,6 @@ class OllamaService:
             logger.error(f"스트리밍 응답 생성 실패: {e}")
             yield "죄송합니다. 시스템 오류가 발생했습니다."
 
-    def _format_manufacturing_prompt(self, question: str, context: str) -> str:
-        """제조업 특화 프롬프트 템플릿"""
-        if not context.strip():
-            return f"""
-다음 질문에 대해 간결하고 정확하게 답변해주세요:
-
-질문: {question}
-
-답변:"""
-
-        return f"""
-다음은 제품 데이터시트에서 추출한 기술 정보입니다:
-
-{context}
-
-질문: {question}
-
-위 정보를 바탕으로 정확하고 구체적인 답변을 제공하세요.
-답변에는 다음을 포함해주세요:
-1. 구체적인 수치와 단위 (있는 경우)
-2. 관련 조건이나 제약사항
-3. 정보가 불충분한 경우 그 사실을 명시
-
-답변:"""
-
-    def _format_role_specific_prompt(self, question: str, context: str, role: str) -> str:
-        """사용자 역할별 특화 프롬프트"""
-        role_instructions = {
-            "engineer": "기술적 세부사항과 사양에 집중하여 답변해주세요.",
-            "quality": "품질 기준, 한계치, 테스트 조건에 중점을 두어 답변해주세요.",
-            "sales": "제품의 특징과 장점을 강조하여 답변해주세요.",
-            "support": "문제해결과 호환성 정보에 초점을 맞춰 답변해주세요."
-        }
-
-        instruction = role_instructions.get(role, "")
-        base_prompt = self._format_manufacturing_prompt(question, context)
-
-        if instruction:
-            return base_prompt.replace("답변:", f"{instruction}\n\n답변:")
-
-        return base_prompt
-
     async def check_model_exists(self, model_name: str = None) -> bool:
         """특정 모델의 존재 여부 확인"""
         model_name = model_name or self.model
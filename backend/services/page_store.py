@@ -0,0 +1,205 @@
+"""문서별 처리 텍스트 저장소
+
+추출된 페이지를 페이지 단위로 압축한 블록과 페이지 → 오프셋 색인을 문서당 파일 하나에
+기록합니다. 출처 미리보기는 색인으로 해당 블록 하나만 읽어 풀고, 재청킹은 PDF를 다시
+파싱하지 않고 저장된 페이지(텍스트, 제목 위치, 사양 행)를 그대로 사용합니다.
+
+파일 구조: MAGIC(4) | 코덱(1) | 페이지 블록들 | 색인(압축 JSON) | 색인 오프셋(8) | 색인 길이(8)
+"""
+import json
+import os
+import struct
+import threading
+import zlib
+from collections import OrderedDict
+from pathlib import Path
+from typing import Dict, Any, Iterator, List, Optional
+
+from loguru import logger
+
+from ..config.settings import settings
+
+try:
+    import zstandard
+except ImportError:
+    zstandard = None
+
+
+_MAGIC = b"RPS1"
+_FOOTER = struct.Struct("<QQ")
+CODEC_ZLIB = 0
+CODEC_ZSTD = 1
+
+
+def _compressor(codec: int, level: int):
+    if codec == CODEC_ZSTD:
+        return zstandard.ZstdCompressor(level=level).compress
+    return lambda data: zlib.compress(data, min(level, 9))
+
+
+def _decompress(codec: int, data: bytes) -> bytes:
+    if codec == CODEC_ZSTD:
+        if zstandard is None:
+            raise RuntimeError("zstd로 압축된 페이지 저장소를 읽으려면 zstandard 패키지가 필요합니다.")
+        return zstandard.ZstdDecompressor().decompress(data)
+    return zlib.decompress(data)
+
+
+class PageStoreWriter:
+    """페이지를 순서대로 추가하고 close()에서 색인을 기록한 뒤 원자적으로 교체"""
+
+    def __init__(self, path: Path, level: int):
+        self.path = path
+        self.temp_path = path.with_name(path.name + ".tmp")
+        self.codec = CODEC_ZSTD if zstandard is not None else CODEC_ZLIB
+        self._compress = _compressor(self.codec, level)
+        self._file = open(self.temp_path, "wb")
+        self._file.write(_MAGIC + bytes([self.codec]))
+        self._offset = len(_MAGIC) + 1
+        self._index: Dict[str, List[Any]] = {}
+
+    def _write_block(self, data: bytes) -> List[int]:
+        block = self._compress(data)
+        self._file.write(block)
+        location = [self._offset, len(block)]
+        self._offset += len(block)
+        return location
+
+    def add_page(self, page_number: int, text: str, meta: Dict[str, Any]):
+        """페이지 텍스트 블록과 부가 정보(해시, 제목, 사양 행) 블록 기록"""
+        text_location = self._write_block(text.encode("utf-8"))
+        meta_location = self._write_block(json.dumps(meta, ensure_ascii=False).encode("utf-8"))
+        # 색인 항목: [텍스트 오프셋, 텍스트 블록 길이, 부가 정보 오프셋, 부가 정보 길이, 글자 수]
+        self._index[str(page_number)] = text_location + meta_location + [len(text)]
+
+    def close(self):
+        index_block = self._compress(json.dumps(self._index).encode("utf-8"))
+        self._file.write(index_block)
+        self._file.write(_FOOTER.pack(self._offset, len(index_block)))
+        self._file.flush()
+        os.fsync(self._file.fileno())
+        self._file.close()
+        os.replace(self.temp_path, self.path)
+
+    def abort(self):
+        self._file.close()
+        self.temp_path.unlink(missing_ok=True)
+
+
+class PageStoreReader:
+    """색인을 메모리에 두고 페이지 블록을 오프셋으로 직접 읽는 리더"""
+
+    def __init__(self, path: Path):
+        self.path = path
+        self.mtime = path.stat().st_mtime
+        with open(path, "rb") as f:
+            header = f.read(len(_MAGIC) + 1)
+            if header[:len(_MAGIC)] != _MAGIC:
+                raise ValueError(f"페이지 저장소 형식이 아닙니다: {path}")
+            self.codec = header[len(_MAGIC)]
+            f.seek(-_FOOTER.size, os.SEEK_END)
+            index_offset, index_length = _FOOTER.unpack(f.read(_FOOTER.size))
+            f.seek(index_offset)
+            raw_index = json.loads(_decompress(self.codec, f.read(index_length)))
+        self.index: Dict[int, List[int]] = {int(page): entry for page, entry in raw_index.items()}
+
+    @property
+    def page_numbers(self) -> List[int]:
+        return sorted(self.index)
+
+    def _read_block(self, offset: int, length: int) -> bytes:
+        with open(self.path, "rb") as f:
+            f.seek(offset)
+            return _decompress(self.codec, f.read(length))
+
+    def read_text(self, page_number: int) -> Optional[str]:
+        entry = self.index.get(page_number)
+        if entry is None:
+            return None
+        return self._read_block(entry[0], entry[1]).decode("utf-8")
+
+    def read_page(self, page_number: int) -> Optional[Dict[str, Any]]:
+        """추출 워커 결과와 같은 형태의 페이지 레코드 (재청킹용)"""
+        entry = self.index.get(page_number)
+        if entry is None:
+            return None
+        meta = json.loads(self._read_block(entry[2], entry[3]))
+        return dict(meta, page=page_number, text=self.read_text(page_number))
+
+
+class PageStore:
+    """문서별 페이지 저장소 디렉터리 (최근 연 색인은 LRU로 캐시)"""
+
+    def __init__(self, root: str, cache_size: int = 64):
+        self.root = Path(root)
+        self.root.mkdir(parents=True, exist_ok=True)
+        self.cache_size = cache_size
+        self._readers: "OrderedDict[str, PageStoreReader]" = OrderedDict()
+        self._lock = threading.Lock()
+
+    def path(self, document_id: str) -> Path:
+        return self.root / f"{document_id}.pages"
+
+    def exists(self, document_id: str) -> bool:
+        return self.path(document_id).exists()
+
+    def writer(self, document_id: str) -> PageStoreWriter:
+        return PageStoreWriter(self.path(document_id), settings.page_store_compression_level)
+
+    def reader(self, document_id: str) -> Optional[PageStoreReader]:
+        """캐시된 리더 반환 (파일이 다시 기록되었으면 색인을 새로 읽음)"""
+        path = self.path(document_id)
+        try:
+            mtime = path.stat().st_mtime
+        except FileNotFoundError:
+            self.evict(document_id)
+            return None
+
+        with self._lock:
+            reader = self._readers.get(document_id)
+            if reader is not None and reader.mtime == mtime:
+                self._readers.move_to_end(document_id)
+                return reader
+
+        reader = PageStoreReader(path)
+        with self._lock:
+            self._readers[document_id] = reader
+            self._readers.move_to_end(document_id)
+            while len(self._readers) > self.cache_size:
+                self._readers.popitem(last=False)
+        return reader
+
+    def get_page_text(self, document_id: str, page_number: int) -> Optional[str]:
+        reader = self.reader(document_id)
+        return reader.read_text(page_number) if reader else None
+
+    def iter_pages(self, document_id: str) -> Iterator[Dict[str, Any]]:
+        reader = self.reader(document_id)
+        if reader is None:
+            return
+        for page_number in reader.page_numbers:
+            yield reader.read_page(page_number)
+
+    def evict(self, document_id: str):
+        with self._lock:
+            self._readers.pop(document_id, None)
+
+    def delete(self, document_id: str):
+        self.evict(document_id)
+        try:
+            self.path(document_id).unlink(missing_ok=True)
+        except Exception as e:
+            logger.warning(f"페이지 저장소 삭제 실패 ({document_id}): {e}")
+
+
+_page_store: Optional[PageStore] = None
+
+
+def get_page_store() -> PageStore:
+    """페이지 저장소 싱글톤 인스턴스 반환"""
+    global _page_store
+    if _page_store is None:
+        _page_store = PageStore(settings.processed_path)
+        if zstandard is None:
+            logger.warning("zstandard가 설치되지 않아 페이지 저장소를 zlib으로 압축합니다.")
+    return _page_store
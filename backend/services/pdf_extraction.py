@@ -0,0 +1,190 @@
+"""PDF 페이지 추출 워커
+
+ProcessPoolExecutor의 워커 프로세스에서 실행되는 함수들입니다.
+spawn 방식으로 생성된 워커가 가볍게 import 할 수 있도록
+langchain, 데이터베이스 등 무거운 의존성은 가져오지 않습니다.
+"""
+import re
+import hashlib
+from typing import List, Dict, Any, Tuple
+
+from .spec_parser import parse_spec_tables
+from .structure_parser import detect_headings
+
+try:
+    from pypdf import PdfReader
+except ImportError:
+    PdfReader = None
+
+try:
+    import pdfplumber
+except ImportError:
+    pdfplumber = None
+
+
+# 리가처 문자 변환 테이블
+_LIGATURE_TABLE = str.maketrans({
+    "\ufb00": "ff", "\ufb01": "fi", "\ufb02": "fl",
+    "\ufb03": "ffi", "\ufb04": "ffl"
+})
+_HYPHEN_BREAK_RE = re.compile(r"(\w)-\s*\n\s*(\w)")
+_WHITESPACE_RE = re.compile(r"\s+")
+_NEWLINES_RE = re.compile(r"\n+")
+
+# 같은 행으로 묶을 기준선 높이 차이 (pt)
+_LINE_TOLERANCE = 2.5
+
+
+def normalize_text(text: str) -> str:
+    """텍스트 정규화"""
+    if not text:
+        return ""
+
+    # 리가처 문자 변환
+    text = text.translate(_LIGATURE_TABLE)
+
+    # 하이픈 연결된 단어 처리 (줄바꿈으로 분리된 단어 연결)
+    text = _HYPHEN_BREAK_RE.sub(r"\1\2", text)
+
+    # 다중 공백을 단일 공백으로
+    text = _WHITESPACE_RE.sub(" ", text)
+
+    # 다중 줄바꿈을 단일 줄바꿈으로
+    text = _NEWLINES_RE.sub("\n", text)
+
+    return text.strip()
+
+
+def plan_page_shards(page_count: int, pages_per_shard: int) -> List[Tuple[int, int]]:
+    """페이지 범위를 [start, end) 샤드 목록으로 분할"""
+    pages_per_shard = max(1, pages_per_shard)
+    return [
+        (start, min(start + pages_per_shard, page_count))
+        for start in range(0, page_count, pages_per_shard)
+    ]
+
+
+def _collect_fragments(fragments: List[Tuple[float, float, float, str]]):
+    """pypdf visitor: 텍스트 조각의 페이지 좌표와 글꼴 크기 수집"""
+    def visitor(text, cm, tm, font_dict, font_size):
+        if not text or not text.strip():
+            return
+        x = tm[4] * cm[0] + tm[5] * cm[2] + cm[4]
+        y = tm[4] * cm[1] + tm[5] * cm[3] + cm[5]
+        size = (font_size or 0) * abs(tm[3] or 1)
+        fragments.append((y, x, size, text.strip()))
+    return visitor
+
+
+def layout_lines(fragments: List[Tuple[float, float, float, str]]) -> List[Dict[str, Any]]:
+    """좌표를 기준으로 조각을 위→아래 행으로 재구성
+
+    각 행은 왼쪽→오른쪽 셀 목록(cells), 이어 붙인 텍스트(text),
+    가장 큰 글꼴 크기(size), 시작 x 좌표(x)를 가집니다.
+    """
+    lines: List[Dict[str, Any]] = []
+    current_y = None
+    current: List[Tuple[float, float, str]] = []
+
+    def flush():
+        current.sort()
+        cells = [text for _, _, text in current]
+        lines.append({
+            "cells": cells,
+            "text": " ".join(cells),
+            "size": max(size for _, size, _ in current),
+            "x": current[0][0],
+        })
+
+    for y, x, size, text in sorted(fragments, key=lambda f: (-f[0], f[1])):
+        if current_y is not None and abs(current_y - y) > _LINE_TOLERANCE:
+            flush()
+            current = []
+        if not current:
+            current_y = y
+        current.append((x, size, text))
+
+    if current:
+        flush()
+    return lines
+
+
+def locate_headings(headings: List[Dict[str, Any]], text: str) -> List[Dict[str, Any]]:
+    """제목을 정규화된 페이지 텍스트 안의 위치(offset)와 연결"""
+    located = []
+    cursor = 0
+    for heading in headings:
+        title = normalize_text(heading["title"])
+        offset = text.find(title, cursor)
+        if offset < 0:
+            continue
+        located.append(dict(heading, title=title, offset=offset))
+        cursor = offset + len(title)
+    return located
+
+
+def _plumber_lines(plumber_page) -> List[List[str]]:
+    """pdfplumber 테이블 셀을 행 목록으로 변환"""
+    lines: List[List[str]] = []
+    for table in plumber_page.extract_tables():
+        for row in table:
+            cells = [" ".join(cell.split()) for cell in row if cell and cell.strip()]
+            if cells:
+                lines.append(cells)
+    return lines
+
+
+def extract_page_range(file_path: str, start: int, end: int,
+                       table_extractor: str = "pypdf") -> List[Dict[str, Any]]:
+    """워커 프로세스에서 파일을 직접 열어 [start, end) 페이지 텍스트와 사양 테이블 추출"""
+    if PdfReader is None:
+        raise ImportError("pypdf 라이브러리가 설치되지 않았습니다.")
+
+    reader = PdfReader(file_path)
+    plumber_doc = None
+    if table_extractor == "pdfplumber" and pdfplumber is not None:
+        plumber_doc = pdfplumber.open(file_path)
+
+    pages: List[Dict[str, Any]] = []
+
+    try:
+        for i in range(start, min(end, len(reader.pages))):
+            fragments: List[Tuple[float, float, float, str]] = []
+            try:
+                page_text = reader.pages[i].extract_text(visitor_text=_collect_fragments(fragments))
+            except Exception:
+                # 개별 페이지 실패는 건너뛰고 나머지 페이지 계속 처리
+                pages.append({"page": i + 1, "error": True})
+                continue
+
+            if not page_text or not page_text.strip():
+                continue
+
+            text = normalize_text(page_text)
+            lines = layout_lines(fragments)
+
+            try:
+                table_lines = (
+                    _plumber_lines(plumber_doc.pages[i]) if plumber_doc is not None
+                    else [line["cells"] for line in lines]
+                )
+                spec_rows = parse_spec_tables(table_lines)
+            except Exception:
+                # 테이블 해석 실패가 본문 수집을 막지 않도록 함
+                spec_rows = []
+
+            for row in spec_rows:
+                row["page_number"] = i + 1
+
+            pages.append({
+                "page": i + 1,
+                "text": text,
+                "text_hash": hashlib.sha256(text.encode("utf-8")).hexdigest(),
+                "spec_rows": spec_rows,
+                "headings": locate_headings(detect_headings(lines), text) if lines else []
+            })
+    finally:
+        if plumber_doc is not None:
+            plumber_doc.close()
+
+    return pages
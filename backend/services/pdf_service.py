@@ -1,9 +1,13 @@
 import os
+import re
+import uuid
 import hashlib
 from pathlib import Path
-from typing import List, Dict, Any, Optional, Tuple
+from typing import List, Dict, Any, Optional, Tuple, AsyncIterator
+from collections import deque
 import asyncio
-from concurrent.futures import ThreadPoolExecutor
+import multiprocessing
+from concurrent.futures import ThreadPoolExecutor, ProcessPoolExecutor
 from loguru import logger
 
 try:
@@ -13,19 +17,35 @@ except ImportError:
     logger.warning("pypdf not installed. PDF parsing will not work.")
     PdfReader = None
 
-from langchain.text_splitter import RecursiveCharacterTextSplitter
-from langchain.docstore.document import Document
-
 from ..config.settings import settings
 from ..config.database import AsyncSessionLocal, Document as DocumentModel
+from .pdf_extraction import extract_page_range, normalize_text, plan_page_shards
+from .structure_parser import detect_structure
+from .chunker import TokenChunker, TextChunk
+from .document_catalog import get_document_catalog
+from .metrics import INGESTION_DOCUMENTS, INGESTION_PAGES, INGESTION_PAGES_PER_SECOND
+
+
+# extract_text_from_pdf가 전체 텍스트에 넣는 페이지 구분 표식
+_PAGE_MARKER_RE = re.compile(r"\s*--- Page (\d+) ---\n")
+
+# 업로드 스트림을 읽어 기록하는 블록 크기
+_UPLOAD_BLOCK_SIZE = 1024 * 1024
+
+
+class UploadTooLargeError(ValueError):
+    """업로드 파일이 max_file_size를 넘음"""
 
 
 class PDFParsingService:
     """PDF 파싱 및 텍스트 추출 서비스"""
 
     def __init__(self):
-        self.chunk_size = settings.chunk_size
-        self.chunk_overlap = settings.chunk_overlap
+        self.chunker = TokenChunker(
+            settings.chunk_tokens,
+            settings.chunk_overlap_tokens,
+            settings.chunk_tokenizer or settings.embedding_model
+        )
         self.upload_path = Path(settings.upload_path)
         self.processed_path = Path(settings.processed_path)
         self.executor = ThreadPoolExecutor(max_workers=2)
@@ -34,78 +54,73 @@ class PDFParsingService:
         self.upload_path.mkdir(parents=True, exist_ok=True)
         self.processed_path.mkdir(parents=True, exist_ok=True)
 
-    async def save_uploaded_file(self, file_content: bytes, filename: str) -> str:
-        """업로드된 파일 저장"""
-        try:
-            # 파일명 해시 생성 (중복 방지)
-            file_hash = hashlib.md5(file_content).hexdigest()
-            safe_filename = f"{file_hash}_{filename}"
-            file_path = self.upload_path / safe_filename
+    async def receive_upload(self, upload, max_size: int) -> Tuple[Path, str, int]:
+        """업로드 스트림을 블록 단위로 임시 파일에 기록하며 SHA-256과 크기 계산
 
-            # 파일 저장
-            with open(file_path, "wb") as f:
-                f.write(file_content)
+        메모리에는 한 블록만 머물고 디스크 쓰기/해시 계산은 스레드에서 실행합니다.
+        max_size를 넘는 순간 중단하고 임시 파일을 지운 뒤 UploadTooLargeError를 발생시킵니다.
+        반환: (임시 파일 경로, 콘텐츠 해시, 바이트 수)
+        """
+        loop = asyncio.get_event_loop()
+        temp_path = self.upload_path / f"temp_{uuid.uuid4().hex}.part"
+        digest = hashlib.sha256()
+        size = 0
 
-            logger.info(f"파일 저장 완료: {file_path}")
-            return str(file_path)
+        def write_block(output, block: bytes):
+            digest.update(block)
+            output.write(block)
 
-        except Exception as e:
-            logger.error(f"파일 저장 실패 ({filename}): {e}")
+        def close_file(output):
+            output.flush()
+            os.fsync(output.fileno())
+            output.close()
+
+        output = await loop.run_in_executor(self.executor, open, temp_path, "wb")
+        try:
+            while True:
+                block = await upload.read(_UPLOAD_BLOCK_SIZE)
+                if not block:
+                    break
+                size += len(block)
+                if size > max_size:
+                    raise UploadTooLargeError(
+                        f"파일 크기가 너무 큽니다. 최대 {max_size // (1024*1024)}MB까지 허용됩니다."
+                    )
+                await loop.run_in_executor(self.executor, write_block, output, block)
+            await loop.run_in_executor(self.executor, close_file, output)
+        except BaseException:
+            output.close()
+            temp_path.unlink(missing_ok=True)
             raise
 
-    async def extract_text_from_pdf(self, file_path: str) -> Tuple[str, Dict[str, Any]]:
-        """PDF에서 텍스트 추출"""
-        if not PdfReader:
-            raise ImportError("pypdf 라이브러리가 설치되지 않았습니다.")
+        return temp_path, digest.hexdigest(), size
 
-        try:
-            # 비동기적으로 PDF 읽기
-            text, metadata = await asyncio.get_event_loop().run_in_executor(
-                self.executor, self._extract_text_sync, file_path
-            )
-            return text, metadata
+    async def commit_upload(self, temp_path: Path, filename: str, content_hash: str) -> str:
+        """임시 파일을 최종 경로로 원자적 이름 변경 (같은 디렉터리이므로 os.replace가 원자적)"""
+        file_path = self.upload_path / f"{content_hash}_{Path(filename).name}"
+        await asyncio.get_event_loop().run_in_executor(self.executor, os.replace, temp_path, file_path)
+
+        logger.info(f"파일 저장 완료: {file_path}")
+        return str(file_path)
 
+    def discard_upload(self, temp_path: Path):
+        """사용하지 않게 된 업로드 임시 파일 삭제"""
+        try:
+            temp_path.unlink(missing_ok=True)
         except Exception as e:
-            logger.error(f"PDF 텍스트 추출 실패 ({file_path}): {e}")
-            raise
+            logger.warning(f"임시 파일 삭제 실패 ({temp_path}): {e}")
 
-    def _extract_text_sync(self, file_path: str) -> Tuple[str, Dict[str, Any]]:
-        """동기적 PDF 텍스트 추출 (내부 함수)"""
+    async def extract_text_from_pdf(self, file_path: str) -> Tuple[str, Dict[str, Any]]:
+        """PDF에서 텍스트 추출 (페이지 범위 단위로 프로세스 풀에 분산)"""
         try:
-            reader = PdfReader(file_path)
-
-            # 메타데이터 추출
-            metadata = {
-                "page_count": len(reader.pages),
-                "title": reader.metadata.get("/Title", ""),
-                "author": reader.metadata.get("/Author", ""),
-                "subject": reader.metadata.get("/Subject", ""),
-                "creator": reader.metadata.get("/Creator", ""),
-                "producer": reader.metadata.get("/Producer", ""),
-                "creation_date": reader.metadata.get("/CreationDate", ""),
-                "modification_date": reader.metadata.get("/ModDate", ""),
-            }
-
-            # 전체 텍스트 추출
-            full_text = ""
-            page_texts = []
-
-            for i, page in enumerate(reader.pages):
-                try:
-                    page_text = page.extract_text()
-                    if page_text.strip():
-                        # 텍스트 정규화
-                        normalized_text = self._normalize_text(page_text)
-                        page_texts.append({
-                            "page": i + 1,
-                            "text": normalized_text,
-                            "raw_text": page_text
-                        })
-                        full_text += f"\n\n--- Page {i + 1} ---\n{normalized_text}"
-
-                except Exception as e:
-                    logger.warning(f"페이지 {i + 1} 텍스트 추출 실패: {e}")
-                    continue
+            metadata = await self.read_pdf_metadata(file_path)
+
+            page_texts = [
+                page async for page in self.iter_pages(file_path, metadata["page_count"])
+            ]
+            full_text = "".join(
+                f"\n\n--- Page {page['page']} ---\n{page['text']}" for page in page_texts
+            )
 
             metadata["pages"] = page_texts
             metadata["total_characters"] = len(full_text)
@@ -115,136 +130,156 @@ class PDFParsingService:
 
             return full_text.strip(), metadata
 
+        except Exception as e:
+            logger.error(f"PDF 텍스트 추출 실패 ({file_path}): {e}")
+            raise
+
+    async def read_pdf_metadata(self, file_path: str) -> Dict[str, Any]:
+        """PDF 메타데이터와 페이지 수 조회"""
+        if not PdfReader:
+            raise ImportError("pypdf 라이브러리가 설치되지 않았습니다.")
+
+        try:
+            return await asyncio.get_event_loop().run_in_executor(
+                self.executor, self._read_metadata_sync, file_path
+            )
         except PdfReadError as e:
             raise ValueError(f"PDF 파일이 손상되었거나 읽을 수 없습니다: {e}")
-        except Exception as e:
-            raise RuntimeError(f"PDF 처리 중 오류 발생: {e}")
+
+    async def iter_pages(self, file_path: str, page_count: int) -> AsyncIterator[Dict[str, Any]]:
+        """페이지 샤드를 워커 프로세스에서 추출하여 페이지 순서대로 스트리밍
+
+        동시에 진행 중인 샤드 수를 워커 수 + 1 로 제한하여
+        소비 측이 느릴 때 추출 결과가 메모리에 쌓이지 않도록 합니다.
+        """
+        loop = asyncio.get_event_loop()
+        pool = get_extraction_pool()
+        shards = iter(plan_page_shards(page_count, settings.pdf_pages_per_shard))
+        window = extraction_worker_count() + 1
+        in_flight: deque = deque()
+
+        def submit_next() -> bool:
+            shard = next(shards, None)
+            if shard is None:
+                return False
+            in_flight.append(
+                loop.run_in_executor(
+                    pool, extract_page_range, file_path, shard[0], shard[1], settings.table_extractor
+                )
+            )
+            return True
+
+        while len(in_flight) < window and submit_next():
+            pass
+
+        try:
+            while in_flight:
+                shard_pages = await in_flight.popleft()
+                submit_next()
+
+                for page in shard_pages:
+                    if page.get("error"):
+                        logger.warning(f"페이지 {page['page']} 텍스트 추출 실패")
+                        continue
+                    yield page
+        finally:
+            for future in in_flight:
+                future.cancel()
+
+    def _read_metadata_sync(self, file_path: str) -> Dict[str, Any]:
+        """PDF 문서 메타데이터 및 페이지 수 조회 (내부 함수)"""
+        reader = PdfReader(file_path)
+        info = reader.metadata or {}
+
+        return {
+            "page_count": len(reader.pages),
+            "title": info.get("/Title", ""),
+            "author": info.get("/Author", ""),
+            "subject": info.get("/Subject", ""),
+            "creator": info.get("/Creator", ""),
+            "producer": info.get("/Producer", ""),
+            "creation_date": info.get("/CreationDate", ""),
+            "modification_date": info.get("/ModDate", ""),
+        }
 
     def _normalize_text(self, text: str) -> str:
         """텍스트 정규화"""
-        if not text:
-            return ""
+        return normalize_text(text)
 
-        # 리가처 문자 변환
-        ligature_map = {
-            "\ufb00": "ff", "\ufb01": "fi", "\ufb02": "fl",
-            "\ufb03": "ffi", "\ufb04": "ffl"
-        }
+    async def get_document_metadata(self, document_id: Optional[str]) -> Dict[str, Any]:
+        """청크에 공통으로 붙일 문서 메타데이터 조회"""
+        common_metadata: Dict[str, Any] = {}
+        if not document_id:
+            return common_metadata
 
-        for ligature, replacement in ligature_map.items():
-            text = text.replace(ligature, replacement)
+        common_metadata["document_id"] = document_id
 
-        # 하이픈 연결된 단어 처리 (줄바꿈으로 분리된 단어 연결)
-        import re
-        text = re.sub(r"(\w)-\s*\n\s*(\w)", r"\1\2", text)
+        # 문서 정보를 데이터베이스에서 가져오기
+        try:
+            from sqlalchemy import select
 
-        # 다중 공백을 단일 공백으로
-        text = re.sub(r"\s+", " ", text)
+            async with AsyncSessionLocal() as db:
+                result = await db.execute(select(DocumentModel).where(DocumentModel.id == document_id))
+                document_info = result.scalar_one_or_none()
+        except Exception as e:
+            logger.warning(f"문서 정보 조회 실패: {e}")
+            document_info = None
 
-        # 다중 줄바꿈을 단일 줄바꿈으로
-        text = re.sub(r"\n+", "\n", text)
+        if document_info:
+            if document_info.original_name:
+                common_metadata["filename"] = document_info.original_name
+            if document_info.document_type:
+                common_metadata["document_type"] = document_info.document_type
+            if document_info.product_family:
+                common_metadata["product_family"] = document_info.product_family
+            if document_info.product_model:
+                common_metadata["product_model"] = document_info.product_model
 
-        return text.strip()
+        return common_metadata
 
     async def chunk_text(
         self,
         text: str,
         document_id: str = None,
         metadata: Optional[Dict[str, Any]] = None
-    ) -> List[Document]:
-        """텍스트를 청크로 분할"""
+    ) -> List[TextChunk]:
+        """텍스트를 토큰 기준 청크로 분할 (페이지 번호는 페이지 단위 분할로 보존)"""
         try:
-            splitter = RecursiveCharacterTextSplitter(
-                chunk_size=self.chunk_size,
-                chunk_overlap=self.chunk_overlap,
-                length_function=len,
-                separators=["\n\n", "\n", ". ", " ", ""]
-            )
-
             loop = asyncio.get_event_loop()
 
             # 문서별 공통 메타데이터 구성
-            common_metadata: Dict[str, Any] = {}
-            if document_id:
-                common_metadata["document_id"] = document_id
-
-            # 문서 정보를 데이터베이스에서 가져오기
-            document_info = None
-            if document_id:
-                try:
-                    from ..config.database import AsyncSessionLocal
-                    from ..config.database import Document as DBDocument
-                    from sqlalchemy import select
-
-                    async with AsyncSessionLocal() as db:
-                        result = await db.execute(select(DBDocument).where(DBDocument.id == document_id))
-                        document_info = result.scalar_one_or_none()
-                except Exception as e:
-                    logger.warning(f"문서 정보 조회 실패: {e}")
-
-            if document_info:
-                if document_info.original_name:
-                    common_metadata["filename"] = document_info.original_name
-                if document_info.document_type:
-                    common_metadata["document_type"] = document_info.document_type
-                if document_info.product_family:
-                    common_metadata["product_family"] = document_info.product_family
-                if document_info.product_model:
-                    common_metadata["product_model"] = document_info.product_model
+            common_metadata = await self.get_document_metadata(document_id)
+            common_metadata.setdefault("document_id", document_id)
 
             page_entries = []
             if metadata and metadata.get("pages"):
                 page_entries = [page for page in metadata["pages"] if page.get("text")]
 
-            if page_entries:
-                texts: List[str] = []
-                metadatas: List[Dict[str, Any]] = []
-
+            if not page_entries:
+                # 페이지 정보가 없으면 전체 텍스트의 페이지 구분 표식으로 페이지를 복원
+                markers = list(_PAGE_MARKER_RE.finditer(text))
+                page_entries = [
+                    {"page": int(marker.group(1)),
+                     "text": text[marker.end():markers[i + 1].start() if i + 1 < len(markers) else len(text)]}
+                    for i, marker in enumerate(markers)
+                ] or [{"page": None, "text": text}]
+
+            def split_pages() -> List[TextChunk]:
+                chunks: List[TextChunk] = []
                 for page in page_entries:
-                    base_metadata = dict(common_metadata)
+                    page_metadata = dict(common_metadata)
                     if page.get("page") is not None:
-                        base_metadata["page_number"] = int(page.get("page"))
-                    texts.append(page.get("text", ""))
-                    metadatas.append(base_metadata)
+                        page_metadata["page_number"] = int(page["page"])
+                    page_text = page["text"]
+                    chunks.extend(self.chunker.split_segments(
+                        page_text, [(0, len(page_text), page_metadata)]
+                    ))
+                return chunks
 
-                def create_documents_with_metadata():
-                    return splitter.create_documents(texts, metadatas=metadatas)
-
-                chunks = await loop.run_in_executor(
-                    self.executor,
-                    create_documents_with_metadata
-                )
-            else:
-                base_metadata = dict(common_metadata)
-
-                def create_single_document():
-                    return splitter.create_documents([text], metadatas=[base_metadata])
-
-                chunks = await loop.run_in_executor(
-                    self.executor,
-                    create_single_document
-                )
+            chunks = await loop.run_in_executor(self.executor, split_pages)
 
-            # 청크에 메타데이터 추가
             for i, chunk in enumerate(chunks):
-                chunk.metadata.setdefault("document_id", document_id)
-                if document_info:
-                    if document_info.original_name:
-                        chunk.metadata.setdefault("filename", document_info.original_name)
-                    if document_info.document_type:
-                        chunk.metadata.setdefault("document_type", document_info.document_type)
-                    if document_info.product_family:
-                        chunk.metadata.setdefault("product_family", document_info.product_family)
-                    if document_info.product_model:
-                        chunk.metadata.setdefault("product_model", document_info.product_model)
-
                 chunk.metadata["chunk_index"] = i
-                chunk.metadata["chunk_size"] = len(chunk.page_content)
-                if "page_number" in chunk.metadata and chunk.metadata["page_number"] is not None:
-                    try:
-                        chunk.metadata["page_number"] = int(chunk.metadata["page_number"])
-                    except (TypeError, ValueError):
-                        chunk.metadata["page_number"] = None
 
             logger.info(f"텍스트를 {len(chunks)}개 청크로 분할 완료")
             return chunks
@@ -253,57 +288,20 @@ class PDFParsingService:
             logger.error(f"텍스트 청킹 실패: {e}")
             raise
 
-    async def process_pdf_file(self, file_path: str, document_id: str) -> Tuple[List[Document], Dict[str, Any]]:
-        """PDF 파일 전체 처리 파이프라인"""
-        try:
-            # 1. 텍스트 추출
-            logger.info(f"PDF 텍스트 추출 시작: {file_path}")
-            text, metadata = await self.extract_text_from_pdf(file_path)
-
-            # 2. 텍스트 청킹
-            logger.info(f"텍스트 청킹 시작")
-            chunks = await self.chunk_text(text, document_id, metadata)
-
-            # 3. 처리된 텍스트 저장 (옵션)
-            processed_file_path = self.processed_path / f"{document_id}.txt"
-            with open(processed_file_path, "w", encoding="utf-8") as f:
-                f.write(text)
-
-            logger.info(f"PDF 처리 완료: {len(chunks)}개 청크 생성")
-
-            return chunks, metadata
+    async def extract_tables_from_pdf(self, file_path: str) -> List[Dict[str, Any]]:
+        """PDF의 사양 테이블(Min/Typ/Max)을 정규화된 사양 행 목록으로 추출"""
+        metadata = await self.read_pdf_metadata(file_path)
 
-        except Exception as e:
-            logger.error(f"PDF 처리 실패 ({file_path}): {e}")
-            raise
+        spec_rows: List[Dict[str, Any]] = []
+        async for page in self.iter_pages(file_path, metadata["page_count"]):
+            spec_rows.extend(page.get("spec_rows", []))
 
-    async def extract_tables_from_pdf(self, file_path: str) -> List[Dict[str, Any]]:
-        """PDF에서 테이블 추출 (향후 확장용)"""
-        # TODO: pdfplumber나 tabula-py를 사용한 테이블 추출 구현
-        logger.warning("테이블 추출 기능은 아직 구현되지 않았습니다.")
-        return []
+        logger.info(f"사양 테이블 추출 완료: {len(spec_rows)}개 행")
+        return spec_rows
 
     async def detect_document_structure(self, text: str) -> Dict[str, Any]:
-        """문서 구조 감지 (섹션, 제목 등)"""
-        # TODO: 정규식이나 ML 모델을 사용한 구조 감지
-        import re
-
-        # 간단한 섹션 감지
-        sections = []
-        section_patterns = [
-            r"^\s*(\d+\.?\s*.+?)$",  # 숫자로 시작하는 제목
-            r"^\s*([A-Z][^a-z\n]{10,})$",  # 대문자 제목
-            r"^\s*(Introduction|Abstract|Conclusion|References?|Specification|Features?|Overview).*$",
-        ]
-
-        for pattern in section_patterns:
-            matches = re.finditer(pattern, text, re.MULTILINE | re.IGNORECASE)
-            for match in matches:
-                sections.append({
-                    "title": match.group(1).strip(),
-                    "start_pos": match.start(),
-                    "pattern": pattern
-                })
+        """문서 구조 감지 (섹션, 제목 등) - 결합 패턴 한 번의 순회"""
+        sections = detect_structure(text)
 
         return {
             "sections": sections,
@@ -312,14 +310,15 @@ class PDFParsingService:
         }
 
     def cleanup_temp_files(self, older_than_hours: int = 24):
-        """임시 파일 정리"""
+        """중단된 업로드/페이지 저장소 임시 파일 정리 (처리 결과 저장소는 유지)"""
         import time
 
         try:
             now = time.time()
             cutoff = older_than_hours * 3600
 
-            for file_path in self.processed_path.glob("*.txt"):
+            temp_files = list(self.upload_path.glob("temp_*")) + list(self.processed_path.glob("*.tmp"))
+            for file_path in temp_files:
                 if now - file_path.stat().st_mtime > cutoff:
                     file_path.unlink()
                     logger.info(f"임시 파일 삭제: {file_path}")
@@ -327,57 +326,39 @@ class PDFParsingService:
         except Exception as e:
             logger.error(f"임시 파일 정리 실패: {e}")
 
-    async def process_pdf_background(self, file_path: str, document_id: str, vector_service):
-        """백그라운드에서 PDF 처리 및 벡터화 - 논블로킹 처리"""
-        try:
+    async def ingest_document(self, file_path: str, document_id: str, vector_service,
+                              from_store: bool = False) -> Dict[str, Any]:
+        """PDF 처리 및 벡터화 - 스트리밍 파이프라인 실행 (실패 시 예외 발생)
+
+        from_store=True면 PDF를 다시 파싱하지 않고 페이지 저장소의 추출 결과로 재청킹합니다.
+        재청킹은 성공할 때까지 기존 결과가 그대로 검색되므로 문서 상태를 바꾸지 않습니다.
+        """
+        if not from_store:
             # 처리 상태를 processing으로 업데이트
             await self._update_document_status(document_id, "processing")
 
-            # PDF 처리
-            logger.info(f"🔄 백그라운드 PDF 처리 시작: {document_id}")
-            chunks, metadata = await self.process_pdf_file(file_path, document_id)
-
-            # chunks는 이미 LangChain Document 객체들이므로 바로 사용
-            documents = chunks
-
-            # 벡터 인덱스 생성 (청크별 배치 처리로 메모리 효율성 개선)
-            logger.info(f"🔄 백그라운드 벡터 인덱스 생성 시작: {len(documents)}개 청크")
-
-            # 배치 크기로 나누어 처리 (메모리 효율성)
-            batch_size = 50
-            total_batches = (len(documents) + batch_size - 1) // batch_size
-
-            for i in range(0, len(documents), batch_size):
-                batch = documents[i:i + batch_size]
-                batch_num = (i // batch_size) + 1
-
-                logger.info(f"📦 배치 {batch_num}/{total_batches} 처리 중 ({len(batch)}개 청크)")
-
-                if i == 0:
-                    # 첫 번째 배치: 새 인덱스 생성
-                    success = await vector_service.create_index_from_documents(batch)
-                else:
-                    # 이후 배치: 기존 인덱스에 추가
-                    success = await vector_service.add_documents(batch)
-
-                if not success:
-                    logger.error(f"❌ 배치 {batch_num} 처리 실패")
-                    await self._update_document_status(document_id, "failed")
-                    return
-
-                # 진행 상황 로깅
-                progress = (batch_num / total_batches) * 100
-                logger.info(f"📊 진행률: {progress:.1f}%")
-
-            # 성공 상태로 업데이트
-            await self._update_document_status(document_id, "completed")
-            logger.info(f"✅ 백그라운드 처리 완료: {document_id} ({len(documents)}개 청크)")
-
-        except Exception as e:
-            logger.error(f"❌ 백그라운드 처리 실패 ({document_id}): {e}")
-            await self._update_document_status(document_id, "failed")
+        logger.info(f"🔄 PDF 처리 시작: {document_id}")
+        from .ingestion_pipeline import IngestionPipeline
 
-    async def _update_document_status(self, document_id: str, status: str):
+        pipeline = IngestionPipeline(self, vector_service)
+        try:
+            stats = await pipeline.run(file_path, document_id, from_store=from_store)
+        except Exception:
+            INGESTION_DOCUMENTS.labels("failed").inc()
+            raise
+        INGESTION_DOCUMENTS.labels("completed").inc()
+        INGESTION_PAGES.inc(stats["pages"])
+        if stats["total_time"] > 0:
+            INGESTION_PAGES_PER_SECOND.observe(stats["pages"] / stats["total_time"])
+
+        # 성공 상태로 업데이트
+        await self._update_document_status(
+            document_id, "completed", page_count=stats["page_count"]
+        )
+        logger.info(f"✅ PDF 처리 완료: {document_id} ({stats['chunks']}개 청크)")
+        return stats
+
+    async def _update_document_status(self, document_id: str, status: str, **values):
         """문서 처리 상태 업데이트"""
         try:
             from ..config.database import AsyncSessionLocal
@@ -387,10 +368,12 @@ class PDFParsingService:
             async with AsyncSessionLocal() as session:
                 stmt = update(DBDocument).where(
                     DBDocument.id == document_id
-                ).values(processing_status=status)
+                ).values(processing_status=status, **values)
                 await session.execute(stmt)
                 await session.commit()
 
+            await get_document_catalog().document_changed(document_id)
+
         except Exception as e:
             logger.error(f"문서 상태 업데이트 실패 ({document_id} -> {status}): {e}")
 
@@ -404,3 +387,33 @@ def get_pdf_service() -> PDFParsingService:
     if _pdf_service is None:
         _pdf_service = PDFParsingService()
     return _pdf_service
+
+
+# 페이지 추출용 전역 프로세스 풀 (문서 간 공유)
+_extraction_pool: Optional[ProcessPoolExecutor] = None
+
+def extraction_worker_count() -> int:
+    """설정된 PDF 추출 워커 수 (0이면 CPU 코어 수)"""
+    return settings.pdf_extract_workers or os.cpu_count() or 1
+
+def get_extraction_pool() -> ProcessPoolExecutor:
+    """PDF 추출 프로세스 풀 싱글톤 인스턴스 반환"""
+    global _extraction_pool
+    if _extraction_pool is None:
+        workers = extraction_worker_count()
+        # fork는 이벤트 루프/스레드 상태를 복제하므로 spawn 사용
+        _extraction_pool = ProcessPoolExecutor(
+            max_workers=workers,
+            mp_context=multiprocessing.get_context("spawn")
+        )
+        logger.info(f"PDF 추출 프로세스 풀 생성: {workers}개 워커")
+    return _extraction_pool
+
+
+def shutdown_extraction_pool():
+    """PDF 추출 프로세스 풀 종료"""
+    global _extraction_pool
+    if _extraction_pool is not None:
+        _extraction_pool.shutdown(wait=False, cancel_futures=True)
+        _extraction_pool = None
+
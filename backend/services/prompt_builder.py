@@ -0,0 +1,106 @@
+"""LLM 프롬프트 조립
+
+모든 질의 프롬프트를 같은 순서로 만듭니다.
+
+  system : 고정 답변 지침 (요청마다 바이트 단위로 동일)
+  user   : 역할 지침 → 참고 자료(컨텍스트, 한 번만) → 질문
+
+system 메시지가 항상 같으므로 Ollama /api/chat에서 앞부분 KV 캐시가 재사용되고,
+요청마다 달라지는 부분(컨텍스트, 질문)만 새로 평가됩니다.
+각 부분의 토큰 수는 응답 모델의 토크나이저로 세어 함께 반환합니다.
+"""
+from typing import Dict, List, NamedTuple, Optional
+
+from .chunker import TokenCounter, get_token_counter
+from ..config.settings import settings
+from ..models.request_models import UserRole
+
+
+SYSTEM_PROMPT = """당신은 반도체/전자부품 제품 데이터시트를 바탕으로 답변하는 기술 지원 어시스턴트입니다.
+사용자 메시지의 '참고 자료'에 있는 정보만 근거로 '질문'에 답변하세요.
+
+** 중요한 답변 형식 지침 **:
+1. 반드시 한국어로만 답변하세요
+2. 개조식으로 답변하세요 (예: "• DDR5 동작 전압: 1.1V", "• 온도 범위: 0~95℃")
+3. 구체적인 수치와 단위를 포함하세요
+4. 관련 조건이나 제약사항을 명시하세요
+5. 정보가 불충분한 경우 그 사실을 명시하세요
+6. 추측하지 말고 제공된 정보에만 기반하여 답변하세요
+7. 영어 단어는 필요한 기술용어만 사용하고 괄호로 병기하세요"""
+
+ROLE_INSTRUCTIONS = {
+    UserRole.ENGINEER: "기술적 세부사항, 사양, 설계 파라미터에 집중하여 정확한 수치와 조건을 포함해 답변하세요.",
+    UserRole.QUALITY: "품질 기준, 한계치, 테스트 조건, 규격 준수 사항에 중점을 두어 답변하세요.",
+    UserRole.SALES: "제품의 특징, 장점, 경쟁 우위를 강조하여 고객 가치 중심으로 답변하세요.",
+    UserRole.SUPPORT: "문제해결 방법, 호환성 정보, 실용적인 해결책에 초점을 맞춰 답변하세요."
+}
+
+_NO_CONTEXT = "(관련 자료 없음)"
+
+
+class ChatPrompt(NamedTuple):
+    """Ollama /api/chat 메시지와 부분별 토큰 수"""
+    messages: List[Dict[str, str]]
+    token_counts: Dict[str, int]
+
+    @property
+    def prompt_tokens(self) -> int:
+        return self.token_counts["total"]
+
+
+class PromptBuilder:
+    """고정 system 지침 + 역할/컨텍스트/질문 user 메시지 조립기"""
+
+    def __init__(self, tokenizer_name: str = "", system_prompt: str = SYSTEM_PROMPT):
+        self.tokenizer_name = tokenizer_name
+        self.system_prompt = system_prompt
+        self._token_counter: Optional[TokenCounter] = None
+        self._fixed_counts: Dict[str, int] = {}
+
+    @property
+    def count_tokens(self) -> TokenCounter:
+        if self._token_counter is None:
+            self._token_counter = get_token_counter(self.tokenizer_name)
+        return self._token_counter
+
+    def _fixed_count(self, text: str) -> int:
+        # system 지침과 역할 지침은 고정 문자열이라 한 번만 셈
+        if text not in self._fixed_counts:
+            self._fixed_counts[text] = self.count_tokens([text])[0]
+        return self._fixed_counts[text]
+
+    @staticmethod
+    def role_section(role: UserRole) -> str:
+        return f"사용자 역할: {role.value}\n지침: {ROLE_INSTRUCTIONS.get(role, ROLE_INSTRUCTIONS[UserRole.ENGINEER])}"
+
+    def build(self, question: str, context: str, role: UserRole) -> ChatPrompt:
+        """system 지침, 역할 지침, 컨텍스트, 질문 순서의 채팅 메시지 생성"""
+        role_section = self.role_section(role)
+        context_section = f"참고 자료:\n{context.strip() or _NO_CONTEXT}"
+        question_section = f"질문: {question.strip()}"
+
+        messages = [
+            {"role": "system", "content": self.system_prompt},
+            {"role": "user", "content": f"{role_section}\n\n{context_section}\n\n{question_section}"},
+        ]
+
+        context_tokens, question_tokens = self.count_tokens([context_section, question_section])
+        token_counts = {
+            "system": self._fixed_count(self.system_prompt),
+            "role": self._fixed_count(role_section),
+            "context": context_tokens,
+            "question": question_tokens,
+        }
+        token_counts["total"] = sum(token_counts.values())
+        return ChatPrompt(messages, token_counts)
+
+
+_prompt_builder: Optional[PromptBuilder] = None
+
+
+def get_prompt_builder() -> PromptBuilder:
+    """프롬프트 조립기 싱글톤 인스턴스 반환"""
+    global _prompt_builder
+    if _prompt_builder is None:
+        _prompt_builder = PromptBuilder(settings.context_tokenizer)
+    return _prompt_builder
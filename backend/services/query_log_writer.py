@@ -0,0 +1,131 @@
+"""질의 로그 지연 일괄 기록 (write-behind)
+
+요청 처리 중에는 로그 레코드를 메모리 버퍼에 넣기만 하고, 백그라운드 태스크가
+flush_interval_ms마다 또는 batch_size건이 모이면 한 트랜잭션으로 query_logs에 기록합니다.
+
+- submit()은 대기하지 않음 (DB 잠금 경합이 응답 시간에 영향을 주지 않음)
+- 기록 실패 시 레코드를 버퍼 앞쪽에 되돌려 다음 주기에 다시 시도
+- 버퍼가 max_pending을 넘으면 가장 오래된 레코드부터 버림
+- stop()은 남은 레코드를 모두 기록한 뒤 종료 (애플리케이션 종료 시 호출)
+"""
+import asyncio
+from collections import deque
+from typing import Any, Deque, Dict, List, Optional
+
+from loguru import logger
+from sqlalchemy import insert
+
+from ..config.database import AsyncSessionLocal, QueryLog
+from ..config.settings import settings
+from .metrics import QUEUE_DEPTH
+
+
+class QueryLogWriter:
+    """query_logs 배치 기록기"""
+
+    def __init__(self, batch_size: int, flush_interval_ms: int, max_pending: int):
+        self.batch_size = max(1, batch_size)
+        self.flush_interval = max(flush_interval_ms, 1) / 1000
+        self.max_pending = max(self.batch_size, max_pending)
+        self._pending: Deque[Dict[str, Any]] = deque()
+        self._wakeup: Optional[asyncio.Event] = None
+        self._task: Optional[asyncio.Task] = None
+        self._stopping = False
+
+        self.submitted = 0
+        self.written = 0
+        self.dropped = 0
+        self.batches = 0
+        self.failures = 0
+
+    def start(self):
+        """기록 태스크 시작 (실행 중인 이벤트 루프 필요)"""
+        if self._task is None or self._task.done():
+            self._stopping = False
+            self._wakeup = asyncio.Event()
+            self._task = asyncio.create_task(self._run())
+
+    def submit(self, record: Dict[str, Any]):
+        """로그 레코드를 버퍼에 추가 (즉시 반환)"""
+        if self._task is None or self._task.done():
+            self.start()
+        self._pending.append(record)
+        self.submitted += 1
+        while len(self._pending) > self.max_pending:
+            self._pending.popleft()
+            self.dropped += 1
+        QUEUE_DEPTH.labels("query_log").set(len(self._pending))
+        if len(self._pending) >= self.batch_size:
+            self._wakeup.set()
+
+    async def _run(self):
+        while not self._stopping:
+            try:
+                await asyncio.wait_for(self._wakeup.wait(), timeout=self.flush_interval)
+            except asyncio.TimeoutError:
+                pass
+            self._wakeup.clear()
+            await self.flush()
+
+    async def flush(self) -> int:
+        """버퍼의 레코드를 batch_size씩 기록 (기록한 건수 반환, 실패하면 남은 레코드 유지)"""
+        written = 0
+        while self._pending:
+            batch: List[Dict[str, Any]] = [
+                self._pending.popleft() for _ in range(min(self.batch_size, len(self._pending)))
+            ]
+            try:
+                async with AsyncSessionLocal() as session:
+                    await session.execute(insert(QueryLog), batch)
+                    await session.commit()
+            except Exception as e:
+                self.failures += 1
+                # 다음 주기에 원래 순서대로 다시 시도
+                self._pending.extendleft(reversed(batch))
+                logger.warning(f"질의 로그 기록 실패 ({len(batch)}건, 다음 주기에 재시도): {e}")
+                break
+            written += len(batch)
+            self.batches += 1
+        self.written += written
+        QUEUE_DEPTH.labels("query_log").set(len(self._pending))
+        return written
+
+    async def stop(self):
+        """기록 태스크를 멈추고 남은 레코드를 모두 기록"""
+        self._stopping = True
+        if self._task is not None:
+            self._wakeup.set()
+            try:
+                await self._task
+            except Exception as e:
+                logger.warning(f"질의 로그 기록 태스크 종료 실패: {e}")
+            self._task = None
+        remaining = len(self._pending)
+        if remaining:
+            await self.flush()
+        logger.info(f"질의 로그 기록 종료 - 남은 {remaining}건 기록, 미기록 {len(self._pending)}건")
+
+    def stats(self) -> Dict[str, Any]:
+        return {
+            "pending": len(self._pending),
+            "submitted": self.submitted,
+            "written": self.written,
+            "dropped": self.dropped,
+            "batches": self.batches,
+            "failures": self.failures,
+        }
+
+
+_query_log_writer: Optional[QueryLogWriter] = None
+
+
+def get_query_log_writer() -> QueryLogWriter:
+    """질의 로그 기록기 싱글톤 인스턴스 반환"""
+    global _query_log_writer
+    if _query_log_writer is None:
+        _query_log_writer = QueryLogWriter(
+            settings.query_log_batch_size,
+            settings.query_log_flush_interval_ms,
+            settings.query_log_max_pending
+        )
+    return _query_log_writer
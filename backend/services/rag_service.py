@@ -1,14 +1,28 @@
+import json
 import time
-from typing import List, Dict, Any, Optional
+from collections import deque
+from typing import List, Dict, Any, Optional, AsyncIterator, Tuple
 from loguru import logger
 from datetime import datetime
+from sqlalchemy import func, select
 
 from .ollama_service import get_ollama_service
 from .vector_service import get_vector_service
 from .quality_service import get_quality_service
+from .spec_service import get_spec_service
+from .answer_cache import get_answer_cache
+from .context_builder import ContextBuilder, ContextPassage
+from .context_compressor import get_context_compressor
+from .prompt_builder import ChatPrompt, get_prompt_builder
+from .single_flight import get_single_flight, query_key
+from .document_catalog import DocumentEntry, get_document_catalog
+from .query_log_writer import get_query_log_writer
+from .latency_tracker import record_timings, stage
+from .structure_parser import classify_section
 from ..models.request_models import QueryRequest, UserRole
 from ..models.response_models import QueryResponse, SourceInfo
-from ..config.database import AsyncSessionLocal, QueryLog, Document
+from ..config.settings import settings
+from ..config.database import AsyncSessionLocal, QueryLog
 
 
 class ManufacturingRAGService:
@@ -34,165 +48,511 @@ class ManufacturingRAGService:
             ]
         }
 
-        self.role_instructions = {
-            UserRole.ENGINEER: "기술적 세부사항, 사양, 설계 파라미터에 집중하여 정확한 수치와 조건을 포함해 답변하세요.",
-            UserRole.QUALITY: "품질 기준, 한계치, 테스트 조건, 규격 준수 사항에 중점을 두어 답변하세요.",
-            UserRole.SALES: "제품의 특징, 장점, 경쟁 우위를 강조하여 고객 가치 중심으로 답변하세요.",
-            UserRole.SUPPORT: "문제해결 방법, 호환성 정보, 실용적인 해결책에 초점을 맞춰 답변하세요."
-        }
+        self.context_builder = ContextBuilder(settings.context_token_budget, settings.context_tokenizer)
+
+        # 최근 스트리밍 응답의 첫 토큰까지 시간/초당 토큰 수
+        self.stream_metrics = deque(maxlen=200)
 
     async def query(self, request: QueryRequest) -> QueryResponse:
-        """역할 기반 질의응답"""
+        """역할 기반 질의응답 (진행 중인 같은 질의가 있으면 그 결과를 공유)"""
+        if not settings.single_flight_enabled:
+            return await self._run_query(request)
+
+        key = query_key(request.question, request.user_role.value, request.document_filter, request.top_k)
+        wait_start = time.perf_counter()
+        response, shared = await get_single_flight().do(key, lambda: self._run_query(request))
+        if shared:
+            # 합류한 요청도 질의 로그에는 각각 기록 (단계 시간 대신 합류 대기 시간)
+            self._complete(request, response, {
+                "coalesced_wait": round((time.perf_counter() - wait_start) * 1000, 1)
+            })
+        return response
+
+    async def _run_query(self, request: QueryRequest) -> QueryResponse:
+        """역할 기반 질의응답 파이프라인 (사양 고속 경로 → 캐시 → 검색 → 생성 → 검증)"""
         start_time = time.time()
+        timings: Dict[str, float] = {}
 
         try:
-            # 1. 질문 분석 및 확장
-            enhanced_query = self._enhance_query(request.question, request.user_role)
-            logger.info(f"원본 질문: {request.question}")
-            logger.info(f"확장된 질문: {enhanced_query}")
-
-            # 2. 벡터 검색 (타임아웃 30초)
-            vector_service = await get_vector_service()
-
-            import asyncio
-            try:
-                search_results = await asyncio.wait_for(
-                    vector_service.search(
-                        query=enhanced_query,
-                        top_k=request.top_k,
-                        filter_metadata=self._build_metadata_filter(request.document_filter)
-                    ),
-                    timeout=30.0
-                )
-                logger.info(f"벡터 검색 완료: {len(search_results)}개 결과")
-            except asyncio.TimeoutError:
-                logger.error("벡터 검색 타임아웃 (30초)")
-                raise Exception("벡터 검색 시간이 초과되었습니다.")
-
+            # 0. 사양 테이블 고속 경로 / 응답 캐시
+            early_response, state = await self._prepare(request, start_time, timings)
+            if early_response is not None:
+                self._complete(request, early_response, timings)
+                return early_response
+
+            # 1-3. 검색 및 컨텍스트 구성
+            search_results = await self._retrieve(request, state, timings)
             if not search_results:
-                return QueryResponse(
-                    answer="죄송합니다. 관련 정보를 찾을 수 없습니다. 다른 키워드로 검색해보시거나 문서가 업로드되었는지 확인해주세요.",
-                    confidence=0.0,
-                    sources=[],
-                    query_time_ms=int((time.time() - start_time) * 1000),
-                    model_used="N/A"
-                )
-
-            # 3. 문서 메타데이터 보강 및 컨텍스트 구성 (WITH DATABASE TIMEOUT)
-            try:
-                document_info_map = await asyncio.wait_for(
-                    self._fetch_document_info_map(search_results),
-                    timeout=10.0  # 10초 타임아웃
-                )
-                logger.info(f"문서 메타데이터 조회 완료: {len(document_info_map)}개")
-            except asyncio.TimeoutError:
-                logger.error("문서 메타데이터 조회 타임아웃 (10초) - 기본 메타데이터로 대체")
-                document_info_map = {}
-            except Exception as e:
-                logger.warning(f"문서 메타데이터 조회 실패: {e} - 기본 메타데이터로 대체")
-                document_info_map = {}
-
-            context, sources = self._build_context(search_results, request.user_role, document_info_map)
+                no_results = self._no_results_response(start_time)
+                self._complete(request, no_results, timings)
+                return no_results
+            context, sources, passages = await self._build_sources(request, search_results, state, timings)
 
             # 4. LLM 응답 생성 (타임아웃 60초)
+            import asyncio
             ollama_service = await get_ollama_service()
-            prompt = self._create_role_specific_prompt(request.question, context, request.user_role)
+            chat_prompt = get_prompt_builder().build(request.question, context, request.user_role)
+            generation_stats: Dict[str, Any] = {}
 
             try:
-                response_text = await asyncio.wait_for(
-                    ollama_service.generate_response(
-                        prompt=prompt,
-                        context=context,
-                        temperature=0.1,
-                        max_tokens=512
-                    ),
-                    timeout=60.0
-                )
-                logger.info(f"LLM 응답 생성 완료: {len(response_text)} 문자")
+                with stage(timings, "generate"):
+                    response_text = await asyncio.wait_for(
+                        ollama_service.chat(
+                            chat_prompt.messages,
+                            temperature=0.1,
+                            max_tokens=512,
+                            stats=generation_stats
+                        ),
+                        timeout=60.0
+                    )
+                prompt_metrics = self._prompt_metrics(chat_prompt, generation_stats)
+                if prompt_metrics["prompt_eval_ms"] is not None:
+                    timings["prefill"] = prompt_metrics["prompt_eval_ms"]
+                logger.info(f"LLM 응답 생성 완료: {len(response_text)} 문자, "
+                            f"프롬프트 {prompt_metrics['prompt_tokens']}토큰 "
+                            f"(새로 평가 {prompt_metrics['prompt_eval_tokens']}토큰)")
             except asyncio.TimeoutError:
                 logger.error("LLM 응답 생성 타임아웃 (60초)")
                 raise Exception("AI 응답 생성 시간이 초과되었습니다.")
 
-            # 5. 신뢰도 계산
-            confidence = self._calculate_confidence(search_results, response_text)
-
-            # 6. 품질 검증 (새로 추가)
-            try:
-                quality_service = await get_quality_service()
-                validation_result = quality_service.validate_answer(
-                    question=request.question,
-                    answer=response_text,
-                    sources=[{"content": source.content} for source in sources],
-                    confidence=confidence
+            # 5-6. 신뢰도 계산 및 품질 검증
+            with stage(timings, "validate"):
+                response_text, confidence, validation = await self._finalize_answer(
+                    request, search_results, passages, response_text
                 )
 
-                # 품질 검증 결과를 로깅
-                logger.info(f"품질 검증 완료 - 점수: {validation_result['quality_score']:.2f}, "
-                           f"유효성: {validation_result['is_valid']}")
+            # 7. 응답 구성
+            query_response = QueryResponse(
+                answer=response_text,
+                confidence=confidence,
+                sources=sources,
+                query_time_ms=int((time.time() - start_time) * 1000),
+                model_used=ollama_service.model,
+                prompt_tokens=chat_prompt.prompt_tokens
+            )
+            self._store_in_cache(state, query_response, validation)
 
-                # 신뢰도 조정
-                confidence = validation_result["confidence_adjusted"]
+            # 8. 쿼리 로그 기록 (백그라운드 일괄 기록)
+            self._complete(request, query_response, timings)
 
-                # 품질이 매우 낮은 경우 기본 응답으로 대체
-                if not validation_result["is_valid"] or validation_result["quality_score"] < 0.3:
-                    logger.warning("품질 검증 실패 - 기본 응답으로 대체")
-                    response_text = "죄송합니다. 정확한 정보를 찾을 수 없습니다. 다른 키워드로 검색해보시거나 문서 내용을 확인해주세요."
-                    confidence = 0.1
+            return query_response
 
-            except Exception as e:
-                logger.warning(f"품질 검증 실패 (계속 진행): {e}")
+        except Exception as e:
+            error_response = QueryResponse(
+                answer=self._error_message(request, e),
+                confidence=0.0,
+                sources=[],
+                query_time_ms=int((time.time() - start_time) * 1000),
+                model_used="error"
+            )
+            self._complete(request, error_response, timings)
+            return error_response
 
-            # 7. 응답 구성
+    async def query_stream(self, request: QueryRequest) -> AsyncIterator[Dict[str, Any]]:
+        """질의응답 파이프라인의 스트리밍 버전
+
+        query()와 같은 단계(역할별 질의 확장, 메타데이터 필터, 문서 정보 보강, 역할 프롬프트,
+        품질 검증, 응답 캐시)를 거치며 이벤트를 순서대로 내보냅니다.
+
+        - sources: 검색 출처 목록 (생성 시작 전)
+        - token: 생성된 텍스트 조각
+        - done: 최종 답변, 신뢰도, 품질 검증 결과, 첫 토큰까지 시간(ms)과 초당 토큰 수
+        - error: 오류 메시지
+        """
+        start_time = time.time()
+        timings: Dict[str, float] = {}
+
+        try:
+            early_response, state = await self._prepare(request, start_time, timings)
+            if early_response is None:
+                search_results = await self._retrieve(request, state, timings)
+                if not search_results:
+                    early_response = self._no_results_response(start_time)
+
+            if early_response is not None:
+                # 사양 고속 경로, 캐시 적중, 검색 결과 없음: 생성 없이 한 번에 전달
+                yield self._sources_event(early_response.sources)
+                yield {"event": "token", "data": {"text": early_response.answer}}
+                yield {"event": "done", "data": dict(
+                    self._done_payload(early_response),
+                    ttft_ms=int((time.time() - start_time) * 1000),
+                    timings=dict(timings)
+                )}
+                self._complete(request, early_response, timings)
+                return
+
+            context, sources, passages = await self._build_sources(request, search_results, state, timings)
+            yield self._sources_event(sources)
+
+            ollama_service = await get_ollama_service()
+            chat_prompt = get_prompt_builder().build(request.question, context, request.user_role)
+
+            parts: List[str] = []
+            generation_stats: Dict[str, Any] = {}
+            generation_start = time.time()
+            first_token_at: Optional[float] = None
+            async for chunk in ollama_service.chat_stream(
+                chat_prompt.messages,
+                temperature=0.1,
+                max_tokens=512,
+                stats=generation_stats
+            ):
+                if not chunk:
+                    continue
+                if first_token_at is None:
+                    first_token_at = time.time()
+                parts.append(chunk)
+                yield {"event": "token", "data": {"text": chunk}}
+            # 클라이언트가 토큰을 읽는 시간도 포함됨 (스트리밍 응답의 생성 구간)
+            timings["generate"] = round((time.time() - generation_start) * 1000, 1)
+            if generation_stats.get("prompt_eval_duration"):
+                timings["prefill"] = round(generation_stats["prompt_eval_duration"] / 1e6, 1)
+            elif first_token_at is not None:
+                timings["prefill"] = round((first_token_at - generation_start) * 1000, 1)
+
+            with stage(timings, "validate"):
+                response_text, confidence, validation = await self._finalize_answer(
+                    request, search_results, passages, "".join(parts).strip()
+                )
             query_response = QueryResponse(
                 answer=response_text,
                 confidence=confidence,
                 sources=sources,
                 query_time_ms=int((time.time() - start_time) * 1000),
-                model_used=ollama_service.model
+                model_used=ollama_service.model,
+                prompt_tokens=chat_prompt.prompt_tokens
+            )
+            self._store_in_cache(state, query_response, validation)
+
+            metrics = dict(
+                self._generation_metrics(start_time, generation_start, first_token_at, len(parts), generation_stats),
+                **self._prompt_metrics(chat_prompt, generation_stats)
             )
+            self.stream_metrics.append(metrics)
+            logger.info(f"스트리밍 응답 완료 - 첫 토큰 {metrics['ttft_ms']}ms, "
+                        f"{metrics['tokens']}토큰, {metrics['tokens_per_second']} tokens/s, "
+                        f"프롬프트 {metrics['prompt_tokens']}토큰 (새로 평가 {metrics['prompt_eval_tokens']}토큰)")
 
-            # 7. 쿼리 로그 저장
-            await self._log_query(request, query_response)
+            yield {"event": "done", "data": dict(
+                self._done_payload(query_response, validation),
+                timings=dict(timings),
+                **metrics
+            )}
 
-            return query_response
+            self._complete(request, query_response, timings)
 
         except Exception as e:
-            # 상세한 오류 정보 로깅
-            import traceback
-            logger.error(f"RAG 질의 처리 실패 - 질문: {request.question}")
-            logger.error(f"오류 유형: {type(e).__name__}")
-            logger.error(f"오류 메시지: {str(e)}")
-            logger.error(f"스택 트레이스: {traceback.format_exc()}")
-
-            # IMPROVED: 구체적인 오류 분류와 사용자 친화적 메시지
-            error_message = "질의 처리 중 오류가 발생했습니다. "
-
-            if "validation error" in str(e).lower():
-                error_message += "응답 데이터 형식 오류가 발생했습니다. 관리자에게 문의하세요."
-                logger.error(f"VALIDATION ERROR - 데이터 모델 검증 실패: {e}")
-            elif "connection" in str(e).lower():
-                error_message += "서비스 연결에 문제가 있습니다. 잠시 후 다시 시도해주세요."
-            elif "timeout" in str(e).lower():
-                error_message += "응답 시간이 초과되었습니다. 더 구체적인 질문으로 다시 시도해주세요."
-            elif "model" in str(e).lower() or "load" in str(e).lower():
-                error_message += "AI 모델 로드 중입니다. 잠시 후 다시 시도해주세요."
-            elif "datatype mismatch" in str(e).lower():
-                error_message += "데이터 형식 오류가 발생했습니다. 관리자에게 문의하세요."
-                logger.error(f"DATABASE ERROR - 데이터타입 불일치: {e}")
-            elif "'dict' object is not callable" in str(e):
-                error_message += "서비스 초기화 중입니다. 잠시 후 다시 시도해주세요."
-                logger.error(f"SERVICE INITIALIZATION ERROR - 서비스 준비 미완료: {e}")
-            else:
-                error_message += f"관리자에게 문의하거나 잠시 후 다시 시도해주세요. (오류코드: {type(e).__name__})"
-
-            return QueryResponse(
-                answer=error_message,
+            message = self._error_message(request, e)
+            yield {"event": "error", "data": {"message": message}}
+            self._complete(request, QueryResponse(
+                answer=message,
                 confidence=0.0,
                 sources=[],
                 query_time_ms=int((time.time() - start_time) * 1000),
                 model_used="error"
+            ), timings)
+
+    def get_stream_metrics_summary(self) -> Dict[str, Any]:
+        """최근 스트리밍 응답의 첫 토큰까지 시간, 생성 속도, 프롬프트 크기 요약"""
+        metrics = list(self.stream_metrics)
+        if not metrics:
+            return {"count": 0}
+        ttfts = sorted(m["ttft_ms"] for m in metrics)
+        speeds = [m["tokens_per_second"] for m in metrics if m["tokens_per_second"] > 0]
+        return {
+            "count": len(metrics),
+            "ttft_ms_avg": round(sum(ttfts) / len(ttfts), 1),
+            "ttft_ms_p50": ttfts[len(ttfts) // 2],
+            "ttft_ms_p95": ttfts[min(len(ttfts) - 1, int(len(ttfts) * 0.95))],
+            "tokens_per_second_avg": round(sum(speeds) / len(speeds), 2) if speeds else 0.0,
+            "prompt_tokens_avg": round(sum(m.get("prompt_tokens") or 0 for m in metrics) / len(metrics), 1),
+        }
+
+    async def _prepare(self, request: QueryRequest, start_time: float,
+                       timings: Dict[str, float]) -> Tuple[Optional[QueryResponse], Dict[str, Any]]:
+        """사양 고속 경로와 응답 캐시 확인 (답이 있으면 응답 반환, 없으면 이후 단계 상태 반환)
+
+        질의 임베딩은 한 번만 계산해 캐시 조회와 벡터 검색에 함께 사용합니다.
+        """
+        # 0. 사양 테이블 고속 경로 (구조화된 결과가 있으면 LLM 생략)
+        if settings.spec_fast_path_enabled:
+            try:
+                spec_service = await get_spec_service()
+                with stage(timings, "spec"):
+                    spec_response = await spec_service.answer(request)
+                if spec_response is not None:
+                    spec_response.query_time_ms = int((time.time() - start_time) * 1000)
+                    return spec_response, {}
+            except Exception as e:
+                logger.warning(f"사양 테이블 조회 실패 (RAG로 진행): {e}")
+
+        # 1. 질문 분석 및 확장
+        with stage(timings, "enhance"):
+            enhanced_query = self._enhance_query(request.question, request.user_role)
+        logger.info(f"원본 질문: {request.question}")
+        logger.info(f"확장된 질문: {enhanced_query}")
+
+        state: Dict[str, Any] = {
+            "enhanced_query": enhanced_query,
+            "query_embedding": None,
+            "cache_scope": None,
+            "index_version": None,
+        }
+        if not settings.answer_cache_enabled:
+            return None, state
+
+        try:
+            vector_service = await get_vector_service()
+            answer_cache = get_answer_cache()
+            state["index_version"] = await vector_service.current_version()
+            with stage(timings, "embed"):
+                state["query_embedding"] = await vector_service.embed_query(enhanced_query)
+            state["cache_scope"] = answer_cache.scope_key(
+                request.user_role.value, request.document_filter, request.question
+            )
+            with stage(timings, "cache"):
+                cached_response = answer_cache.lookup(
+                    state["cache_scope"], state["query_embedding"], state["index_version"]
+                )
+            if cached_response is not None:
+                cached_response.query_time_ms = int((time.time() - start_time) * 1000)
+                cached_response.cached = True
+                cached_response.prompt_tokens = None
+                logger.info("응답 캐시 적중 - 검색/LLM 생략")
+                return cached_response, state
+        except Exception as e:
+            logger.warning(f"응답 캐시 조회 실패 (계속 진행): {e}")
+            state["cache_scope"] = None
+
+        return None, state
+
+    async def _retrieve(self, request: QueryRequest, state: Dict[str, Any],
+                        timings: Dict[str, float]) -> List[Dict[str, Any]]:
+        """벡터 검색 (질문 유형에 맞는 섹션 범위를 먼저 검색, 타임아웃 30초)"""
+        import asyncio
+        vector_service = await get_vector_service()
+
+        try:
+            if state["query_embedding"] is None:
+                # 섹션 범위 검색, 전체 검색, 컨텍스트 압축이 같은 질의 임베딩을 사용
+                with stage(timings, "embed"):
+                    state["query_embedding"] = await vector_service.embed_query(state["enhanced_query"])
+            search_start = time.perf_counter()
+
+            metadata_filter = self._build_metadata_filter(request.document_filter)
+            section_type = self._infer_section_scope(request.question, metadata_filter)
+
+            search_results = []
+            if section_type:
+                # 질문 유형에 맞는 섹션 안에서 먼저 검색 (후보 축소, 더 좁은 컨텍스트)
+                search_results = await asyncio.wait_for(
+                    vector_service.search(
+                        query=state["enhanced_query"],
+                        top_k=request.top_k,
+                        filter_metadata=dict(metadata_filter, section_type=section_type),
+                        query_embedding=state["query_embedding"]
+                    ),
+                    timeout=30.0
+                )
+                logger.info(f"섹션 범위 검색({section_type}): {len(search_results)}개 결과")
+
+            if not search_results:
+                search_results = await asyncio.wait_for(
+                    vector_service.search(
+                        query=state["enhanced_query"],
+                        top_k=request.top_k,
+                        filter_metadata=metadata_filter,
+                        query_embedding=state["query_embedding"]
+                    ),
+                    timeout=30.0
+                )
+            timings["search"] = round((time.perf_counter() - search_start) * 1000, 1)
+            logger.info(f"벡터 검색 완료: {len(search_results)}개 결과")
+            return search_results
+        except asyncio.TimeoutError:
+            logger.error("벡터 검색 타임아웃 (30초)")
+            raise Exception("벡터 검색 시간이 초과되었습니다.")
+
+    async def _build_sources(
+        self, request: QueryRequest, search_results: List[Dict[str, Any]], state: Dict[str, Any],
+        timings: Dict[str, float]
+    ) -> Tuple[str, List[SourceInfo], List[ContextPassage]]:
+        """문서 메타데이터 보강, 구절 병합/압축 및 컨텍스트 구성"""
+        import asyncio
+        with stage(timings, "metadata"):
+            document_info_map = await self._fetch_document_info_map(search_results)
+
+        # 토큰 계산(첫 호출 시 토크나이저 로드 포함)은 이벤트 루프 밖에서 수행
+        loop = asyncio.get_event_loop()
+        with stage(timings, "context"):
+            passages = await loop.run_in_executor(None, self.context_builder.prepare, search_results)
+
+        if settings.context_compression_enabled and state.get("query_embedding") is not None:
+            try:
+                vector_service = await get_vector_service()
+                with stage(timings, "compress"):
+                    passages = await asyncio.wait_for(
+                        get_context_compressor().compress(
+                            passages, state["query_embedding"], vector_service.embed_documents
+                        ),
+                        timeout=settings.context_compression_timeout
+                    )
+            except asyncio.TimeoutError:
+                logger.warning("컨텍스트 압축 타임아웃 - 압축 없이 진행")
+            except Exception as e:
+                logger.warning(f"컨텍스트 압축 실패 (압축 없이 진행): {e}")
+
+        with stage(timings, "context"):
+            return await loop.run_in_executor(
+                None, self._build_context, passages, len(search_results), document_info_map
+            )
+
+    async def _finalize_answer(self, request: QueryRequest, search_results: List[Dict[str, Any]],
+                         passages: List[ContextPassage],
+                         response_text: str) -> Tuple[str, float, Optional[Dict[str, Any]]]:
+        """신뢰도 계산과 품질 검증 (품질이 매우 낮으면 기본 응답으로 대체)"""
+        # 5. 신뢰도 계산
+        confidence = self._calculate_confidence(search_results, response_text)
+
+        # 6. 품질 검증
+        validation_result = None
+        try:
+            quality_service = await get_quality_service()
+            validation_result = quality_service.validate_answer(
+                question=request.question,
+                answer=response_text,
+                sources=[{"content": passage.text} for passage in passages],
+                confidence=confidence
             )
 
+            # 품질 검증 결과를 로깅
+            logger.info(f"품질 검증 완료 - 점수: {validation_result['quality_score']:.2f}, "
+                       f"유효성: {validation_result['is_valid']}")
+
+            # 신뢰도 조정
+            confidence = validation_result["confidence_adjusted"]
+
+            # 품질이 매우 낮은 경우 기본 응답으로 대체
+            if not validation_result["is_valid"] or validation_result["quality_score"] < 0.3:
+                logger.warning("품질 검증 실패 - 기본 응답으로 대체")
+                response_text = "죄송합니다. 정확한 정보를 찾을 수 없습니다. 다른 키워드로 검색해보시거나 문서 내용을 확인해주세요."
+                confidence = 0.1
+                validation_result = dict(validation_result, replaced=True)
+
+        except Exception as e:
+            logger.warning(f"품질 검증 실패 (계속 진행): {e}")
+
+        return response_text, confidence, validation_result
+
+    def _store_in_cache(self, state: Dict[str, Any], response: QueryResponse,
+                        validation: Optional[Dict[str, Any]]):
+        """품질 검증을 통과한 답변만 캐시 (대체 응답이 같은 질문에 계속 반환되지 않도록)"""
+        if state.get("cache_scope") is None or (validation and validation.get("replaced")):
+            return
+        get_answer_cache().store(
+            state["cache_scope"], state["query_embedding"], response, state["index_version"]
+        )
+
+    @staticmethod
+    def _no_results_response(start_time: float) -> QueryResponse:
+        return QueryResponse(
+            answer="죄송합니다. 관련 정보를 찾을 수 없습니다. 다른 키워드로 검색해보시거나 문서가 업로드되었는지 확인해주세요.",
+            confidence=0.0,
+            sources=[],
+            query_time_ms=int((time.time() - start_time) * 1000),
+            model_used="N/A"
+        )
+
+    @staticmethod
+    def _sources_event(sources: List[SourceInfo]) -> Dict[str, Any]:
+        return {"event": "sources", "data": {"sources": [source.model_dump(mode="json") for source in sources]}}
+
+    @staticmethod
+    def _done_payload(response: QueryResponse,
+                      validation: Optional[Dict[str, Any]] = None) -> Dict[str, Any]:
+        payload = {
+            "answer": response.answer,
+            "confidence": response.confidence,
+            "query_time_ms": response.query_time_ms,
+            "model_used": response.model_used,
+            "cached": response.cached,
+            "prompt_tokens": response.prompt_tokens,
+        }
+        if validation is not None:
+            payload["quality"] = {
+                "quality_score": validation.get("quality_score"),
+                "is_valid": validation.get("is_valid"),
+                "replaced": validation.get("replaced", False),
+            }
+        return payload
+
+    @staticmethod
+    def _generation_metrics(start_time: float, generation_start: float,
+                            first_token_at: Optional[float], chunk_count: int,
+                            generation_stats: Dict[str, Any]) -> Dict[str, Any]:
+        """첫 토큰까지 시간과 초당 토큰 수 (Ollama가 보고한 eval_count/eval_duration 우선)"""
+        end = time.time()
+        tokens = generation_stats.get("eval_count") or chunk_count
+        eval_seconds = (generation_stats.get("eval_duration") or 0) / 1e9
+        if not eval_seconds and first_token_at is not None:
+            eval_seconds = end - first_token_at
+        return {
+            "ttft_ms": int(((first_token_at or end) - start_time) * 1000),
+            "generation_ttft_ms": int(((first_token_at or end) - generation_start) * 1000),
+            "tokens": tokens,
+            "tokens_per_second": round(tokens / eval_seconds, 2) if eval_seconds > 0 else 0.0,
+        }
+
+    @staticmethod
+    def _prompt_metrics(chat_prompt: ChatPrompt, generation_stats: Dict[str, Any]) -> Dict[str, Any]:
+        """프롬프트 토큰 수 (부분별 추정치와 Ollama가 실제로 새로 평가한 토큰 수)
+
+        Ollama는 이전 요청과 겹치는 앞부분을 KV 캐시에서 재사용하므로, prompt_eval_count가
+        prompt_tokens보다 작으면 그 차이만큼 고정 system 지침 평가를 건너뛴 것입니다.
+        """
+        return {
+            "prompt_tokens": chat_prompt.prompt_tokens,
+            "prompt_token_breakdown": {
+                key: value for key, value in chat_prompt.token_counts.items() if key != "total"
+            },
+            "prompt_eval_tokens": generation_stats.get("prompt_eval_count"),
+            "prompt_eval_ms": round(generation_stats["prompt_eval_duration"] / 1e6, 1)
+            if generation_stats.get("prompt_eval_duration") else None,
+        }
+
+    @staticmethod
+    def _error_message(request: QueryRequest, e: Exception) -> str:
+        """오류를 분류해 사용자용 메시지 생성"""
+        # 상세한 오류 정보 로깅
+        import traceback
+        logger.error(f"RAG 질의 처리 실패 - 질문: {request.question}")
+        logger.error(f"오류 유형: {type(e).__name__}")
+        logger.error(f"오류 메시지: {str(e)}")
+        logger.error(f"스택 트레이스: {traceback.format_exc()}")
+
+        # IMPROVED: 구체적인 오류 분류와 사용자 친화적 메시지
+        error_message = "질의 처리 중 오류가 발생했습니다. "
+
+        if "validation error" in str(e).lower():
+            error_message += "응답 데이터 형식 오류가 발생했습니다. 관리자에게 문의하세요."
+            logger.error(f"VALIDATION ERROR - 데이터 모델 검증 실패: {e}")
+        elif "connection" in str(e).lower():
+            error_message += "서비스 연결에 문제가 있습니다. 잠시 후 다시 시도해주세요."
+        elif "timeout" in str(e).lower():
+            error_message += "응답 시간이 초과되었습니다. 더 구체적인 질문으로 다시 시도해주세요."
+        elif "model" in str(e).lower() or "load" in str(e).lower():
+            error_message += "AI 모델 로드 중입니다. 잠시 후 다시 시도해주세요."
+        elif "datatype mismatch" in str(e).lower():
+            error_message += "데이터 형식 오류가 발생했습니다. 관리자에게 문의하세요."
+            logger.error(f"DATABASE ERROR - 데이터타입 불일치: {e}")
+        elif "'dict' object is not callable" in str(e):
+            error_message += "서비스 초기화 중입니다. 잠시 후 다시 시도해주세요."
+            logger.error(f"SERVICE INITIALIZATION ERROR - 서비스 준비 미완료: {e}")
+        else:
+            error_message += f"관리자에게 문의하거나 잠시 후 다시 시도해주세요. (오류코드: {type(e).__name__})"
+
+        return error_message
+
     def _enhance_query(self, query: str, role: UserRole) -> str:
         """사용자 역할에 따른 질의 확장"""
         role_specific_keywords = self.role_keywords.get(role, [])
@@ -211,179 +571,94 @@ class ManufacturingRAGService:
 
         return enhanced_query
 
-    def _build_metadata_filter(self, document_filter: Optional[str]) -> Dict[str, Any]:
-        """문서 필터 구성"""
+    def _build_metadata_filter(self, document_filter: Optional[Dict[str, Any]]) -> Dict[str, Any]:
+        """문서 필터 구성 (청크 메타데이터에 있는 키만 사용)"""
         if not document_filter:
             return {}
 
-        filters = {}
+        # 이전 형식: 제품군 문자열
+        if isinstance(document_filter, str):
+            return {"product_family": document_filter}
 
-        # 파일 확장자 필터
-        if document_filter.endswith(('.pdf', '.doc', '.docx', '.txt')):
-            filters['file_type'] = document_filter.split('.')[-1]
-        # 제품군 필터
-        elif document_filter:
-            filters['product_family'] = document_filter
+        supported_keys = ("document_id", "document_type", "product_family", "product_model", "section_type")
+        return {
+            key: value for key, value in document_filter.items()
+            if key in supported_keys and value
+        }
 
-        return filters
+    def _infer_section_scope(self, question: str, metadata_filter: Dict[str, Any]) -> Optional[str]:
+        """질문 내용으로 검색할 섹션 유형 추정 (명시적 필터가 있으면 사용하지 않음)"""
+        if "section_type" in metadata_filter:
+            return None
+        section_type = classify_section(question)
+        return None if section_type == "other" else section_type
+
+    def _build_context(self, prepared: List[Dict[str, Any]], result_count: int,
+                      document_info_map: Dict[str, DocumentEntry]) -> Tuple[str, List[SourceInfo], List[ContextPassage]]:
+        """병합/압축된 구절을 토큰 예산에 맞춘 컨텍스트와 출처 정보로 변환 (출처는 실제로 넣은 구절 기준)"""
+
+        def render_header(metadata: Dict[str, Any]) -> str:
+            doc_info = document_info_map.get(metadata.get("document_id"))
+            lines = []
+            name = doc_info.original_name if doc_info else metadata.get("filename")
+            if name:
+                lines.append(f"파일: {name}")
+            product_model = doc_info.product_model if doc_info else metadata.get("product_model")
+            if product_model:
+                lines.append(f"제품: {product_model}")
+            if metadata.get("page_number"):
+                lines.append(f"페이지: {metadata['page_number']}")
+            if metadata.get("section"):
+                lines.append(f"섹션: {metadata['section']}")
+            return "\n".join(lines)
+
+        passages = self.context_builder.pack(prepared, render_header)
 
-    def _build_context(self, search_results: List[Dict[str, Any]],
-                      role: UserRole,
-                      document_info_map: Dict[str, Document]) -> tuple[str, List[SourceInfo]]:
-        """검색 결과를 컨텍스트와 출처 정보로 변환"""
-        context_parts = []
         sources = []
-
-        for i, result in enumerate(search_results):
-            content = result.get("page_content", "")
-            metadata = result.get("metadata", {})
-            score = result.get("score", 0.0)
-
-            if not content.strip():
-                continue
-
-            # 문서 정보 보강
+        for i, passage in enumerate(passages):
+            metadata = passage.metadata
             document_id = metadata.get("document_id")
             doc_info = document_info_map.get(document_id) if document_id else None
-
-            # 컨텍스트 생성 (역할별 최적화)
-            context_header = f"\n--- 문서 {i+1} ---"
-            if doc_info:
-                context_header += f"\n파일: {doc_info.filename}"
-                if doc_info.product_model:
-                    context_header += f"\n제품: {doc_info.product_model}"
-                if metadata.get("page"):
-                    context_header += f"\n페이지: {metadata.get('page')}"
-                if metadata.get("section"):
-                    context_header += f"\n섹션: {metadata.get('section')}"
-
-            context_part = f"{context_header}\n내용:\n{content}\n"
-            context_parts.append(context_part)
-
-            # 출처 정보 생성 (IMPROVED: Pydantic 길이 제한 준수)
             try:
-                # FIXED: content_preview 길이 제한 (max 500자)
-                content_preview = content[:500] if len(content) > 500 else content
-
-                source_info = SourceInfo(
+                sources.append(SourceInfo(
                     document_id=str(document_id) if document_id else f"doc_{i}",
-                    filename=doc_info.filename if doc_info else metadata.get("source", "Unknown"),
-                    content_preview=content_preview,  # 길이 제한 적용
-                    page_number=metadata.get("page"),
+                    document_name=doc_info.original_name if doc_info else metadata.get("filename", "Unknown"),
+                    content_preview=passage.text[:250],  # SourceInfo 길이 제한
+                    page_number=metadata.get("page_number"),
                     section=metadata.get("section"),
-                    relevance_score=float(score)
-                )
-                sources.append(source_info)
+                    relevance_score=round(passage.relevance, 4),
+                    start_offset=metadata.get("start_offset"),
+                    end_offset=metadata.get("end_offset")
+                ))
             except Exception as e:
                 logger.warning(f"SourceInfo 생성 실패 (인덱스 {i}): {e}")
-                # 기본 정보로 fallback
-                try:
-                    fallback_source = SourceInfo(
-                        document_id=f"doc_{i}",
-                        filename="Unknown",
-                        content_preview=content[:200],  # 더 짧게 제한
-                        page_number=metadata.get("page"),
-                        section=metadata.get("section"),
-                        relevance_score=float(score) if score else 0.0
-                    )
-                    sources.append(fallback_source)
-                except Exception as fallback_e:
-                    logger.error(f"Fallback SourceInfo 생성도 실패: {fallback_e}")
-                    continue
 
-        # 역할별 컨텍스트 최적화
-        context = self._optimize_context_for_role("\n".join(context_parts), role)
+        context_tokens = sum(p.token_count for p in passages)
+        logger.info(f"컨텍스트 구성: 검색 결과 {result_count}개 → 구절 {len(passages)}개, "
+                    f"{context_tokens}/{self.context_builder.token_budget} 토큰")
 
-        return context, sources
+        return ContextBuilder.render(passages), sources, passages
 
     async def _fetch_document_info_map(
         self,
         search_results: List[Dict[str, Any]]
-    ) -> Dict[str, Document]:
-        """검색 결과의 문서 메타데이터를 보강 - IMPROVED with connection management"""
-        document_ids = set()
-
-        for result in search_results:
-            metadata = result.get("metadata") or {}
-            document_id = metadata.get("document_id")
-            if document_id:
-                document_ids.add(str(document_id))
-
+    ) -> Dict[str, DocumentEntry]:
+        """검색 결과의 문서 메타데이터 (DB 조회 없이 문서 카탈로그에서)"""
+        document_ids = {
+            str((result.get("metadata") or {}).get("document_id"))
+            for result in search_results
+            if (result.get("metadata") or {}).get("document_id")
+        }
         if not document_ids:
-            logger.info("문서 ID가 없어 메타데이터 조회를 건너뜁니다.")
             return {}
 
+        catalog = get_document_catalog()
         try:
-            from sqlalchemy import select
-            import asyncio
-
-            logger.info(f"문서 메타데이터 조회 시작: {len(document_ids)}개 ID")
-
-            # CRITICAL FIX: 연결 타임아웃 설정
-            async def fetch_with_timeout():
-                async with AsyncSessionLocal() as session:
-                    # IMPROVED: 쿼리 최적화 및 타임아웃 설정
-                    query = select(Document).where(Document.id.in_(document_ids))
-
-                    # 짧은 타임아웃으로 쿼리 실행
-                    db_result = await asyncio.wait_for(
-                        session.execute(query),
-                        timeout=5.0  # 5초 쿼리 타임아웃
-                    )
-                    documents = db_result.scalars().all()
-
-                    logger.info(f"데이터베이스에서 {len(documents)}개 문서 정보 조회 완료")
-                    return {document.id: document for document in documents}
-
-            return await fetch_with_timeout()
-
-        except asyncio.TimeoutError:
-            logger.error("데이터베이스 쿼리 타임아웃 - 빈 맵 반환")
-            return {}
+            await catalog.ensure_loaded()  # 시작 시 로드하지 않은 경우(스크립트 등)에만 DB 조회
         except Exception as e:
-            logger.warning(f"문서 메타데이터 조회 실패: {e}")
+            logger.warning(f"문서 카탈로그 로드 실패 - 청크 메타데이터로 대체: {e}")
             return {}
-
-    def _optimize_context_for_role(self, context: str, role: UserRole) -> str:
-        """역할별 컨텍스트 최적화"""
-        # 역할에 따라 관련성 높은 부분을 강조하거나 필터링
-        # 현재는 기본 컨텍스트 반환, 향후 NLP 기법으로 개선 가능
-
-        # 컨텍스트 길이 제한
-        max_context_length = 3000
-        if len(context) > max_context_length:
-            context = context[:max_context_length] + "\n[내용이 길어 일부만 표시됨]"
-
-        return context
-
-    def _create_role_specific_prompt(self, question: str, context: str, role: UserRole) -> str:
-        """역할별 특화 프롬프트 생성"""
-        role_instruction = self.role_instructions.get(role, "")
-
-        prompt = f"""
-다음은 제품 데이터시트에서 추출한 기술 정보입니다:
-
-{context}
-
-사용자 역할: {role.value}
-지침: {role_instruction}
-
-질문: {question}
-
-위 정보를 바탕으로 정확하고 구체적인 한글 답변을 제공하세요.
-
-** 중요한 답변 형식 지침 **:
-1. 반드시 한국어로만 답변하세요
-2. 개조식으로 답변하세요 (예: "• DDR5 동작 전압: 1.1V", "• 온도 범위: 0~95℃")
-3. 구체적인 수치와 단위를 포함하세요
-4. 관련 조건이나 제약사항을 명시하세요
-5. 정보가 불충분한 경우 그 사실을 명시하세요
-6. 추측하지 말고 제공된 정보에만 기반하여 답변하세요
-7. 영어 단어는 필요한 기술용어만 사용하고 괄호로 병기하세요
-
-한글 개조식 답변:"""
-
-        return prompt
+        return catalog.get_many(document_ids)
 
     def _calculate_confidence(self, search_results: List[Dict[str, Any]], response: str) -> float:
         """응답 신뢰도 계산 - FAISS 거리 점수를 0-1 범위로 정규화"""
@@ -412,36 +687,72 @@ class ManufacturingRAGService:
 
         return round(confidence, 3)
 
-    async def _log_query(self, request: QueryRequest, response: QueryResponse):
-        """쿼리 로그 저장"""
-        try:
-            # IMPROVED: 로그 저장도 타임아웃 적용
-            import asyncio
-
-            async def save_log():
-                async with AsyncSessionLocal() as session:
-                    query_log = QueryLog(
-                        question=request.question,
-                        user_role=request.user_role.value,
-                        answer=response.answer,
-                        confidence=response.confidence,
-                        query_time_ms=response.query_time_ms,
-                        model_used=response.model_used,
-                        source_count=len(response.sources),
-                        timestamp=datetime.utcnow()
-                    )
-
-                    session.add(query_log)
-                    await session.commit()
-                    logger.info("쿼리 로그 저장 완료")
+    def _complete(self, request: QueryRequest, response: QueryResponse, timings: Dict[str, float]):
+        """모든 응답 경로의 마지막 단계: 질의 로그 기록과 단계별 지연 시간 집계"""
+        with stage(timings, "log"):
+            self._log_query(request, response, timings)
+        timings["total"] = float(response.query_time_ms)
+        record_timings(timings)
 
-            # 로그 저장 타임아웃 5초
-            await asyncio.wait_for(save_log(), timeout=5.0)
-
-        except asyncio.TimeoutError:
-            logger.warning("쿼리 로그 저장 타임아웃")
+    def _log_query(self, request: QueryRequest, response: QueryResponse,
+                   timings: Optional[Dict[str, float]] = None):
+        """쿼리 로그를 기록 버퍼에 추가 (DB 기록은 백그라운드에서 일괄 처리, 응답을 기다리게 하지 않음)"""
+        try:
+            document_ids = list(dict.fromkeys(source.document_id for source in response.sources))
+            get_query_log_writer().submit({
+                "user_role": request.user_role.value,
+                "query_text": request.question,
+                "response_text": response.answer,
+                "retrieved_documents": json.dumps(document_ids),
+                "response_time_ms": response.query_time_ms,
+                "confidence": response.confidence,
+                "model_used": response.model_used,
+                "source_count": len(response.sources),
+                "cached": response.cached,
+                "prompt_tokens": response.prompt_tokens,
+                "stage_timings": json.dumps(timings) if timings else None,
+                "created_at": datetime.utcnow(),
+            })
         except Exception as e:
-            logger.warning(f"쿼리 로그 저장 실패: {e}")
+            logger.warning(f"쿼리 로그 기록 실패: {e}")
+
+    async def get_popular_queries(self, limit: int = 10) -> List[str]:
+        """자주 묻는 질문 (같은 질문 문자열 기준 빈도순)"""
+        async with AsyncSessionLocal() as session:
+            rows = await session.execute(
+                select(QueryLog.query_text)
+                .where(QueryLog.query_text.isnot(None))
+                .group_by(QueryLog.query_text)
+                .order_by(func.count().desc(), func.max(QueryLog.created_at).desc())
+                .limit(limit)
+            )
+            return [row[0] for row in rows]
+
+    async def get_query_statistics(self) -> Dict[str, Any]:
+        """질의 수, 평균 응답 시간, 역할별 분포 등 질의 로그 통계"""
+        async with AsyncSessionLocal() as session:
+            totals = (await session.execute(
+                select(
+                    func.count(QueryLog.id),
+                    func.avg(QueryLog.response_time_ms),
+                    func.avg(QueryLog.confidence),
+                    func.sum(QueryLog.cached)
+                )
+            )).one()
+            roles = await session.execute(
+                select(QueryLog.user_role, func.count(QueryLog.id)).group_by(QueryLog.user_role)
+            )
+            role_distribution = {role or "unknown": count for role, count in roles}
+
+        return {
+            "total_queries": totals[0] or 0,
+            "avg_response_time_ms": round(float(totals[1] or 0.0), 1),
+            "avg_confidence": round(float(totals[2] or 0.0), 3),
+            "cached_queries": int(totals[3] or 0),
+            "role_distribution": role_distribution,
+            # 아직 기록되지 않은 버퍼의 로그는 위 집계에 포함되지 않음
+            "pending_logs": get_query_log_writer().stats()["pending"],
+        }
 
 
 # 싱글톤 인스턴스
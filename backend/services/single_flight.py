@@ -0,0 +1,158 @@
+"""동시 동일 질의 합치기 (single-flight)
+
+같은 질문이 몇 초 안에 여러 번 들어오면(제품 이슈 발생 직후 등) 첫 요청만 검색과
+LLM 생성을 실행하고, 실행 중에 들어온 같은 키의 요청은 그 결과를 함께 받습니다.
+
+- do(): 결과 하나를 공유 (일반 질의)
+- stream(): 생성되는 항목을 모든 구독자에게 순서대로 전달 (스트리밍 질의)
+  늦게 합류한 구독자는 이미 나온 항목부터 다시 받고, 구독자가 모두 떠나면 생성을 취소합니다.
+
+실행은 별도 태스크에서 돌기 때문에 한 요청이 끊겨도 같이 기다리는 요청에는 영향이 없습니다.
+"""
+import asyncio
+import json
+import re
+from typing import Any, AsyncIterator, Awaitable, Callable, Dict, Hashable, List, Optional, Tuple, TypeVar
+
+from loguru import logger
+
+from ..config.settings import settings
+
+T = TypeVar("T")
+
+_WHITESPACE_RE = re.compile(r"\s+")
+
+
+def query_key(question: str, user_role: str, document_filter: Any, top_k: int) -> Tuple[str, str, str, int]:
+    """정규화한 (질문, 역할, 필터, top_k) 키 (대소문자/공백/끝 문장부호 차이는 같은 질문으로 취급)"""
+    normalized = _WHITESPACE_RE.sub(" ", question).strip().casefold().rstrip("?.!？ ")
+    filter_key = json.dumps(document_filter, sort_keys=True, ensure_ascii=False, default=str) \
+        if document_filter else ""
+    return normalized, user_role, filter_key, top_k
+
+
+def _release(registry: Dict[Hashable, Any], key: Hashable, value: Any):
+    # 같은 키로 새 실행이 이미 등록되었으면 그대로 둠
+    if registry.get(key) is value:
+        del registry[key]
+
+
+def _consume_exception(task: asyncio.Task):
+    # 기다리던 요청이 모두 끊긴 뒤 실패한 경우 "exception was never retrieved" 경고 방지
+    if not task.cancelled():
+        task.exception()
+
+
+class _SharedStream:
+    """생성 항목을 버퍼에 쌓고 구독자마다 자기 위치부터 읽게 하는 스트림"""
+
+    def __init__(self):
+        self.items: List[Any] = []
+        self.done = False
+        self.error: Optional[BaseException] = None
+        self.subscribers = 0
+        self.task: Optional[asyncio.Task] = None
+        self._changed = asyncio.Condition()
+
+    async def pump(self, source: AsyncIterator[Any]):
+        try:
+            async for item in source:
+                self.items.append(item)
+                async with self._changed:
+                    self._changed.notify_all()
+        except asyncio.CancelledError:
+            self.error = asyncio.CancelledError()
+            raise
+        except Exception as e:
+            self.error = e
+        finally:
+            self.done = True
+            async with self._changed:
+                self._changed.notify_all()
+
+    async def subscribe(self) -> AsyncIterator[Any]:
+        position = 0
+        while True:
+            while position < len(self.items):
+                yield self.items[position]
+                position += 1
+            if self.done:
+                if self.error is not None:
+                    raise self.error
+                return
+            async with self._changed:
+                await self._changed.wait_for(lambda: position < len(self.items) or self.done)
+
+
+class SingleFlight:
+    """키별 진행 중 실행 레지스트리"""
+
+    def __init__(self):
+        self._calls: Dict[Hashable, asyncio.Task] = {}
+        self._streams: Dict[Hashable, _SharedStream] = {}
+        self.executions = 0
+        self.coalesced = 0
+        self.stream_executions = 0
+        self.stream_coalesced = 0
+
+    async def do(self, key: Hashable, fn: Callable[[], Awaitable[T]]) -> Tuple[T, bool]:
+        """키가 같은 실행이 진행 중이면 그 결과를 기다리고, 없으면 fn 실행 (결과, 공유 여부) 반환"""
+        task = self._calls.get(key)
+        shared = task is not None
+        if shared:
+            self.coalesced += 1
+            logger.info(f"진행 중인 동일 질의에 합류 (대기 {self.coalesced}회 누적)")
+        else:
+            self.executions += 1
+            task = asyncio.ensure_future(fn())
+            self._calls[key] = task
+            task.add_done_callback(lambda done: _release(self._calls, key, done))
+            task.add_done_callback(_consume_exception)
+        # 기다리는 요청이 취소되어도 공유 실행은 계속 진행
+        return await asyncio.shield(task), shared
+
+    async def stream(self, key: Hashable,
+                     source_factory: Callable[[], AsyncIterator[Any]]) -> AsyncIterator[Any]:
+        """키가 같은 스트림이 진행 중이면 구독하고, 없으면 source_factory()로 새 스트림 시작"""
+        shared_stream = self._streams.get(key)
+        if shared_stream is not None:
+            self.stream_coalesced += 1
+            logger.info("진행 중인 동일 스트리밍 질의에 합류")
+        else:
+            self.stream_executions += 1
+            shared_stream = _SharedStream()
+            self._streams[key] = shared_stream
+            shared_stream.task = asyncio.ensure_future(shared_stream.pump(source_factory()))
+            shared_stream.task.add_done_callback(lambda _: _release(self._streams, key, shared_stream))
+
+        shared_stream.subscribers += 1
+        try:
+            async for item in shared_stream.subscribe():
+                yield item
+        finally:
+            shared_stream.subscribers -= 1
+            if shared_stream.subscribers == 0 and not shared_stream.done:
+                # 받을 사람이 없는 생성은 중단 (LLM 부하 절감)
+                shared_stream.task.cancel()
+                _release(self._streams, key, shared_stream)
+
+    def stats(self) -> Dict[str, Any]:
+        return {
+            "enabled": settings.single_flight_enabled,
+            "in_flight": len(self._calls) + len(self._streams),
+            "executions": self.executions,
+            "coalesced": self.coalesced,
+            "stream_executions": self.stream_executions,
+            "stream_coalesced": self.stream_coalesced,
+        }
+
+
+_single_flight: Optional[SingleFlight] = None
+
+
+def get_single_flight() -> SingleFlight:
+    """single-flight 레지스트리 싱글톤 인스턴스 반환"""
+    global _single_flight
+    if _single_flight is None:
+        _single_flight = SingleFlight()
+    return _single_flight
@@ -0,0 +1,293 @@
+"""데이터시트 사양 테이블 파서
+
+페이지의 텍스트 행(좌표 기반으로 재구성된 셀 목록)에서 Min/Typ/Max 헤더를 가진
+사양 테이블을 찾아 정규화된 사양 행으로 변환합니다.
+PDF 추출 워커 프로세스에서도 사용되므로 표준 라이브러리만 사용합니다.
+"""
+import re
+from typing import List, Dict, Any, Optional, Tuple
+
+
+# 파라미터 표준 키와 데이터시트에서 쓰이는 표기들 (소문자)
+PARAMETER_VOCABULARY: Dict[str, List[str]] = {
+    "vdd": ["vdd", "device supply voltage", "core supply voltage", "supply voltage"],
+    "vddq": ["vddq", "supply voltage for i/o", "i/o supply voltage", "output supply voltage"],
+    "vpp": ["vpp", "core power voltage", "activating power supply", "pump voltage"],
+    "vref": ["vref", "vrefdq", "vrefca", "reference voltage"],
+    "tck": ["tck", "tck(avg)", "clock cycle time", "average clock period", "clock period"],
+    "taa": ["taa", "internal read command to first data"],
+    "trcd": ["trcd", "act to internal read or write delay time"],
+    "trp": ["trp", "pre command period"],
+    "tras": ["tras", "act to pre command period"],
+    "trc": ["trc", "act to act or ref command period"],
+    "operating_temperature": [
+        "toper", "tcase", "operating temperature", "operating case temperature",
+        "operating temperature range"
+    ],
+    "storage_temperature": ["tstg", "storage temperature"],
+    "data_rate": ["data rate", "transfer rate", "speed bin"],
+    "idd": ["idd", "operating current"],
+    "power": ["power consumption", "power dissipation"],
+}
+
+_SYNONYM_TO_KEY: Dict[str, str] = {
+    synonym: key
+    for key, synonyms in PARAMETER_VOCABULARY.items()
+    for synonym in synonyms
+}
+# 긴 표기부터 비교해야 "supply voltage for i/o"가 "supply voltage"보다 먼저 매칭됨
+_SYNONYMS_BY_LENGTH = sorted(_SYNONYM_TO_KEY, key=len, reverse=True)
+
+# 사양 테이블에서 단위로 인정하는 토큰 (대소문자 구분)
+UNITS = {
+    "V", "mV", "uV", "µV", "A", "mA", "uA", "µA", "nA", "W", "mW",
+    "s", "ms", "us", "µs", "ns", "ps",
+    "Hz", "kHz", "MHz", "GHz", "MT/s", "GT/s", "Mbps", "Gbps",
+    "°C", "℃", "oC", "Ω", "Ohm", "ohm", "mOhm", "kOhm", "kΩ", "mΩ",
+    "pF", "nF", "uF", "µF", "%", "tCK", "nCK", "CK", "UI", "V/ns", "mV/ns",
+    "dB", "ppm", "mm", "KB", "MB", "GB", "Gb", "Mb",
+}
+
+# 단위 정규화: 원래 단위 → (기준 단위, 배율). 저장되는 min/typ/max는 기준 단위 값
+UNIT_CONVERSIONS: Dict[str, Tuple[str, float]] = {
+    "mV": ("V", 1e-3), "uV": ("V", 1e-6), "µV": ("V", 1e-6),
+    "mA": ("A", 1e-3), "uA": ("A", 1e-6), "µA": ("A", 1e-6), "nA": ("A", 1e-9),
+    "mW": ("W", 1e-3),
+    "s": ("ns", 1e9), "ms": ("ns", 1e6), "us": ("ns", 1e3), "µs": ("ns", 1e3), "ps": ("ns", 1e-3),
+    "Hz": ("MHz", 1e-6), "kHz": ("MHz", 1e-3), "GHz": ("MHz", 1e3),
+    "GT/s": ("MT/s", 1e3), "Mbps": ("MT/s", 1.0), "Gbps": ("MT/s", 1e3),
+    "℃": ("°C", 1.0), "oC": ("°C", 1.0),
+    "Ω": ("Ohm", 1.0), "ohm": ("Ohm", 1.0), "mOhm": ("Ohm", 1e-3), "mΩ": ("Ohm", 1e-3),
+    "kOhm": ("Ohm", 1e3), "kΩ": ("Ohm", 1e3),
+    "nF": ("pF", 1e3), "uF": ("pF", 1e6), "µF": ("pF", 1e6),
+    "mV/ns": ("V/ns", 1e-3),
+}
+
+_VALUE_COLUMNS = {"min": "min", "minimum": "min", "typ": "typ", "typical": "typ", "nom": "typ",
+                  "max": "max", "maximum": "max"}
+_HEADER_WORDS = set(_VALUE_COLUMNS) | {"unit", "units", "symbol", "parameter", "notes", "note",
+                                      "condition", "conditions", "zmax"}
+
+_NUMBER_RE = re.compile(r"^[-+]?\d+(?:\.\d+)?$")
+_PLACEHOLDERS = {"-", "TBD", "NA", "N/A", "—"}
+# 값 옆에 붙는 허용 오차 표기 "(-3%)", "(+6%)" 등
+_TOLERANCE_RE = re.compile(r"\(\s*[-+]?\d+(?:\.\d+)?\s*%?\s*\)")
+_DASHES = str.maketrans({"–": "-", "−": "-"})
+_SYMBOL_RE = re.compile(r"^[A-Za-z][A-Za-z0-9_/()\-]*$")
+_SLUG_RE = re.compile(r"[^a-z0-9]+")
+
+
+def canonical_parameter(symbol: Optional[str], description: str) -> str:
+    """파라미터 기호/설명을 표준 키로 변환 (사전에 없으면 기호 또는 설명 슬러그)"""
+    if symbol:
+        key = _SYNONYM_TO_KEY.get(symbol.lower())
+        if key:
+            return key
+
+    lowered = description.lower()
+    for synonym in _SYNONYMS_BY_LENGTH:
+        if len(synonym) > 3 and synonym in lowered:
+            return _SYNONYM_TO_KEY[synonym]
+
+    if symbol:
+        return _SLUG_RE.sub("_", symbol.lower()).strip("_")
+    return _SLUG_RE.sub("_", lowered).strip("_")[:100]
+
+
+def normalize_unit(unit: Optional[str]) -> Tuple[Optional[str], float]:
+    """단위를 기준 단위와 배율로 변환 (모르는 단위는 그대로)"""
+    if not unit:
+        return unit, 1.0
+    unit = unit.strip()
+    return UNIT_CONVERSIONS.get(unit, (unit, 1.0))
+
+
+def normalize_value(value: Optional[float], unit: Optional[str]) -> Tuple[Optional[float], Optional[str]]:
+    """값을 기준 단위로 변환"""
+    base_unit, factor = normalize_unit(unit)
+    if value is None:
+        return None, base_unit
+    return round(value * factor, 12), base_unit
+
+
+def _header_columns(cells: List[str]) -> Optional[List[str]]:
+    """Min/Typ/Max 헤더 행이면 값 컬럼 순서를 반환"""
+    tokens = [cell.strip().rstrip(".").lower() for cell in " ".join(cells).split()]
+    if not tokens:
+        return None
+
+    columns = [_VALUE_COLUMNS[t] for t in tokens if t in _VALUE_COLUMNS]
+    header_ratio = sum(1 for t in tokens if t in _HEADER_WORDS) / len(tokens)
+    if len(columns) < 2 or "max" not in columns or header_ratio < 0.6:
+        return None
+    return columns
+
+
+def _split_groups(columns: List[str]) -> Tuple[List[str], int]:
+    """반복되는 Min/Max 묶음(속도 등급별 컬럼 등)의 크기와 개수"""
+    size = len(columns)
+    for i in range(1, len(columns)):
+        if columns[i] == columns[0]:
+            size = i
+            break
+    return columns[:size], max(1, len(columns) // size)
+
+
+def _to_float(token: str) -> Optional[float]:
+    return float(token) if _NUMBER_RE.match(token) else None
+
+
+def _parse_row(line: str) -> Optional[Dict[str, Any]]:
+    """'라벨 값... 단위 비고' 형태의 행 분해"""
+    line = _TOLERANCE_RE.sub(" ", line.translate(_DASHES))
+    tokens = line.split()
+
+    unit_index = next(
+        (i for i, token in enumerate(tokens) if i > 0 and token.rstrip("*") in UNITS),
+        None
+    )
+    if unit_index is None:
+        return None
+
+    # 단위 앞쪽에서 값(숫자/빈칸 표시)을 거꾸로 수집
+    values: List[str] = []
+    i = unit_index - 1
+    while i >= 0 and (_NUMBER_RE.match(tokens[i]) or tokens[i] in _PLACEHOLDERS):
+        values.insert(0, tokens[i])
+        i -= 1
+
+    label_tokens = tokens[:i + 1]
+    if not label_tokens or not any(_NUMBER_RE.match(v) for v in values):
+        return None
+    # "1. VDD must be ..." 같은 주석 행 제외
+    if re.match(r"^\d+[.)]$", label_tokens[0]):
+        return None
+
+    return {
+        "label_tokens": label_tokens,
+        "values": values,
+        "unit": tokens[unit_index].rstrip("*"),
+        "notes": " ".join(tokens[unit_index + 1:]),
+    }
+
+
+def _split_label(label_tokens: List[str], symbol_first: Optional[bool]) -> Tuple[Optional[str], str]:
+    """라벨을 기호(VDD, tCK 등)와 설명으로 분리"""
+    def is_symbol(token: str) -> bool:
+        return bool(_SYMBOL_RE.match(token)) and (
+            any(c.isdigit() or c == "_" for c in token) or
+            sum(1 for c in token if c.isupper()) >= 2 or
+            (token[0] == "t" and any(c.isupper() for c in token[1:]))
+        )
+
+    if len(label_tokens) > 1:
+        candidates = [0, -1] if symbol_first is not False else [-1, 0]
+        for index in candidates:
+            if is_symbol(label_tokens[index]):
+                rest = label_tokens[1:] if index == 0 else label_tokens[:-1]
+                return label_tokens[index], " ".join(rest)
+    elif is_symbol(label_tokens[0]):
+        return label_tokens[0], label_tokens[0]
+
+    return None, " ".join(label_tokens)
+
+
+def parse_spec_tables(lines: List[List[str]]) -> List[Dict[str, Any]]:
+    """셀 목록으로 표현된 페이지 행들에서 사양 행 추출"""
+    specs: List[Dict[str, Any]] = []
+    header: Optional[List[str]] = None
+    group_columns: List[str] = []
+    group_count = 1
+    group_labels: List[str] = []
+    symbol_first: Optional[bool] = None
+    misses = 0
+
+    for index, cells in enumerate(lines):
+        text = " ".join(cell.strip() for cell in cells if cell.strip())
+        if not text:
+            continue
+
+        columns = _header_columns(cells)
+        if columns:
+            header = columns
+            group_columns, group_count = _split_groups(columns)
+            misses = 0
+
+            # 바로 위 행들에서 기호/파라미터 순서와 묶음 이름(DDR5-3200 등) 확인
+            group_labels = []
+            symbol_first = None
+            for previous in reversed(lines[max(0, index - 3):index]):
+                lowered = [c.strip().lower() for c in previous]
+                if "symbol" in lowered and "parameter" in lowered and symbol_first is None:
+                    symbol_first = lowered.index("symbol") < lowered.index("parameter")
+                if group_count > 1 and not group_labels and len(previous) == group_count:
+                    group_labels = [c.strip() for c in previous]
+            if "symbol" in text.lower() and "parameter" in text.lower():
+                lowered = text.lower()
+                symbol_first = lowered.index("symbol") < lowered.index("parameter")
+            continue
+
+        if header is None:
+            continue
+
+        if text.lower().startswith("note"):
+            header = None
+            continue
+
+        row = _parse_row(text)
+        if row is None:
+            misses += 1
+            if misses >= 4:
+                header = None
+            continue
+        misses = 0
+
+        symbol, description = _split_label(row["label_tokens"], symbol_first)
+        values = row["values"]
+
+        # 값 개수에 맞춰 묶음별로 나누기 (묶음마다 값 하나뿐이면 첫 컬럼에 배정)
+        if len(values) == len(group_columns) * group_count:
+            width = len(group_columns)
+        elif group_count > 1 and len(values) == group_count:
+            width = 1
+        else:
+            width = len(values)
+        groups = [values[i:i + width] for i in range(0, len(values), width)] or [values]
+
+        for group_index, group in enumerate(groups):
+            mapped: Dict[str, Optional[float]] = {"min": None, "typ": None, "max": None}
+            if width == len(group_columns):
+                for column, value in zip(group_columns, group):
+                    mapped[column] = _to_float(value)
+            elif len(group) == 1:
+                mapped[group_columns[0] if group_columns else "typ"] = _to_float(group[0])
+            else:
+                # 컬럼에 맞출 수 없으면 범위를 추측하지 않고 원문 표기만 저장
+                # (숫자가 마지막 값 하나뿐이면 최대값으로 간주: "- / - / 0.05")
+                numbers = [_to_float(x) for x in group]
+                present = [i for i, v in enumerate(numbers) if v is not None]
+                if present == [len(group) - 1]:
+                    mapped["max"] = numbers[-1]
+
+            conditions = []
+            if len(groups) > 1 and group_index < len(group_labels):
+                conditions.append(group_labels[group_index])
+            if row["notes"]:
+                conditions.append(f"notes: {row['notes']}")
+
+            # parameter_value는 원문 표기, 수치는 기준 단위로 저장 (mV → V 등)
+            base_unit, factor = normalize_unit(row["unit"])
+            scaled = {k: (round(v * factor, 12) if v is not None else None) for k, v in mapped.items()}
+
+            specs.append({
+                "parameter_name": f"{symbol} {description}".strip() if symbol and description != symbol else description,
+                "parameter_key": canonical_parameter(symbol, description),
+                "parameter_value": f"{' / '.join(group)} {row['unit']}",
+                "unit": base_unit,
+                "condition_text": "; ".join(conditions) or None,
+                "min_value": scaled["min"],
+                "typical_value": scaled["typ"],
+                "max_value": scaled["max"],
+            })
+
+    return specs
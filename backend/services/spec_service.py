@@ -0,0 +1,328 @@
+import re
+import time
+from typing import List, Dict, Any, Optional, Tuple
+from loguru import logger
+
+from sqlalchemy import select, func
+
+from .spec_parser import PARAMETER_VOCABULARY, canonical_parameter, normalize_value
+from .document_catalog import get_document_catalog
+from ..config.settings import settings
+from ..config.database import AsyncSessionLocal, Specification, Document
+from ..models.request_models import QueryRequest
+from ..models.response_models import QueryResponse, SourceInfo
+
+
+# 질문에서만 쓰이는 표현 (데이터시트 표기는 spec_parser.PARAMETER_VOCABULARY)
+QUERY_SYNONYMS: Dict[str, List[str]] = {
+    "vdd": ["동작 전압", "공급 전압", "전원 전압", "operating voltage", "supply voltage", "core voltage"],
+    "vddq": ["i/o 전압", "출력 전압", "io voltage"],
+    "vpp": ["활성 전압", "펌프 전압"],
+    "tck": ["클럭 주기", "클록 주기", "cycle time"],
+    "operating_temperature": ["동작 온도", "사용 온도", "온도 범위", "temperature range"],
+    "storage_temperature": ["보관 온도", "저장 온도"],
+    "data_rate": ["전송 속도", "데이터 속도", "속도 등급"],
+    "idd": ["동작 전류", "소비 전류"],
+    "power": ["소비 전력", "전력 소모"],
+}
+
+# 설명/비교가 필요한 질문은 LLM 경로로 보냄
+_EXPLANATION_RE = re.compile(
+    r"왜|어떻게|설명|차이|비교|영향|원리|why|how|explain|difference|compare",
+    re.IGNORECASE
+)
+# 사전에 없는 타이밍 기호 (tCIPW, tRFCsb, tCCD_L 등) - DDR5 같은 제품 표기는 제외
+_SYMBOL_TOKEN_RE = re.compile(r"(?<![A-Za-z0-9])t[A-Z][A-Z0-9]+(?:_?[A-Za-z0-9]+)?(?![A-Za-z0-9])")
+_PART_NUMBER_RE = re.compile(r"[A-Za-z0-9]+(?:-[A-Za-z0-9]+)*")
+
+# 질문당 표시할 최대 사양 행 수
+_MAX_ROWS = 12
+
+
+def _synonym_pattern(synonym: str) -> re.Pattern:
+    """단어 경계와 띄어쓰기 차이를 허용하는 패턴 (vdd가 vddq에 매칭되지 않도록)"""
+    body = r"\s*".join(re.escape(part) for part in synonym.split())
+    return re.compile(rf"(?<![a-z0-9]){body}(?![a-z0-9])", re.IGNORECASE)
+
+
+_PARAMETER_PATTERNS: List[Tuple[re.Pattern, str]] = [
+    (_synonym_pattern(synonym), key)
+    for vocabulary in (PARAMETER_VOCABULARY, QUERY_SYNONYMS)
+    for key, synonyms in vocabulary.items()
+    for synonym in synonyms
+]
+
+
+def _format_number(value: float) -> str:
+    return f"{value:g}"
+
+
+def format_spec_value(spec: Specification) -> str:
+    """Min/Typ/Max를 사람이 읽는 범위 표현으로 변환"""
+    unit = f" {spec.unit}" if spec.unit else ""
+    low, typ, high = spec.min_value, spec.typical_value, spec.max_value
+
+    if low is not None and high is not None:
+        text = f"{_format_number(low)} ~ {_format_number(high)}{unit}"
+        if typ is not None:
+            text += f" (typ {_format_number(typ)}{unit})"
+        return text
+    if typ is not None:
+        return f"{_format_number(typ)}{unit}"
+    if high is not None:
+        return f"최대 {_format_number(high)}{unit}"
+    if low is not None:
+        return f"최소 {_format_number(low)}{unit}"
+    return spec.parameter_value or "-"
+
+
+class SpecLookupService:
+    """사양 테이블 기반 고속 응답 서비스
+
+    질문에서 파라미터(VDD, tCK 등)와 제품을 인식하면 specifications 테이블의
+    인덱스 조회만으로 답변을 만들어 임베딩/벡터 검색/LLM 생성을 생략합니다.
+    구조화된 결과가 없으면 None을 반환하여 기존 RAG 경로로 넘깁니다.
+    """
+
+    def __init__(self):
+        self._part_index: List[Dict[str, Any]] = []
+        self._part_index_version: Optional[int] = None
+
+    def detect_parameters(self, question: str) -> List[str]:
+        """질문에 포함된 파라미터 표준 키 목록"""
+        keys: List[str] = []
+        for pattern, key in _PARAMETER_PATTERNS:
+            if key not in keys and pattern.search(question):
+                keys.append(key)
+        return keys
+
+    async def _load_part_index(self) -> List[Dict[str, Any]]:
+        """처리 완료 문서의 제품 모델/제품군 색인 (문서 카탈로그 버전이 바뀔 때만 재구성)"""
+        catalog = get_document_catalog()
+        await catalog.ensure_loaded()
+        if self._part_index_version != catalog.version:
+            self._part_index = [
+                {
+                    "document_id": entry.id,
+                    "document_name": entry.original_name,
+                    "product_model": (entry.product_model or "").lower(),
+                    "product_family": (entry.product_family or "").lower(),
+                }
+                for entry in catalog.documents("completed")
+            ]
+            self._part_index_version = catalog.version
+        return self._part_index
+
+    async def detect_documents(self, question: str,
+                               document_filter: Optional[Dict[str, Any]] = None) -> Optional[List[str]]:
+        """질문/필터에 언급된 제품의 문서 ID 목록 (언급이 없으면 None = 전체)"""
+        part_index = await self._load_part_index()
+        candidates = part_index
+
+        if document_filter:
+            for field in ("product_family", "product_model"):
+                value = document_filter.get(field)
+                if value:
+                    candidates = [d for d in candidates if d[field] == str(value).lower()]
+            if document_filter.get("document_id"):
+                candidates = [d for d in candidates if d["document_id"] == document_filter["document_id"]]
+
+        tokens = {token.lower() for token in _PART_NUMBER_RE.findall(question)}
+        by_model = [d for d in candidates if d["product_model"] and d["product_model"] in tokens]
+        if by_model:
+            return [d["document_id"] for d in by_model]
+
+        by_family = [d for d in candidates if d["product_family"] and d["product_family"] in tokens]
+        if by_family:
+            return [d["document_id"] for d in by_family]
+
+        if candidates is not part_index:
+            return [d["document_id"] for d in candidates]
+        return None
+
+    def resolve_parameter(self, parameter: str) -> str:
+        """파라미터 표기(VDD, 동작 전압, tCIPW 등)를 표준 키로 변환"""
+        keys = self.detect_parameters(parameter)
+        if keys:
+            return keys[0]
+        return canonical_parameter(parameter.strip(), parameter.strip())
+
+    async def search_specs(self,
+                           parameter: str,
+                           min_value: Optional[float] = None,
+                           max_value: Optional[float] = None,
+                           unit: Optional[str] = None,
+                           mode: str = "overlap",
+                           product_family: Optional[str] = None,
+                           product_model: Optional[str] = None,
+                           page: int = 1,
+                           limit: int = 50) -> Dict[str, Any]:
+        """파라미터 수치 범위 조건으로 전체 문서의 사양 행 조회
+
+        mode:
+        - overlap: 사양 범위가 조건 범위와 겹치는 행 (기본, "≥ 105℃"는 min_value만 지정)
+        - within: 사양 범위가 조건 범위 안에 완전히 포함되는 행
+        - contains: 사양 범위가 조건 범위 전체를 포함하는 행
+        """
+        parameter_key = self.resolve_parameter(parameter)
+        low, base_unit = normalize_value(min_value, unit)
+        high, _ = normalize_value(max_value, unit)
+
+        # 한쪽 값만 있는 행(최대값만 있는 행 등)은 그 값을 범위 양끝으로 간주
+        spec_low = func.coalesce(Specification.min_value, Specification.typical_value, Specification.max_value)
+        spec_high = func.coalesce(Specification.max_value, Specification.typical_value, Specification.min_value)
+
+        conditions = [Specification.parameter_key == parameter_key, spec_low.is_not(None)]
+        if base_unit:
+            conditions.append(Specification.unit == base_unit)
+
+        if mode == "within":
+            if low is not None:
+                conditions.append(spec_low >= low)
+            if high is not None:
+                conditions.append(spec_high <= high)
+        elif mode == "contains":
+            if low is not None:
+                conditions.append(spec_low <= low)
+            if high is not None:
+                conditions.append(spec_high >= high)
+        else:
+            if low is not None:
+                conditions.append(spec_high >= low)
+            if high is not None:
+                conditions.append(spec_low <= high)
+
+        # 처리 완료된 문서의 사양만 (삭제되었거나 처리 중/실패한 문서의 행 제외)
+        conditions.append(Document.processing_status == "completed")
+        if product_family:
+            conditions.append(Document.product_family == product_family)
+        if product_model:
+            conditions.append(Document.product_model == product_model)
+
+        async with AsyncSessionLocal() as session:
+            total = (await session.execute(
+                select(func.count(Specification.id))
+                .join(Document, Document.id == Specification.document_id)
+                .where(*conditions)
+            )).scalar() or 0
+
+            rows = (await session.execute(
+                select(
+                    Specification,
+                    Document.original_name, Document.product_model, Document.product_family
+                )
+                .join(Document, Document.id == Specification.document_id)
+                .where(*conditions)
+                .order_by(Specification.document_id, Specification.page_number, Specification.id)
+                .offset((page - 1) * limit)
+                .limit(limit)
+            )).all()
+
+        results = [
+            {
+                "document_id": spec.document_id,
+                "document_name": document_name or spec.document_id,
+                "product_model": product_model_value,
+                "product_family": product_family_value,
+                "parameter_name": spec.parameter_name,
+                "parameter_key": spec.parameter_key,
+                "parameter_value": spec.parameter_value,
+                "unit": spec.unit,
+                "min_value": spec.min_value,
+                "typical_value": spec.typical_value,
+                "max_value": spec.max_value,
+                "condition_text": spec.condition_text,
+                "page_number": spec.page_number,
+            }
+            for spec, document_name, product_model_value, product_family_value in rows
+        ]
+
+        return {
+            "parameter_key": parameter_key,
+            "unit": base_unit,
+            "mode": mode,
+            "results": results,
+            "total": total,
+            "page": page,
+            "limit": limit,
+            "total_pages": (total + limit - 1) // limit,
+        }
+
+    async def answer(self, request: QueryRequest) -> Optional[QueryResponse]:
+        """사양 테이블로 답변 가능하면 QueryResponse, 아니면 None"""
+        start_time = time.time()
+        question = request.question
+
+        if _EXPLANATION_RE.search(question):
+            return None
+
+        parameter_keys = self.detect_parameters(question)
+        # 사전에 없는 기호(tCIPW 등)는 표준 키 인덱스에 직접 조회
+        symbol_keys = [t.lower() for t in _SYMBOL_TOKEN_RE.findall(question)]
+        if not parameter_keys and not symbol_keys:
+            return None
+
+        # 제품/부품 번호나 문서 필터로 문서가 특정되지 않으면 여러 데이터시트 값이 섞이므로 RAG 경로로
+        document_ids = await self.detect_documents(question, request.document_filter)
+        if not document_ids:
+            return None
+
+        async with AsyncSessionLocal() as session:
+            query = select(Specification).where(
+                Specification.parameter_key.in_(parameter_keys or symbol_keys),
+                Specification.document_id.in_(document_ids)
+            )
+            query = query.order_by(Specification.document_id, Specification.page_number, Specification.id)
+            specs = (await session.execute(query.limit(_MAX_ROWS + 1))).scalars().all()
+
+        if not specs:
+            return None
+
+        names = {d["document_id"]: d["document_name"] for d in await self._load_part_index()}
+        lines: List[str] = []
+        sources: List[SourceInfo] = []
+        seen_sources = set()
+
+        for spec in specs[:_MAX_ROWS]:
+            document_name = names.get(spec.document_id, spec.document_id)
+            line = f"• {spec.parameter_name}: {format_spec_value(spec)}"
+            if spec.condition_text:
+                line += f" [{spec.condition_text}]"
+            line += f" ({document_name} p.{spec.page_number})"
+            lines.append(line)
+
+            source_key = (spec.document_id, spec.page_number)
+            if source_key not in seen_sources:
+                seen_sources.add(source_key)
+                sources.append(SourceInfo(
+                    document_id=spec.document_id,
+                    document_name=document_name,
+                    page_number=spec.page_number,
+                    section=None,
+                    relevance_score=1.0,
+                    content_preview=f"{spec.parameter_name}: {spec.parameter_value}"[:250]
+                ))
+
+        if len(specs) > _MAX_ROWS:
+            lines.append("• 추가 조건별 값이 더 있습니다. 제품 모델이나 조건을 지정하면 범위를 좁힐 수 있습니다.")
+
+        logger.info(f"⚡ 사양 테이블 응답: {len(lines)}행 ({', '.join(parameter_keys or symbol_keys)})")
+
+        return QueryResponse(
+            answer="\n".join(lines),
+            confidence=settings.spec_fast_path_confidence,
+            sources=sources,
+            query_time_ms=int((time.time() - start_time) * 1000),
+            model_used="spec-table"
+        )
+
+
+# 싱글톤 인스턴스
+_spec_service_instance: Optional[SpecLookupService] = None
+
+async def get_spec_service() -> SpecLookupService:
+    """사양 조회 서비스 인스턴스 반환"""
+    global _spec_service_instance
+    if _spec_service_instance is None:
+        _spec_service_instance = SpecLookupService()
+    return _spec_service_instance
@@ -0,0 +1,116 @@
+"""문서 구조(섹션 제목) 감지
+
+하나로 합친 정규식과 글꼴 크기/행 위치 휴리스틱으로 제목 행을 한 번의 순회로 찾습니다.
+PDF 추출 워커 프로세스에서도 사용되므로 표준 라이브러리만 사용합니다.
+"""
+import re
+from typing import List, Dict, Any, Optional
+
+
+# 번호 제목 / 대문자 제목 / 데이터시트 공통 제목을 하나의 패턴으로 결합
+HEADING_RE = re.compile(
+    r"^[ \t]*(?:"
+    r"(?P<number>\d{1,2}(?:\.\d{1,2}){0,3})\.?[ \t]+(?P<numbered>[A-Za-z][^\n]{2,80}?)"
+    r"|(?P<upper>[A-Z][A-Z0-9 &/,()\-]{9,80})"
+    r"|(?P<keyword>(?i:introduction|abstract|conclusion|references?|specifications?|features?|overview|"
+    r"description|revision history|ordering information|key parameters|pin (?:configuration|description|assignment)s?|"
+    r"block diagram|absolute maximum[^\n]{0,60}|electrical characteristics[^\n]{0,60}|"
+    r"ac (?:&|and) dc[^\n]{0,60}|package[^\n]{0,60}|mechanical[^\n]{0,60}))"
+    r")[ \t]*$",
+    re.MULTILINE
+)
+
+# 캡션/머리말/꼬리말 등 제목이 아닌 행
+_NOT_HEADING_RE = re.compile(r"^(?:figure|fig\.|table|rev\.|note|page)\b", re.IGNORECASE)
+_NUMBER_TOKEN_RE = re.compile(r"^[-+]?\d+(?:[.,]\d+)*%?$")
+
+SECTION_TYPES = [
+    ("environmental", re.compile(r"temperature|thermal|environment|reliability|humidity|온도|환경", re.IGNORECASE)),
+    ("electrical", re.compile(
+        r"electrical|\bac\b|\bdc\b|voltage|current|timing|idd|power|jitter|input|output|signal|"
+        r"operating condition|measurement|absolute maximum|전압|전류|타이밍|전기", re.IGNORECASE)),
+    ("mechanical", re.compile(r"package|mechanical|dimension|pin|ball|outline|block diagram|치수|외형|핀", re.IGNORECASE)),
+    ("specifications", re.compile(r"specification|ordering|part number|key parameter|address|사양|주문", re.IGNORECASE)),
+    ("overview", re.compile(r"overview|introduction|description|feature|general|revision|개요|특징|소개", re.IGNORECASE)),
+]
+
+# 본문 대비 글꼴 배율: 이 이상이면 제목, 패턴과 함께라면 더 작은 배율도 허용
+_HEADING_FONT_RATIO = 1.2
+_PATTERN_FONT_RATIO = 1.1
+# 왼쪽 여백에서 이 거리(pt) 안에서 시작하는 행만 제목 후보
+_MARGIN_TOLERANCE = 15.0
+
+
+def classify_section(title: str) -> str:
+    """제목으로 섹션 유형 분류 (overview, specifications, electrical, mechanical, environmental, other)"""
+    for section_type, pattern in SECTION_TYPES:
+        if pattern.search(title):
+            return section_type
+    return "other"
+
+
+def _heading_level(match: Optional[re.Match]) -> int:
+    if match and match.group("number"):
+        return match.group("number").count(".") + 1
+    return 1
+
+
+def _looks_like_title(text: str) -> bool:
+    tokens = text.split()
+    if not 1 <= len(tokens) <= 12 or len(text) > 90:
+        return False
+    if text.endswith((".", ",", ";")) or _NOT_HEADING_RE.match(text):
+        return False
+    if sum(1 for c in text if c.isalpha()) < 3:
+        return False
+    return sum(1 for t in tokens if _NUMBER_TOKEN_RE.match(t)) <= len(tokens) // 2
+
+
+def detect_headings(lines: List[Dict[str, Any]]) -> List[Dict[str, Any]]:
+    """좌표/글꼴 정보가 있는 페이지 행에서 제목 행 감지
+
+    lines: {"text", "size", "x"} 목록 (위→아래 순서)
+    """
+    sizes: List[float] = []
+    for line in lines:
+        sizes.extend([line["size"]] * len(line["text"]))
+    if not sizes:
+        return []
+    sizes.sort()
+    body_size = sizes[len(sizes) // 2] or 1.0
+
+    starts = sorted(line["x"] for line in lines)
+    margin = starts[len(starts) // 10]
+
+    headings = []
+    for line in lines:
+        text = line["text"].strip()
+        if abs(line["x"] - margin) > _MARGIN_TOLERANCE or not _looks_like_title(text):
+            continue
+
+        ratio = line["size"] / body_size
+        match = HEADING_RE.match(text)
+        if ratio >= _HEADING_FONT_RATIO or (match and ratio >= _PATTERN_FONT_RATIO):
+            headings.append({
+                "title": text,
+                "level": _heading_level(match),
+                "section_type": classify_section(text),
+            })
+
+    return headings
+
+
+def detect_structure(text: str) -> List[Dict[str, Any]]:
+    """글꼴 정보가 없는 일반 텍스트에서 한 번의 순회로 제목 감지"""
+    headings = []
+    for match in HEADING_RE.finditer(text):
+        title = match.group(0).strip()
+        if not _looks_like_title(title):
+            continue
+        headings.append({
+            "title": title,
+            "level": _heading_level(match),
+            "section_type": classify_section(title),
+            "start_pos": match.start(),
+        })
+    return headings
@@ -1,8 +1,11 @@
 import os
+import uuid
 import traceback
 import pickle
 import asyncio
+import time
 import numpy as np
+from contextlib import contextmanager
 from pathlib import Path
 from typing import List, Dict, Any, Optional, Tuple
 from concurrent.futures import ThreadPoolExecutor
@@ -16,12 +19,40 @@ except ImportError:
     faiss = None
     SentenceTransformer = None
 
+try:
+    import fcntl
+except ImportError:
+    fcntl = None
+
 from langchain.docstore.document import Document
 from langchain_community.vectorstores import FAISS
 from langchain_community.embeddings import OllamaEmbeddings
 
 from ..config.settings import settings
 from ..config.database import AsyncSessionLocal, VectorChunk
+from .metrics import EMBEDDING_BATCH_SIZE, FAISS_SEARCH_SECONDS, INDEX_VECTORS
+
+
+# 검색 전에 후보 벡터를 좁힐 수 있는 메타데이터 키 (섹션/문서 범위 검색)
+SCOPE_KEYS = ("document_id", "section_type", "section_id")
+
+
+@contextmanager
+def _index_file_lock(index_path: Path):
+    """프로세스 간 인덱스 파일 잠금 (API 서버와 외부 워커가 같은 인덱스를 읽고 씀)
+
+    fcntl이 없는 환경(Windows)에서는 프로세스 내 _write_lock만 적용됩니다.
+    """
+    if fcntl is None:
+        yield
+        return
+    index_path.mkdir(parents=True, exist_ok=True)
+    with open(index_path / ".lock", "a") as handle:
+        fcntl.flock(handle, fcntl.LOCK_EX)
+        try:
+            yield
+        finally:
+            fcntl.flock(handle, fcntl.LOCK_UN)
 
 
 class VectorSearchService:
@@ -39,6 +70,16 @@ class VectorSearchService:
         self._metadata_store = {}
 
         self.executor = ThreadPoolExecutor(max_workers=4)
+        # 인덱스 변경(추가/저장)은 한 번에 하나씩만 수행
+        self._write_lock = asyncio.Lock()
+        # 메모리 인덱스와 일치하는 디스크 인덱스 파일의 수정 시각
+        self._loaded_mtime: Optional[float] = None
+        # 마지막 저장 이후의 메모리 인덱스 변경 ("add"/"delete"), 디스크 인덱스를 다시 읽으면 재적용
+        self._unsaved_changes: List[Tuple] = []
+        # 범위 검색용 역색인: 키 → 값 → FAISS 위치 목록 (None이면 다음 검색 때 재구성)
+        self._scope_index: Optional[Dict[str, Dict[Any, List[int]]]] = None
+        # 인덱스 내용이 바뀔 때마다 증가 (응답 캐시 무효화 기준)
+        self.index_version = 0
 
     @property
     def embedding_model(self):
@@ -55,8 +96,9 @@ class VectorSearchService:
                 raise
         return self._embedding_model
 
-    async def create_index_from_documents(self, documents: List[Document], index_name: str = "default") -> bool:
-        """문서들로부터 벡터 인덱스 생성"""
+    async def create_index_from_documents(self, documents: List[Document], index_name: str = "default",
+                                          save_metadata: bool = True) -> bool:
+        """문서들로부터 벡터 인덱스 생성 (save_metadata=False면 청크 행은 기록하지 않음)"""
         try:
             if not documents:
                 logger.warning("생성할 문서가 없습니다.")
@@ -72,23 +114,19 @@ class VectorSearchService:
                 self.embedding_model
             )
 
-            # 인덱스 저장
-            index_path = self.vector_db_path / index_name
-            index_path.mkdir(parents=True, exist_ok=True)
-
-            def save_vectorstore():
-                return vectorstore.save_local(str(index_path))
-
-            await asyncio.get_event_loop().run_in_executor(
-                self.executor,
-                save_vectorstore
-            )
-
-            self._faiss_index = vectorstore
-            logger.info(f"벡터 인덱스 생성 및 저장 완료: {index_path}")
+            # 인덱스 교체 및 저장 (전체 재구성이므로 디스크 인덱스와 병합하지 않음)
+            async with self._write_lock:
+                self._faiss_index = vectorstore
+                self._scope_index = None
+                self._unsaved_changes = []
+                await self._persist_index(index_name, merge=False)
+                self._index_changed()
+            logger.info(f"벡터 인덱스 생성 및 저장 완료: {self.vector_db_path / index_name}")
 
             # 메타데이터를 데이터베이스에 저장
-            await self._save_chunk_metadata(documents, index_name)
+            if save_metadata:
+                docstore_ids = [vectorstore.index_to_docstore_id[i] for i in range(len(documents))]
+                await self.save_chunk_rows(self.chunk_metadata_rows(documents, docstore_ids))
 
             return True
 
@@ -114,11 +152,20 @@ class VectorSearchService:
                 allow_dangerous_deserialization=True
             )
 
+            def load_locked():
+                # 다른 프로세스가 저장 중인 파일을 읽지 않도록 파일 잠금 안에서 로드
+                with _index_file_lock(index_path):
+                    return (index_path / "index.faiss").stat().st_mtime, load_with_args()
+
             # 비동기 실행
-            self._faiss_index = await asyncio.get_event_loop().run_in_executor(
+            mtime, self._faiss_index = await asyncio.get_event_loop().run_in_executor(
                 self.executor,
-                load_with_args
+                load_locked
             )
+            self._scope_index = None
+            self._unsaved_changes = []
+            self._index_changed()
+            self._loaded_mtime = mtime
 
             logger.info(f"벡터 인덱스 로드 완료: {index_path}")
             return True
@@ -138,43 +185,213 @@ class VectorSearchService:
             if not self._faiss_index:
                 return await self.create_index_from_documents(documents, index_name)
 
-            # 기존 인덱스에 문서 추가
-            await asyncio.get_event_loop().run_in_executor(
-                self.executor,
-                self._faiss_index.add_documents,
-                documents
-            )
-
-            # 인덱스 저장
-            index_path = self.vector_db_path / index_name
+            # 임베딩 후 인덱스 추가/저장은 다른 쓰기 경로와 같은 잠금과 디스크 동기화를 거침
+            embeddings = await self.embed_documents([doc.page_content for doc in documents])
+            return await self.add_embedded_documents(documents, embeddings, index_name)
 
-            def save_faiss_index():
-                return self._faiss_index.save_local(str(index_path))
+        except Exception as e:
+            logger.error(f"문서 추가 실패: {e}")
+            return False
 
-            await asyncio.get_event_loop().run_in_executor(
+    async def embed_documents(self, texts: List[str]) -> List[List[float]]:
+        """문서 텍스트 배치 임베딩"""
+        EMBEDDING_BATCH_SIZE.observe(len(texts))
+        return await asyncio.get_event_loop().run_in_executor(
+            self.executor,
+            self.embedding_model.embed_documents,
+            texts
+        )
+
+    async def embed_query(self, query: str, timeout: float = 10.0) -> List[float]:
+        """질의 임베딩 (검색과 응답 캐시가 같은 벡터를 공유)"""
+        return await asyncio.wait_for(
+            asyncio.get_event_loop().run_in_executor(
                 self.executor,
-                save_faiss_index
-            )
+                self.embedding_model.embed_query,
+                query
+            ),
+            timeout=timeout
+        )
+
+    async def add_embedded_documents(
+        self,
+        documents: List[Document],
+        embeddings: List[List[float]],
+        index_name: str = "default",
+        persist: bool = True,
+        ids: Optional[List[str]] = None,
+        save_metadata: bool = True
+    ) -> bool:
+        """미리 계산된 임베딩으로 인덱스에 문서 추가 (persist=False면 메모리 인덱스만 갱신)
+
+        documents는 page_content/metadata 속성만 사용하므로 청커의 TextChunk도 그대로 받습니다.
+        ids는 docstore id (청크 행의 chunk_embedding_id), save_metadata=False면 청크 행은
+        호출 측에서 chunk_metadata_rows/save_chunk_rows로 모아서 기록합니다.
+        """
+        try:
+            ids = ids or [str(uuid.uuid4()) for _ in documents]
+
+            async with self._write_lock:
+                # 다른 프로세스가 저장한 인덱스에 추가해야 그 변경을 덮어쓰지 않음
+                await self._sync_with_disk(index_name)
+                await self._add_embeddings_locked(documents, embeddings, ids)
+                self._index_changed()
+
+                if persist:
+                    await self._persist_index(index_name)
 
             # 메타데이터 저장
-            await self._save_chunk_metadata(documents, index_name)
+            if save_metadata:
+                await self.save_chunk_rows(self.chunk_metadata_rows(documents, ids))
 
             logger.info(f"{len(documents)}개 문서가 인덱스에 추가됨")
             return True
 
         except Exception as e:
-            logger.error(f"문서 추가 실패: {e}")
+            logger.error(f"임베딩 문서 추가 실패: {e}")
             return False
 
+    async def _add_embeddings_locked(self, documents: List[Document], embeddings: List[List[float]],
+                                     ids: List[str]):
+        """메모리 인덱스에 임베딩 추가 (호출 측에서 _write_lock 보유)"""
+        import functools
+
+        text_embeddings = [
+            (doc.page_content, embedding) for doc, embedding in zip(documents, embeddings)
+        ]
+        metadatas = [doc.metadata for doc in documents]
+        loop = asyncio.get_event_loop()
+
+        start_position = self._faiss_index.index.ntotal if self._faiss_index else 0
+        if not self._faiss_index:
+            self._faiss_index = await loop.run_in_executor(
+                self.executor,
+                functools.partial(
+                    FAISS.from_embeddings,
+                    text_embeddings,
+                    self.embedding_model,
+                    metadatas=metadatas,
+                    ids=ids
+                )
+            )
+        else:
+            await loop.run_in_executor(
+                self.executor,
+                functools.partial(
+                    self._faiss_index.add_embeddings,
+                    text_embeddings,
+                    metadatas=metadatas,
+                    ids=ids
+                )
+            )
+
+        self._unsaved_changes.append(("add", text_embeddings, metadatas, ids))
+        self._extend_scope_index(start_position, metadatas)
+
+    async def save_index(self, index_name: str = "default") -> bool:
+        """메모리의 인덱스를 디스크에 저장"""
+        try:
+            async with self._write_lock:
+                if not self._faiss_index:
+                    return False
+                await self._persist_index(index_name)
+            return True
+        except Exception as e:
+            logger.error(f"인덱스 저장 실패: {e}")
+            return False
+
+    async def _persist_index(self, index_name: str, merge: bool = True):
+        """인덱스 파일 쓰기 (호출 측에서 _write_lock 보유)
+
+        파일 잠금 안에서 디스크 인덱스가 더 새로우면 먼저 다시 읽고 저장하지 않은 변경을 재적용하므로
+        다른 프로세스가 그 사이 저장한 변경을 덮어쓰지 않습니다. merge=False는 전체 재구성용입니다.
+        """
+        index_path = self.vector_db_path / index_name
+
+        def persist_locked() -> bool:
+            with _index_file_lock(index_path):
+                reloaded = merge and self._load_newer_from_disk(index_name)
+                self._faiss_index.save_local(str(index_path))
+                self._loaded_mtime = (index_path / "index.faiss").stat().st_mtime
+                self._unsaved_changes = []
+                return reloaded
+
+        if await asyncio.get_event_loop().run_in_executor(self.executor, persist_locked):
+            self._index_changed()
+
+    def _load_newer_from_disk(self, index_name: str) -> bool:
+        """디스크 인덱스가 메모리 인덱스보다 새로우면 다시 읽고 저장하지 않은 변경을 재적용
+
+        실행기 스레드에서 _write_lock과 파일 잠금을 보유한 채 호출합니다. 다시 읽었으면 True.
+        """
+        index_path = self.vector_db_path / index_name
+        try:
+            mtime = (index_path / "index.faiss").stat().st_mtime
+        except FileNotFoundError:
+            return False
+        if self._loaded_mtime is not None and mtime <= self._loaded_mtime:
+            return False
+
+        index = FAISS.load_local(str(index_path), self.embedding_model, allow_dangerous_deserialization=True)
+        for change in self._unsaved_changes:
+            if change[0] == "add":
+                _, text_embeddings, metadatas, ids = change
+                index.add_embeddings(text_embeddings, metadatas=metadatas, ids=ids)
+            else:
+                present = set(index.index_to_docstore_id.values())
+                docstore_ids = [docstore_id for docstore_id in change[1] if docstore_id in present]
+                if docstore_ids:
+                    index.delete(docstore_ids)
+
+        self._faiss_index = index
+        self._scope_index = None
+        self._loaded_mtime = mtime
+        logger.info(f"디스크 벡터 인덱스가 갱신되어 다시 로드 (저장 전 변경 {len(self._unsaved_changes)}건 재적용)")
+        return True
+
+    async def _sync_with_disk(self, index_name: str = "default"):
+        """다른 프로세스가 디스크 인덱스를 갱신했으면 다시 로드 (호출 측에서 _write_lock 보유)"""
+        index_path = self.vector_db_path / index_name
+
+        def sync_locked() -> bool:
+            with _index_file_lock(index_path):
+                return self._load_newer_from_disk(index_name)
+
+        try:
+            mtime = (index_path / "index.faiss").stat().st_mtime
+        except FileNotFoundError:
+            return
+        if self._loaded_mtime is not None and mtime <= self._loaded_mtime:
+            return
+
+        if await asyncio.get_event_loop().run_in_executor(self.executor, sync_locked):
+            self._index_changed()
+
+    async def _reload_if_stale(self, index_name: str = "default"):
+        """외부 워커 프로세스가 디스크 인덱스를 갱신했으면 다시 로드"""
+        if self._loaded_mtime is None or self._write_lock.locked():
+            return
+
+        async with self._write_lock:
+            await self._sync_with_disk(index_name)
+
+    async def current_version(self, index_name: str = "default") -> int:
+        """디스크 인덱스가 갱신되었으면 다시 로드한 뒤 인덱스 버전 반환"""
+        await self._reload_if_stale(index_name)
+        return self.index_version
+
     async def search(self,
                     query: str,
                     top_k: int = 5,
                     score_threshold: float = 0.0,
-                    filter_metadata: Dict[str, Any] = None) -> List[Dict[str, Any]]:
-        """유사도 검색"""
+                    filter_metadata: Dict[str, Any] = None,
+                    query_embedding: Optional[List[float]] = None) -> List[Dict[str, Any]]:
+        """유사도 검색 (query_embedding을 주면 질의 임베딩을 다시 계산하지 않음)"""
         try:
             logger.info(f"벡터 검색 시작 - 쿼리: {query[:50]}...")
 
+            await self._reload_if_stale()
+
             if not self._faiss_index:
                 logger.warning("로드된 벡터 인덱스가 없습니다. 다시 로드를 시도합니다.")
                 try:
@@ -194,38 +411,43 @@ class VectorSearchService:
             logger.info(f"FAISS 인덱스 상태: {self._faiss_index is not None}")
             logger.info(f"검색 매개변수 - 쿼리 길이: {len(query)}, top_k: {top_k}")
 
-            # 임베딩 생성 테스트 (더 짧은 타임아웃)
-            try:
-                logger.info("임베딩 생성 테스트 중...")
-                def embed_with_timeout():
-                    return self.embedding_model.embed_query(query[:50])  # 더 짧게 테스트
+            # 질의 임베딩은 한 번만 계산해서 전체/범위 검색에 그대로 사용
+            if query_embedding is None:
+                try:
+                    query_embedding = await self.embed_query(query)
+                except asyncio.TimeoutError:
+                    logger.error("임베딩 생성 타임아웃 - 벡터 검색 건너뛰기")
+                    return []
+                except Exception as e:
+                    logger.error(f"임베딩 생성 실패: {e}")
+                    return []
 
-                test_embedding = await asyncio.wait_for(
+            # 유사도 검색 실행
+            logger.info("FAISS 유사도 검색 시작...")
+            search_start = time.perf_counter()
+            if filter_metadata and faiss is not None and all(key in SCOPE_KEYS for key in filter_metadata):
+                # 섹션/문서 범위 검색: 해당 범위의 벡터만 후보로 검색
+                results = await asyncio.wait_for(
+                    self._scoped_search(query_embedding, top_k, filter_metadata),
+                    timeout=30.0
+                )
+                FAISS_SEARCH_SECONDS.labels("scoped").observe(time.perf_counter() - search_start)
+            else:
+                import functools
+                results = await asyncio.wait_for(
                     asyncio.get_event_loop().run_in_executor(
                         self.executor,
-                        embed_with_timeout
+                        functools.partial(
+                            self._faiss_index.similarity_search_with_score_by_vector,
+                            query_embedding,
+                            top_k,
+                            filter=filter_metadata or None,
+                            fetch_k=max(20, top_k * 4)
+                        )
                     ),
-                    timeout=5.0  # 5초로 단축
+                    timeout=30.0
                 )
-                logger.info(f"임베딩 생성 성공 - 차원: {len(test_embedding)}")
-            except asyncio.TimeoutError:
-                logger.error("임베딩 생성 타임아웃 (5초) - 벡터 검색 건너뛰기")
-                return []
-            except Exception as e:
-                logger.error(f"임베딩 생성 실패: {e}")
-                return []
-
-            # 유사도 검색 실행
-            logger.info("FAISS 유사도 검색 시작...")
-            results = await asyncio.wait_for(
-                asyncio.get_event_loop().run_in_executor(
-                    self.executor,
-                    self._faiss_index.similarity_search_with_score,
-                    query,
-                    top_k
-                ),
-                timeout=30.0
-            )
+                FAISS_SEARCH_SECONDS.labels("full").observe(time.perf_counter() - search_start)
             logger.info(f"FAISS 검색 완료 - {len(results)}개 결과")
 
             # 결과 변환
@@ -252,6 +474,181 @@ class VectorSearchService:
             logger.error(f"검색 실패: {e}")
             return []
 
+    def _index_changed(self):
+        """인덱스 변경 반영 (응답 캐시 무효화용 버전 증가, 벡터 수 지표 갱신)"""
+        self.index_version += 1
+        INDEX_VECTORS.set(self._faiss_index.index.ntotal if self._faiss_index else 0)
+
+    def _extend_scope_index(self, start_position: int, metadatas: List[Dict[str, Any]]):
+        """새로 추가된 벡터를 범위 검색 역색인에 반영"""
+        if self._scope_index is None:
+            return
+        for offset, metadata in enumerate(metadatas):
+            for key in SCOPE_KEYS:
+                value = metadata.get(key)
+                if value is not None:
+                    self._scope_index.setdefault(key, {}).setdefault(value, []).append(start_position + offset)
+
+    def _build_scope_index(self):
+        """docstore 메타데이터로 범위 검색 역색인 재구성"""
+        self._scope_index = {}
+        docstore = self._faiss_index.docstore
+        positions = sorted(self._faiss_index.index_to_docstore_id.items())
+        for position, docstore_id in positions:
+            doc = docstore.search(docstore_id)
+            if isinstance(doc, Document):
+                self._extend_scope_index(position, [doc.metadata])
+
+    async def _scoped_search(self, embedding: List[float], top_k: int,
+                             filter_metadata: Dict[str, Any]) -> List[Tuple[Document, float]]:
+        """필터 범위에 속한 FAISS 위치만 대상으로 검색 (IDSelector)
+
+        삭제는 FAISS 위치를 당기고 역색인을 비우므로, 후보 계산부터 결과 매핑까지 _write_lock을 보유합니다.
+        """
+        loop = asyncio.get_event_loop()
+        async with self._write_lock:
+            faiss_index = self._faiss_index
+            if faiss_index is None:
+                return []
+            if self._scope_index is None:
+                await loop.run_in_executor(self.executor, self._build_scope_index)
+            scope_index = self._scope_index
+
+            candidates: Optional[set] = None
+            for key, expected in filter_metadata.items():
+                values = expected if isinstance(expected, list) else [expected]
+                matched = set()
+                for value in values:
+                    matched.update(scope_index.get(key, {}).get(value, ()))
+                candidates = matched if candidates is None else candidates & matched
+
+            if not candidates:
+                return []
+
+            def run_search():
+                selector = faiss.IDSelectorBatch(np.array(sorted(candidates), dtype="int64"))
+                return faiss_index.index.search(
+                    np.array([embedding], dtype="float32"),
+                    min(top_k, len(candidates)),
+                    params=faiss.SearchParameters(sel=selector)
+                )
+
+            distances, positions = await loop.run_in_executor(self.executor, run_search)
+
+            results = []
+            for distance, position in zip(distances[0], positions[0]):
+                if position < 0:
+                    continue
+                docstore_id = faiss_index.index_to_docstore_id.get(int(position))
+                doc = faiss_index.docstore.search(docstore_id) if docstore_id else None
+                if isinstance(doc, Document):
+                    results.append((doc, float(distance)))
+
+        logger.info(f"범위 검색: 후보 {len(candidates)}개 중 {len(results)}개 결과")
+        return results
+
+    async def get_document_vectors(self, document_id: str) -> Dict[int, Dict[str, List[float]]]:
+        """문서의 저장된 청크 벡터를 페이지별 {청크 텍스트: 벡터}로 반환 (개정판 재사용용)"""
+        if not self._faiss_index:
+            return {}
+
+        loop = asyncio.get_event_loop()
+        # 삭제가 FAISS 위치를 당기지 않도록 위치 조회부터 벡터 복원까지 _write_lock 보유
+        async with self._write_lock:
+            faiss_index = self._faiss_index
+            if faiss_index is None:
+                return {}
+            if self._scope_index is None:
+                await loop.run_in_executor(self.executor, self._build_scope_index)
+
+            positions = self._scope_index.get("document_id", {}).get(document_id, [])
+            if not positions:
+                return {}
+
+            def collect():
+                pages: Dict[int, Dict[str, List[float]]] = {}
+                for position in positions:
+                    docstore_id = faiss_index.index_to_docstore_id.get(position)
+                    doc = faiss_index.docstore.search(docstore_id) if docstore_id else None
+                    if not isinstance(doc, Document):
+                        continue
+                    page_number = doc.metadata.get("page_number")
+                    vector = faiss_index.index.reconstruct(position).tolist()
+                    pages.setdefault(page_number, {})[doc.page_content] = vector
+                return pages
+
+            return await loop.run_in_executor(self.executor, collect)
+
+    async def delete_document_vectors(self, document_id: str, index_name: str = "default") -> int:
+        """문서의 청크 벡터를 메모리 인덱스와 청크 메타데이터에서 제거하고 제거한 수 반환
+
+        디스크 인덱스 저장은 호출 측에서 save_index로 수행합니다.
+        """
+        async with self._write_lock:
+            # 다른 프로세스가 추가한 벡터까지 지우고, 저장 시 그 변경을 덮어쓰지 않도록 먼저 동기화
+            await self._sync_with_disk(index_name)
+            removed = await self._delete_vectors_locked(document_id)
+        # 벡터가 없던 문서라도 캐시된 응답의 출처가 될 수 있으므로 항상 증가
+        self._index_changed()
+
+        async with AsyncSessionLocal() as session:
+            from sqlalchemy import delete
+            await session.execute(delete(VectorChunk).where(VectorChunk.document_id == document_id))
+            await session.commit()
+
+        logger.info(f"문서 벡터 {removed}개 제거: {document_id}")
+        return removed
+
+    async def _delete_vectors_locked(self, document_id: str) -> int:
+        """메모리 인덱스에서 문서의 벡터를 제거하고 제거한 수 반환 (호출 측에서 _write_lock 보유)"""
+        if not self._faiss_index:
+            return 0
+
+        loop = asyncio.get_event_loop()
+        if self._scope_index is None:
+            await loop.run_in_executor(self.executor, self._build_scope_index)
+
+        positions = self._scope_index.get("document_id", {}).get(document_id, [])
+        docstore_ids = [
+            self._faiss_index.index_to_docstore_id[position]
+            for position in positions
+            if position in self._faiss_index.index_to_docstore_id
+        ]
+        if not docstore_ids:
+            return 0
+
+        await loop.run_in_executor(self.executor, self._faiss_index.delete, docstore_ids)
+        self._unsaved_changes.append(("delete", docstore_ids))
+        # 삭제 후 FAISS 위치가 당겨지므로 역색인은 다음 검색 때 재구성
+        self._scope_index = None
+        return len(docstore_ids)
+
+    async def replace_document_vectors(self, document_id: str, documents: List[Document],
+                                       embeddings: List[List[float]], ids: List[str],
+                                       index_name: str = "default") -> int:
+        """문서의 벡터와 청크 행을 새 청크로 교체하고 인덱스 저장 (재청킹용), 제거한 기존 벡터 수 반환
+
+        기존 벡터 삭제와 새 벡터 추가를 한 _write_lock 구간에서 수행하므로
+        교체 중에도 검색에서 문서가 비어 보이지 않습니다.
+        """
+        async with self._write_lock:
+            await self._sync_with_disk(index_name)
+            removed = await self._delete_vectors_locked(document_id)
+            if documents:
+                await self._add_embeddings_locked(documents, embeddings, ids)
+            self._index_changed()
+            await self._persist_index(index_name)
+
+        async with AsyncSessionLocal() as session:
+            from sqlalchemy import delete, insert
+            await session.execute(delete(VectorChunk).where(VectorChunk.document_id == document_id))
+            if documents:
+                await session.execute(insert(VectorChunk), self.chunk_metadata_rows(documents, ids))
+            await session.commit()
+
+        logger.info(f"문서 벡터 교체: {document_id} (기존 {removed}개 → {len(documents)}개)")
+        return removed
+
     async def search_with_mmr(self,
                              query: str,
                              top_k: int = 5,
@@ -334,6 +731,8 @@ class VectorSearchService:
                 # 메모리에서도 제거
                 if self._faiss_index:
                     self._faiss_index = None
+                self._scope_index = None
+                self._index_changed()
 
                 return True
             else:
@@ -344,27 +743,32 @@ class VectorSearchService:
             logger.error(f"인덱스 삭제 실패: {e}")
             return False
 
-    async def _save_chunk_metadata(self, documents: List[Document], index_name: str):
-        """청크 메타데이터를 데이터베이스에 저장"""
-        try:
-            async with AsyncSessionLocal() as session:
-                for i, doc in enumerate(documents):
-                    chunk = VectorChunk(
-                        document_id=doc.metadata.get("document_id"),
-                        chunk_index=i,
-                        chunk_text=doc.page_content,
-                        chunk_embedding_id=f"{index_name}_{i}",
-                        page_number=doc.metadata.get("page_number"),
-                        section_id=doc.metadata.get("section_id"),
-                        token_count=len(doc.page_content.split())
-                    )
-                    session.add(chunk)
+    @staticmethod
+    def chunk_metadata_rows(documents: List[Document], ids: List[str]) -> List[Dict[str, Any]]:
+        """vector_chunks 행 목록 구성 (chunk_index는 문서 전체 기준 번호)"""
+        return [
+            {
+                "document_id": doc.metadata.get("document_id"),
+                "chunk_index": doc.metadata.get("chunk_index", i),
+                "chunk_text": doc.page_content,
+                "chunk_embedding_id": docstore_id,
+                "page_number": doc.metadata.get("page_number"),
+                "section_id": doc.metadata.get("section_id"),
+                "token_count": doc.metadata.get("token_count") or len(doc.page_content.split()),
+            }
+            for i, (doc, docstore_id) in enumerate(zip(documents, ids))
+        ]
 
-                await session.commit()
-                logger.info(f"{len(documents)}개 청크 메타데이터 저장 완료")
+    async def save_chunk_rows(self, rows: List[Dict[str, Any]]):
+        """청크 메타데이터를 단일 트랜잭션의 bulk insert(executemany)로 저장"""
+        if not rows:
+            return
+        from sqlalchemy import insert
 
-        except Exception as e:
-            logger.error(f"청크 메타데이터 저장 실패: {e}")
+        async with AsyncSessionLocal() as session:
+            await session.execute(insert(VectorChunk), rows)
+            await session.commit()
+        logger.info(f"{len(rows)}개 청크 메타데이터 저장 완료")
 
     def _match_metadata_filter(self, metadata: Dict[str, Any], filters: Dict[str, Any]) -> bool:
         """메타데이터 필터링 매칭"""
@@ -414,8 +818,8 @@ class VectorSearchService:
                 )
                 documents.append(doc)
 
-            # 인덱스 재생성
-            success = await self.create_index_from_documents(documents, index_name)
+            # 인덱스 재생성 (청크 행은 이미 있으므로 다시 기록하지 않음)
+            success = await self.create_index_from_documents(documents, index_name, save_metadata=False)
 
             if success:
                 logger.info(f"{len(documents)}개 문서로 재인덱싱 완료")
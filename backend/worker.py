@@ -0,0 +1,59 @@
+"""문서 처리 워커 진입점
+
+API 서버와 별도 프로세스로 문서 처리 작업 큐를 소비합니다.
+API 서버는 INGESTION_WORKER_MODE=external 로 실행하세요.
+
+    python -m backend.worker --workers 4
+"""
+import argparse
+import asyncio
+import sys
+from pathlib import Path
+
+from loguru import logger
+
+# 프로젝트 루트를 Python path에 추가
+project_root = Path(__file__).parent.parent
+sys.path.insert(0, str(project_root))
+
+from backend.config.settings import settings
+from backend.config.database import init_database
+from backend.services.job_queue import get_job_queue, IngestionWorkerPool
+from backend.services.pdf_service import shutdown_extraction_pool
+
+
+async def run_worker(workers: int):
+    """작업 큐 워커 실행 (종료 신호까지)"""
+    await init_database()
+
+    Path(settings.upload_path).mkdir(parents=True, exist_ok=True)
+    Path(settings.processed_path).mkdir(parents=True, exist_ok=True)
+    Path(settings.vector_db_path).mkdir(parents=True, exist_ok=True)
+
+    pool = IngestionWorkerPool(get_job_queue(), concurrency=workers)
+    await pool.start()
+
+    try:
+        await asyncio.Event().wait()
+    finally:
+        await pool.stop()
+        shutdown_extraction_pool()
+
+
+def main():
+    parser = argparse.ArgumentParser(description="문서 처리 작업 큐 워커")
+    parser.add_argument(
+        "--workers", type=int, default=settings.ingestion_workers,
+        help="동시에 처리할 문서 수"
+    )
+    args = parser.parse_args()
+
+    logger.info(f"🚀 문서 처리 워커 시작 ({args.workers}개)")
+    try:
+        asyncio.run(run_worker(args.workers))
+    except KeyboardInterrupt:
+        logger.info("👋 문서 처리 워커 종료")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,152 @@
+#!/usr/bin/env python3
+"""
+청커 벤치마크
+============
+
+data/ 의 PDF 페이지 텍스트로 기존 RecursiveCharacterTextSplitter(문자 기준)와
+TokenChunker(토큰 기준)의 청킹 시간, 청크 수, 청크 토큰 분포를 비교합니다.
+모두 수집 파이프라인과 같이 페이지 단위로 호출합니다.
+splitter(tok)은 기존 분할기에 토큰 카운터를 length_function으로 넘겨 같은 토큰 예산을
+맞추도록 한 경우입니다.
+
+    python benchmarks/chunker_benchmark.py data/ --repeat 5
+"""
+
+import argparse
+import statistics
+import sys
+import time
+from pathlib import Path
+
+# 프로젝트 루트를 Python path에 추가
+project_root = Path(__file__).parent.parent
+sys.path.insert(0, str(project_root))
+
+from langchain.text_splitter import RecursiveCharacterTextSplitter
+
+from backend.config.settings import settings
+from backend.services.chunker import TokenChunker, get_token_counter
+from backend.services.pdf_extraction import extract_page_range
+
+
+def load_pages(directory: Path):
+    """PDF마다 페이지 텍스트 목록 추출 (중복 내용 파일은 한 번만)"""
+    from pypdf import PdfReader
+
+    documents = {}
+    for pdf_path in sorted(directory.glob("*.pdf")):
+        page_count = len(PdfReader(str(pdf_path)).pages)
+        pages = [p for p in extract_page_range(str(pdf_path), 0, page_count) if p.get("text")]
+        key = tuple(p["text_hash"] for p in pages)
+        if key not in documents:
+            documents[key] = (pdf_path.name, pages)
+    return list(documents.values())
+
+
+def run_splitter(pages, chunk_size, chunk_overlap, length_function=len):
+    """기존 방식: 호출마다 분할기를 만들고 Document 목록 생성"""
+    chunks = []
+    for page in pages:
+        splitter = RecursiveCharacterTextSplitter(
+            chunk_size=chunk_size,
+            chunk_overlap=chunk_overlap,
+            length_function=length_function,
+            separators=["\n\n", "\n", ". ", " ", ""]
+        )
+        chunks.extend(
+            doc.page_content
+            for doc in splitter.create_documents([page["text"]], [{"page_number": page["page"]}])
+        )
+    return chunks
+
+
+def run_chunker(chunker, pages):
+    """새 방식: 오프셋 레코드로 분할 후 필요한 텍스트만 잘라냄"""
+    chunks = []
+    for page in pages:
+        text = page["text"]
+        chunks.extend(
+            text[span.start:span.end] for span in chunker.split_spans(text)
+        )
+    return chunks
+
+
+def measure(fn, repeat):
+    times = []
+    result = None
+    for _ in range(repeat):
+        started = time.perf_counter()
+        result = fn()
+        times.append(time.perf_counter() - started)
+    return min(times), statistics.mean(times), result
+
+
+def describe(label, best, mean, chunks, count_tokens, budget):
+    tokens = count_tokens(chunks) if chunks else [0]
+    over = sum(1 for t in tokens if t > budget)
+    print(f"  {label:<13} best {best * 1000:8.1f}ms  mean {mean * 1000:8.1f}ms  "
+          f"청크 {len(chunks):5d}  토큰 평균 {statistics.mean(tokens):6.1f} / "
+          f"최대 {max(tokens):5d}  예산 초과 {over}")
+
+
+def main():
+    parser = argparse.ArgumentParser(description="청커 벤치마크")
+    parser.add_argument("directory", nargs="?", default="data", help="PDF 디렉터리")
+    parser.add_argument("--repeat", type=int, default=5)
+    parser.add_argument("--chunk-size", type=int, default=settings.chunk_size, help="기존 분할기 문자 수")
+    parser.add_argument("--chunk-overlap", type=int, default=settings.chunk_overlap)
+    parser.add_argument("--chunk-tokens", type=int, default=settings.chunk_tokens)
+    parser.add_argument("--overlap-tokens", type=int, default=settings.chunk_overlap_tokens)
+    parser.add_argument("--tokenizer", default=settings.chunk_tokenizer or settings.embedding_model)
+    options = parser.parse_args()
+
+    print("🔍 PDF 텍스트 추출 중...")
+    documents = load_pages(Path(options.directory))
+    if not documents:
+        print(f"❌ PDF 파일이 없습니다: {options.directory}")
+        return 1
+
+    count_tokens = get_token_counter(options.tokenizer)
+    chunker = TokenChunker(options.chunk_tokens, options.overlap_tokens, token_counter=count_tokens)
+    # 첫 호출의 토크나이저 준비 비용은 측정에서 제외
+    chunker.split_spans("warm up.")
+
+    print(f"📊 기존: {options.chunk_size}자/{options.chunk_overlap}자 겹침, "
+          f"새 청커: {options.chunk_tokens}토큰/{options.overlap_tokens}토큰 겹침, 반복 {options.repeat}회")
+    print("   (토큰 통계는 모든 결과를 같은 토크나이저로 계산)")
+
+    def token_length(text):
+        return count_tokens([text])[0]
+
+    total = {"splitter": 0.0, "splitter(tok)": 0.0, "chunker": 0.0}
+    for name, pages in documents:
+        characters = sum(len(p["text"]) for p in pages)
+        print(f"\n📄 {name}: {len(pages)}페이지, {characters:,}자")
+
+        best, mean, chunks = measure(
+            lambda: run_splitter(pages, options.chunk_size, options.chunk_overlap), options.repeat
+        )
+        total["splitter"] += best
+        describe("splitter", best, mean, chunks, count_tokens, options.chunk_tokens)
+
+        best, mean, chunks = measure(
+            lambda: run_splitter(pages, options.chunk_tokens, options.overlap_tokens, token_length),
+            options.repeat
+        )
+        total["splitter(tok)"] += best
+        describe("splitter(tok)", best, mean, chunks, count_tokens, options.chunk_tokens)
+
+        best, mean, chunks = measure(lambda: run_chunker(chunker, pages), options.repeat)
+        total["chunker"] += best
+        describe("chunker", best, mean, chunks, count_tokens, options.chunk_tokens)
+
+    print("\n" + "=" * 60)
+    for label, seconds in total.items():
+        print(f"  {label:<13} 합계 {seconds * 1000:8.1f}ms "
+              f"(chunker 대비 {seconds / max(total['chunker'], 1e-9):.1f}x)")
+    print("=" * 60)
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
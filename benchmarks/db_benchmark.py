@@ -0,0 +1,302 @@
+#!/usr/bin/env python3
+"""
+메타데이터 DB 프로필 벤치마크
+============================
+
+임시 SQLite DB에 문서/청크/질의 로그를 채운 뒤, 문서 목록(/api/documents),
+시스템 상태(/api/status), 통계(/api/statistics, /api/debug/performance)가 실행하는
+쿼리를 두 가지 구성으로 측정합니다.
+
+  baseline : 기본 aiosqlite 엔진 (롤백 저널, 기본 키 외 색인 없음)
+  profile  : 연결 시 PRAGMA 프로필(WAL, busy_timeout, mmap, cache) + 색인 마이그레이션
+
+--writers 를 주면 측정하는 동안 별도 연결이 질의 로그를 계속 기록합니다
+(작업 큐 워커/질의 로그 기록과 API 조회가 겹치는 상황).
+
+    python benchmarks/db_benchmark.py --documents 2000 --chunks-per-doc 150 --repeat 20
+"""
+
+import argparse
+import asyncio
+import random
+import statistics
+import sys
+import tempfile
+import time
+import uuid
+from datetime import datetime, timedelta
+from pathlib import Path
+
+# 프로젝트 루트를 Python path에 추가
+project_root = Path(__file__).parent.parent
+sys.path.insert(0, str(project_root))
+
+from sqlalchemy import event, func, insert, or_, select, text
+from sqlalchemy.ext.asyncio import create_async_engine
+
+from backend.config.database import (
+    Base, Document, VectorChunk, QueryLog, _set_sqlite_pragmas, _run_migrations
+)
+
+DOCUMENT_TYPES = ["datasheet", "manual", "specification"]
+FAMILIES = ["DDR4", "DDR5", "LPDDR5", "GDDR6", "HBM3", "NAND"]
+ROLES = ["engineer", "manager", "operator", "quality"]
+
+
+def make_engine(db_path: Path, profile: bool):
+    engine = create_async_engine(f"sqlite+aiosqlite:///{db_path}")
+    if profile:
+        event.listen(engine.sync_engine, "connect", _set_sqlite_pragmas)
+    return engine
+
+
+def _drop_secondary_indexes(sync_conn):
+    """create_all이 만든 보조 색인을 지워 기존(색인 없는) DB 상태로 되돌림"""
+    rows = sync_conn.execute(text(
+        "SELECT name FROM sqlite_master WHERE type='index' AND sql IS NOT NULL"
+    )).fetchall()
+    for (name,) in rows:
+        sync_conn.execute(text(f"DROP INDEX {name}"))
+
+
+async def seed(engine, options):
+    """문서, 벡터 청크, 질의 로그를 무작위로 채움 (두 구성에 같은 시드 사용)"""
+    rng = random.Random(42)
+    now = datetime.utcnow()
+
+    async with engine.begin() as conn:
+        await conn.run_sync(Base.metadata.create_all)
+        await conn.run_sync(_drop_secondary_indexes)
+
+        document_ids = []
+        documents = []
+        for i in range(options.documents):
+            document_id = str(uuid.UUID(int=rng.getrandbits(128)))
+            document_ids.append(document_id)
+            created = now - timedelta(minutes=rng.randint(0, 60 * 24 * 90))
+            documents.append({
+                "id": document_id,
+                "filename": f"{document_id}.pdf",
+                "original_name": f"{rng.choice(FAMILIES)}_{i:05d}.pdf",
+                "file_path": f"./data/uploads/{document_id}.pdf",
+                "file_size": rng.randint(100_000, 20_000_000),
+                "upload_date": created,
+                "document_type": rng.choice(DOCUMENT_TYPES),
+                "product_family": rng.choice(FAMILIES),
+                "product_model": f"M{rng.randint(1000, 9999)}",
+                "page_count": rng.randint(5, 300),
+                "processing_status": "completed" if rng.random() > 0.05 else "failed",
+                "created_at": created,
+                "updated_at": created,
+            })
+        await conn.execute(insert(Document), documents)
+
+        chunk_text = "Operating voltage VDD 1.1V typical, tCK 0.625ns minimum. " * 8
+        for document_id in document_ids:
+            await conn.execute(insert(VectorChunk), [
+                {
+                    "document_id": document_id,
+                    "chunk_index": index,
+                    "chunk_text": chunk_text,
+                    "chunk_embedding_id": f"{document_id}:{index}",
+                    "page_number": index // 3 + 1,
+                    "token_count": 256,
+                    "created_at": now,
+                }
+                for index in range(options.chunks_per_doc)
+            ])
+
+        questions = [f"{family} {param} 값은?" for family in FAMILIES for param in ("VDD", "tCK", "온도 범위")]
+        await conn.execute(insert(QueryLog), [
+            {
+                "user_role": rng.choice(ROLES),
+                "query_text": rng.choice(questions),
+                "response_text": "답변 " * 50,
+                "retrieved_documents": "[]",
+                "response_time_ms": rng.randint(200, 8000),
+                "created_at": now - timedelta(minutes=rng.randint(0, 60 * 24 * 30)),
+            }
+            for _ in range(options.query_logs)
+        ])
+    return document_ids
+
+
+async def list_documents(session, rng, document_ids):
+    """GET /api/documents: 필터 + 개수 + created_at 역순 페이지"""
+    conditions = [Document.product_family == rng.choice(FAMILIES)]
+    if rng.random() < 0.5:
+        conditions.append(Document.document_type == rng.choice(DOCUMENT_TYPES))
+    total = (await session.execute(select(func.count(Document.id)).where(*conditions))).scalar()
+    page = (await session.execute(
+        select(Document).where(*conditions)
+        .order_by(Document.created_at.desc()).offset(20).limit(20)
+    )).scalars().all()
+    return total, len(page)
+
+
+async def document_chunks(session, rng, document_ids):
+    """문서 상세/삭제/재청킹: document_id로 청크 조회"""
+    document_id = rng.choice(document_ids)
+    rows = (await session.execute(
+        select(VectorChunk.chunk_index, VectorChunk.chunk_embedding_id)
+        .where(VectorChunk.document_id == document_id)
+        .order_by(VectorChunk.chunk_index)
+    )).all()
+    return len(rows)
+
+
+async def sources_lookup(session, rng, document_ids):
+    """검색 결과 출처: documents.id IN (...)"""
+    ids = rng.sample(document_ids, 10)
+    rows = (await session.execute(select(Document).where(Document.id.in_(ids)))).scalars().all()
+    return len(rows)
+
+
+async def system_status(session, rng, document_ids):
+    """GET /api/status: 문서 수, 벡터 수"""
+    documents = (await session.execute(select(func.count(Document.id)))).scalar()
+    vectors = (await session.execute(select(func.count(VectorChunk.id)))).scalar()
+    return documents, vectors
+
+
+async def statistics_queries(session, rng, document_ids):
+    """GET /api/statistics: 타입별 문서 수, 역할별/인기 질의 집계"""
+    by_type = (await session.execute(
+        select(Document.document_type, func.count(Document.document_type)).group_by(Document.document_type)
+    )).all()
+    by_role = (await session.execute(
+        select(QueryLog.user_role, func.count(QueryLog.id)).group_by(QueryLog.user_role)
+    )).all()
+    return len(by_type), len(by_role)
+
+
+async def performance_window(session, rng, document_ids):
+    """GET /api/debug/performance: 최근 1시간/24시간 질의 로그 집계"""
+    results = []
+    for window in ("-1 hour", "-24 hours"):
+        results.append((await session.execute(text(
+            "SELECT COUNT(*), AVG(response_time_ms) FROM query_logs "
+            f"WHERE created_at > datetime('now', '{window}')"
+        ))).first())
+    return results
+
+
+SCENARIOS = [
+    ("list", list_documents),
+    ("chunks", document_chunks),
+    ("sources", sources_lookup),
+    ("status", system_status),
+    ("statistics", statistics_queries),
+    ("performance", performance_window),
+]
+
+
+async def log_writer(engine, stop: asyncio.Event, counter: list):
+    """측정 중 질의 로그를 계속 기록하는 쓰기 연결"""
+    rng = random.Random()
+    while not stop.is_set():
+        try:
+            async with engine.begin() as conn:
+                await conn.execute(insert(QueryLog), [{
+                    "user_role": rng.choice(ROLES),
+                    "query_text": "동시 기록",
+                    "response_time_ms": rng.randint(200, 8000),
+                    "created_at": datetime.utcnow(),
+                }])
+            counter[0] += 1
+        except Exception:
+            counter[1] += 1
+        await asyncio.sleep(0.005)
+
+
+async def measure(engine, document_ids, repeat, concurrency):
+    from sqlalchemy.ext.asyncio import AsyncSession
+
+    results = {}
+    for name, scenario in SCENARIOS:
+        rng = random.Random(7)
+        times = []
+        errors = 0
+
+        async def one():
+            nonlocal errors
+            started = time.perf_counter()
+            try:
+                async with AsyncSession(engine) as session:
+                    await scenario(session, rng, document_ids)
+            except Exception:
+                errors += 1
+            times.append(time.perf_counter() - started)
+
+        for _ in range(repeat):
+            await asyncio.gather(*(one() for _ in range(concurrency)))
+        times.sort()
+        results[name] = {
+            "p50": statistics.median(times),
+            "p95": times[min(len(times) - 1, int(len(times) * 0.95))],
+            "errors": errors,
+        }
+    return results
+
+
+async def run_variant(label, profile, options, workdir: Path):
+    db_path = workdir / f"{label}.db"
+    engine = make_engine(db_path, profile)
+    print(f"\n🗄️  {label}: 데이터 생성 중...")
+    document_ids = await seed(engine, options)
+    if profile:
+        async with engine.begin() as conn:
+            await conn.run_sync(_run_migrations)
+
+    async with engine.connect() as conn:
+        journal = (await conn.execute(text("PRAGMA journal_mode"))).scalar()
+    print(f"   journal_mode={journal}, 파일 {db_path.stat().st_size / 1024 / 1024:.1f}MB")
+
+    stop = asyncio.Event()
+    write_counter = [0, 0]
+    writers = [asyncio.create_task(log_writer(engine, stop, write_counter)) for _ in range(options.writers)]
+    try:
+        # 첫 실행의 연결/캐시 준비 비용은 측정에서 제외
+        await measure(engine, document_ids, 1, 1)
+        results = await measure(engine, document_ids, options.repeat, options.concurrency)
+    finally:
+        stop.set()
+        await asyncio.gather(*writers)
+        await engine.dispose()
+
+    if options.writers:
+        print(f"   동시 기록: 성공 {write_counter[0]}건, 실패 {write_counter[1]}건")
+    return results
+
+
+async def run(options):
+    with tempfile.TemporaryDirectory() as workdir:
+        baseline = await run_variant("baseline", False, options, Path(workdir))
+        profile = await run_variant("profile", True, options, Path(workdir))
+
+    print("\n" + "=" * 72)
+    print(f"  {'시나리오':<12} {'baseline p50':>13} {'p95':>9} {'profile p50':>13} {'p95':>9} {'속도':>7}  오류")
+    for name, _ in SCENARIOS:
+        before, after = baseline[name], profile[name]
+        speedup = before["p50"] / max(after["p50"], 1e-9)
+        print(f"  {name:<12} {before['p50'] * 1000:11.2f}ms {before['p95'] * 1000:7.2f}ms "
+              f"{after['p50'] * 1000:11.2f}ms {after['p95'] * 1000:7.2f}ms {speedup:6.1f}x  "
+              f"{before['errors']}/{after['errors']}")
+    print("=" * 72)
+    return 0
+
+
+def main():
+    parser = argparse.ArgumentParser(description="메타데이터 DB 프로필 벤치마크")
+    parser.add_argument("--documents", type=int, default=2000)
+    parser.add_argument("--chunks-per-doc", type=int, default=150)
+    parser.add_argument("--query-logs", type=int, default=100_000)
+    parser.add_argument("--repeat", type=int, default=20)
+    parser.add_argument("--concurrency", type=int, default=4, help="동시에 실행할 조회 수")
+    parser.add_argument("--writers", type=int, default=1, help="측정 중 질의 로그를 기록할 연결 수")
+    options = parser.parse_args()
+    return asyncio.run(run(options))
+
+
+if __name__ == "__main__":
+    sys.exit(main())